@@ -0,0 +1,13 @@
+import os
+import sys
+
+# The app runs with both the repo root (`src.*` imports) and `src/` (`crew.*` imports)
+# on the path, so mirror that here for `python -m benchmarks.<name>`.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Benchmarks never talk to the real Tavily or Gemini APIs
+os.environ.setdefault("TAVILY_API_KEY", "benchmark-key")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-key")
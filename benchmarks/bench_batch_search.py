@@ -0,0 +1,111 @@
+"""Compare the sequential Tavily tool against the batch tool.
+
+Run from the repo root:
+    python -m benchmarks.bench_batch_search --queries 30 --latency 0.4
+
+Tavily is replaced by a fake client with a fixed per-call latency. Redis is
+replaced by fakeredis when it is installed, otherwise only the in-process
+L1 cache is used. "warm" runs read from Redis (L1 is cleared first).
+
+Both paths go through the Tavily rate limiter. It is off by default
+(TAVILY_RATE_LIMIT_PER_MINUTE 0); with a limit whose burst is below the batch
+size, cold misses beyond the burst wait for tokens and the batch speedup
+shrinks towards 1x, e.g. --rate-limit 100 --burst 10 for a development key.
+"""
+import argparse
+import sys
+import threading
+import time
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+from loguru import logger
+
+from src.tools import tavily_tool
+from src.tools.clients import set_redis_client, set_tavily_client
+from src.tools.rate_limit import tavily_limiter
+
+
+class FakeTavilyClient:
+    """Stand-in for TavilyClient that sleeps instead of calling the API"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def search(self, query: str, search_depth: str = "advanced", max_results: int = 5):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return {
+            "query": query,
+            "results": [
+                {"title": f"{query} #{i}", "url": f"https://example.com/{i}", "content": "lorem ipsum " * 40}
+                for i in range(max_results)
+            ],
+        }
+
+
+def make_redis():
+    try:
+        import fakeredis
+    except ImportError:
+        logger.warning("fakeredis not installed, benchmarking without a Redis cache")
+        return None
+    return fakeredis.FakeStrictRedis(decode_responses=True)
+
+
+def run_sequential(queries):
+    for query in queries:
+        tavily_tool.cached_tavily_search_tool._run(query)
+
+
+def run_batch(queries):
+    tavily_tool.cached_tavily_batch_search_tool._run(queries)
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    fn(queries)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=30, help="Number of distinct queries per run")
+    parser.add_argument("--latency", type=float, default=0.4, help="Fake Tavily latency per call (seconds)")
+    parser.add_argument("--rate-limit", type=float, default=tavily_tool.settings.TAVILY_RATE_LIMIT_PER_MINUTE,
+                        help="Tavily requests per minute, 0 for no limit")
+    parser.add_argument("--burst", type=int, default=tavily_tool.settings.TAVILY_RATE_LIMIT_BURST,
+                        help="Tavily requests allowed back to back")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    queries = [f"use case {i} dataset kaggle" for i in range(args.queries)]
+    rows = []
+    for name, fn in (("sequential", run_sequential), ("batch", run_batch)):
+        # A full bucket for each path
+        tavily_limiter.bucket = type(tavily_limiter.bucket)(f"bench-{name}-{time.time_ns()}", args.rate_limit, args.burst)
+        fake_client = FakeTavilyClient(args.latency)
+        set_tavily_client(fake_client)
+        set_redis_client(make_redis())
+        tavily_tool.l1_cache.clear()
+        cold = timed(fn, queries)
+        tavily_tool.l1_cache.clear()
+        warm = timed(fn, queries)
+        rows.append((name, cold, warm, fake_client.calls))
+
+    print(f"\n{args.queries} queries, {args.latency:.2f}s fake Tavily latency, "
+          f"max concurrency {tavily_tool.settings.TAVILY_MAX_CONCURRENCY}, "
+          f"rate limit {f'{args.rate_limit:g}/min, burst {args.burst}' if args.rate_limit > 0 else 'off'}")
+    print(f"{'path':<12}{'cold (s)':>10}{'warm (s)':>10}{'api calls':>11}")
+    for name, cold, warm, calls in rows:
+        print(f"{name:<12}{cold:>10.3f}{warm:>10.3f}{calls:>11}")
+    speedup = rows[0][1] / rows[1][1] if rows[1][1] else float("inf")
+    print(f"\nCold-cache speedup of batch over sequential: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
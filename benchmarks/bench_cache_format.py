@@ -0,0 +1,82 @@
+"""Size and speed of the Redis search cache formats.
+
+Run from the repo root:
+    python -m benchmarks.bench_cache_format --results 5 --content-chars 3000
+
+v1 is the plain `json.dumps` of a Tavily response that entries used to be
+stored as; v2 the current compressed format (src/tools/cache_format.py) at
+several zlib levels. The payloads are advanced-depth shaped responses whose
+content is made of random words from a few thousand word vocabulary. It
+compresses somewhat worse than English page extracts, so the ratios are
+conservative (repeated lorem ipsum would flatter every format).
+"""
+import argparse
+import json
+import random
+import time
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+
+from src.tools.cache_format import decode_entry, encode_entry
+
+
+def realistic_response(seed: int, results: int, content_chars: int) -> str:
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 11))) for _ in range(4000)]
+
+    def text(chars: int) -> str:
+        words = []
+        while sum(len(w) + 1 for w in words) < chars:
+            words.append(rng.choice(vocabulary[:rng.choice((200, 4000))]))
+        return " ".join(words)[:chars]
+
+    return json.dumps({
+        "query": text(60),
+        "follow_up_questions": None,
+        "answer": None,
+        "images": [],
+        "results": [
+            {
+                "title": text(70),
+                "url": f"https://example.com/{rng.randint(0, 10**9)}/{text(30).replace(' ', '-')}",
+                "content": text(content_chars),
+                "score": rng.random(),
+                "raw_content": None,
+            }
+            for _ in range(results)
+        ],
+        "response_time": round(rng.random() * 3, 2),
+    })
+
+
+def per_call_us(fn, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=5, help="Search hits per response")
+    parser.add_argument("--content-chars", type=int, default=3000, help="Content length per hit")
+    parser.add_argument("--samples", type=int, default=20, help="Responses to average over")
+    args = parser.parse_args()
+
+    payloads = [realistic_response(i, args.results, args.content_chars) for i in range(args.samples)]
+    v1_bytes = sum(len(p.encode("utf-8")) for p in payloads)
+    print(f"\n{args.samples} responses x {args.results} hits x {args.content_chars} content chars")
+    print(f"{'format':<14}{'avg bytes':>11}{'vs v1':>8}{'encode (us)':>13}{'decode (us)':>13}")
+    print(f"{'v1 json':<14}{v1_bytes // args.samples:>11}{1.0:>8.2f}{'-':>13}"
+          f"{per_call_us(lambda: [p.encode('utf-8').decode('utf-8') for p in payloads], 20) / args.samples:>13.1f}")
+    for level in (1, 6, 9):
+        encoded = [encode_entry(p, level) for p in payloads]
+        assert all(json.loads(decode_entry(e))["results"] for e in encoded)
+        v2_bytes = sum(len(e) for e in encoded)
+        encode_us = per_call_us(lambda: [encode_entry(p, level) for p in payloads], 5) / args.samples
+        decode_us = per_call_us(lambda: [decode_entry(e) for e in encoded], 20) / args.samples
+        print(f"{f'v2 zlib {level}':<14}{v2_bytes // args.samples:>11}{v1_bytes / v2_bytes:>8.2f}{encode_us:>13.1f}{decode_us:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Fire many identical searches at once from several processes and count the
+Tavily calls that reach the (fake) API.
+
+Run from the repo root:
+    python -m benchmarks.bench_coalescing --processes 4 --threads 8
+
+Every process shares one Redis (a fakeredis TCP server unless --redis-url
+is given), like the app's workers do. With coalescing, exactly one call
+must reach Tavily however many callers miss the cache together; the script
+exits with 1 otherwise. "uncoalesced" bypasses SingleFlight to show the
+stampede it prevents.
+"""
+import argparse
+import multiprocessing
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+from loguru import logger
+
+
+class CountingTavilyClient:
+    """FakeTavilyClient that also counts its calls in memory shared by all processes"""
+
+    def __init__(self, calls, latency: float):
+        from benchmarks.fakes import FakeTavilyClient
+        self.calls = calls
+        self.client = FakeTavilyClient(latency=latency)
+
+    def search(self, *args, **kwargs):
+        with self.calls.get_lock():
+            self.calls.value += 1
+        return self.client.search(*args, **kwargs)
+
+
+def worker(redis_url, query, threads, latency, coalesce, calls, barrier, results):
+    """One app process: `threads` concurrent searches of the same query"""
+    import redis
+    from src.tools import tavily_tool
+    from src.tools.clients import set_redis_client, set_tavily_client
+    from src.tools.rate_limit import tavily_limiter
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+    set_redis_client(redis.Redis.from_url(redis_url, decode_responses=True))
+    set_tavily_client(CountingTavilyClient(calls, latency))
+    tavily_limiter.bucket.rate = 0
+    if not coalesce:
+        tavily_tool.search_coalescer.do = lambda key, fetch, read_cached: (fetch(), False)
+
+    tool = tavily_tool.create_search_tools()["search"]
+    tiers = Counter()
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def search():
+        start.wait()
+        result = tool._search(query, "advanced", 5)
+        with lock:
+            tiers[result.get("cache_tier") or result["status"]] += 1
+
+    barrier.wait()
+    started = time.perf_counter()
+    pool = [threading.Thread(target=search) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put((dict(tiers), tavily_tool.search_coalescer.snapshot(), time.perf_counter() - started))
+
+
+def run(redis_url: str, query: str, args, coalesce: bool):
+    context = multiprocessing.get_context("spawn")
+    calls = context.Value("i", 0)
+    barrier = context.Barrier(args.processes)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(redis_url, query, args.threads, args.latency, coalesce, calls, barrier, results))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    # Slowest process, from the moment all of them were ready to search
+    tiers, stats, elapsed = Counter(), Counter(), 0.0
+    for process_tiers, process_stats, process_seconds in collected:
+        tiers.update(process_tiers)
+        stats.update(process_stats)
+        elapsed = max(elapsed, process_seconds)
+    return calls.value, elapsed, dict(tiers), dict(stats)
+
+
+def start_fake_redis() -> str:
+    from fakeredis import TcpFakeServer
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"redis://127.0.0.1:{port}/0"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4, help="Worker processes")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent searches per process")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake Tavily latency per call (seconds)")
+    parser.add_argument("--redis-url", help="Redis shared by the processes (default: an in-process fakeredis server)")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+    redis_url = args.redis_url or start_fake_redis()
+    run_id = int(time.time())
+
+    callers = args.processes * args.threads
+    print(f"\n{callers} identical searches ({args.processes} processes x {args.threads} threads), {args.latency:.2f}s Tavily latency")
+    print(f"{'mode':<14}{'Tavily calls':>14}{'search time (s)':>18}  result tiers")
+    upstream = {}
+    for name, coalesce in (("uncoalesced", False), ("coalesced", True)):
+        # A query of its own per mode and run, so neither starts with a cache hit
+        calls, elapsed, tiers, stats = run(redis_url, f"steel demand forecasting {name} {run_id}", args, coalesce)
+        upstream[name] = calls
+        print(f"{name:<14}{calls:>14}{elapsed:>18.2f}  {tiers}")
+    print(f"\ncoalescing stats (all processes): {stats}")
+
+    if upstream["coalesced"] != 1:
+        print(f"❌ Expected exactly 1 Tavily call with coalescing, got {upstream['coalesced']}")
+        sys.exit(1)
+    print("✅ One Tavily call served every caller")
+
+
+if __name__ == "__main__":
+    main()
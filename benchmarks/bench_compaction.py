@@ -0,0 +1,104 @@
+"""Measure how many prompt tokens search-result compaction saves per run.
+
+Run from the repo root:
+    python -m benchmarks.bench_compaction --queries 40 --overlap 0.3
+
+Replays queries through one run's search tools against a fake Tavily client
+returning advanced-depth shaped payloads. `overlap` is the share of hits
+pointing at a page an earlier query already returned (the same Kaggle or
+GitHub pages come up for many use cases).
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+from loguru import logger
+
+from src.tools import tavily_tool
+from src.tools.clients import set_redis_client, set_tavily_client
+from src.tools.compaction import SearchResultCompactor, estimate_tokens
+
+
+class FakeAdvancedTavilyClient:
+    """Returns payloads shaped like Tavily "advanced" responses"""
+
+    def __init__(self, overlap: float, seed: int = 7):
+        self.overlap = overlap
+        self.random = random.Random(seed)
+        self.pages = 0
+
+    def search(self, query: str, search_depth: str = "advanced", max_results: int = 5):
+        results = []
+        for _ in range(max_results):
+            if self.pages and self.random.random() < self.overlap:
+                page = self.random.randrange(self.pages)
+            else:
+                page, self.pages = self.pages, self.pages + 1
+            results.append({
+                "title": f"Page {page}: {query}",
+                "url": f"https://www.kaggle.com/datasets/example/page-{page}",
+                "content": f"{query} " + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 25,
+                "score": round(self.random.random(), 4),
+                "raw_content": None,
+            })
+        return {
+            "query": query,
+            "follow_up_questions": None,
+            "answer": None,
+            "images": [],
+            "results": results,
+            "response_time": 1.42,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=40, help="Number of queries in the run")
+    parser.add_argument("--overlap", type=float, default=0.3, help="Share of hits repeating an earlier page")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    set_tavily_client(FakeAdvancedTavilyClient(args.overlap))
+    set_redis_client(None)
+    tavily_tool.l1_cache.clear()
+
+    compactor = SearchResultCompactor()
+    tools = tavily_tool.create_search_tools(compactor=compactor)
+    queries = [f"use case {i} dataset kaggle" for i in range(args.queries)]
+    # Half single searches, half batches of 4, like the resource collector
+    raw_tokens = compact_tokens = 0
+    compaction_seconds = 0.0
+    for i in range(0, len(queries), 8):
+        for query in queries[i:i + 4]:
+            raw = tools["search"]._search(query, "advanced", 5)
+            start = time.perf_counter()
+            compacted = compactor.compact(raw)
+            compaction_seconds += time.perf_counter() - start
+            raw_tokens += estimate_tokens(raw)
+            compact_tokens += estimate_tokens(compacted)
+        batch = queries[i + 4:i + 8]
+        if batch:
+            raw = tools["batch_search"]._search(batch, "advanced", 5)
+            start = time.perf_counter()
+            compacted = {**raw, "results": compactor.compact_batch(raw["results"])}
+            compaction_seconds += time.perf_counter() - start
+            raw_tokens += estimate_tokens(raw)
+            compact_tokens += estimate_tokens(compacted)
+
+    stats = compactor.stats.snapshot()
+    print(f"\n{args.queries} queries, {args.overlap:.0%} repeated pages, "
+          f"budget {compactor.token_budget} tokens/tool call, snippets {compactor.snippet_chars} chars")
+    print(f"{'tool output tokens (raw)':<32}{raw_tokens:>10}")
+    print(f"{'tool output tokens (compacted)':<32}{compact_tokens:>10}")
+    print(f"{'saved':<32}{1 - compact_tokens / raw_tokens:>10.1%}")
+    print(f"{'repeated URLs (no snippet)':<32}{stats['duplicate_urls']:>10}")
+    print(f"{'compaction time per result (ms)':<32}{compaction_seconds / stats['results'] * 1000:>10.3f}")
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Report latency with one model for every agent vs per-agent routing.
+
+Run from the repo root:
+    python -m benchmarks.bench_llm_routing --large-latency 3.0 --small-latency 1.0
+
+Fake models (benchmarks/fakes.py) stand in for a large and a small model:
+  single     every agent on the large model (one LLM_MODEL, as before routing)
+  routed     researcher, use case generator and resource collector on the
+             small model, the proposal synthesizer on the large one
+  degraded   as routed, but the large model stalls (--stall-latency per call);
+             the synthesizer's latency budget sends its calls to the small model
+Per-agent LLM time comes from the run's trace (the llm_latency attribute).
+"""
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+from loguru import logger
+
+from benchmarks.fakes import install_fakes
+from src.config.settings import settings
+
+LARGE, SMALL = "fake/large", "fake/small"
+MECHANICAL = ("researcher", "use_case_generator", "resource_collector")
+
+
+def run_report(scenario: str, args, trace_dir: str):
+    """Report seconds and per-agent LLM latency of one run"""
+    from crew.pipeline import run_market_research
+
+    large_latency = args.stall_latency if scenario == "degraded" else args.large_latency
+    install_fakes(tavily_latency=args.tavily_latency, model_latencies={LARGE: large_latency, SMALL: args.small_latency})
+    settings.TRACE_DIR = trace_dir
+    settings.LLM_MODEL = LARGE
+    settings.LLM_AGENT_ROUTES = {}
+    if scenario != "single":
+        settings.LLM_AGENT_ROUTES = {agent: {"model": SMALL, "temperature": 0.2} for agent in MECHANICAL}
+        settings.LLM_AGENT_ROUTES["proposal_synthesizer"] = {
+            "latency_budget": args.large_latency * 2,
+            "fallback_model": SMALL,
+        }
+
+    run_id = f"bench-routing-{scenario}-{time.time_ns()}"
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # crewai's verbose panels
+        run_market_research({"company_name": f"Routing Bench {scenario}", "industry_name": "Retail"}, run_id=run_id)
+    seconds = time.perf_counter() - start
+    trace = json.loads(next(Path(trace_dir).glob(f"{run_id}-*.json")).read_text(encoding="utf-8"))
+    return seconds, trace["attributes"]["llm_latency"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--large-latency", type=float, default=3.0, help="Large model latency per call (seconds)")
+    parser.add_argument("--small-latency", type=float, default=1.0, help="Small model latency per call (seconds)")
+    parser.add_argument("--stall-latency", type=float, default=30.0, help="Large model latency when degraded (seconds)")
+    parser.add_argument("--tavily-latency", type=float, default=0.5, help="Fake Tavily latency per call (seconds)")
+    args = parser.parse_args()
+
+    logger.remove()
+    model, routes = settings.LLM_MODEL, settings.LLM_AGENT_ROUTES
+    try:
+        with tempfile.TemporaryDirectory() as trace_dir:
+            results = {scenario: run_report(scenario, args, trace_dir) for scenario in ("single", "routed", "degraded")}
+    finally:
+        settings.LLM_MODEL, settings.LLM_AGENT_ROUTES = model, routes
+
+    single_seconds = results["single"][0]
+    print(f"\nLarge model {args.large_latency}s/call, small model {args.small_latency}s/call, "
+          f"stalled large model {args.stall_latency}s/call")
+    print(f"{'scenario':<10}{'report (s)':>12}{'vs single':>11}  LLM seconds by agent (calls, fallbacks)")
+    for scenario, (seconds, latency) in results.items():
+        agents = ", ".join(f"{agent} {s['total_seconds']:.1f} ({s['calls']}, {s['fallbacks']})" for agent, s in latency.items())
+        print(f"{scenario:<10}{seconds:>12.2f}{(seconds - single_seconds) / single_seconds:>+11.0%}  {agents}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Measure PDF export cost by report size, cold and cached.
+
+Run from the repo root:
+    python -m benchmarks.bench_pdf --sizes 1 4 16 --sections 10
+
+Each size renders a synthetic report (the shape the writer agent produces:
+headings, bullet lists, a resource table) in a fresh subprocess, so the peak
+RSS reported is the renderer's own. The cached column is a second request for
+the same report through request_pdf, served from the content-hash cache.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+from loguru import logger
+
+
+def synthetic_report(scale: int, sections: int = 10) -> str:
+    parts = ["# AI Use Case Proposal for Example Corp\n"]
+    for s in range(sections * scale):
+        parts.append(f"## Use Case {s + 1}: Demand forecasting for line {s}\n")
+        parts.append("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 6 + "\n")
+        parts.extend(f"- Benefit {b}: sed do eiusmod tempor incididunt ut labore" for b in range(5))
+        parts.append("\n| Resource | Link |\n|---|---|")
+        parts.extend(f"| Dataset {r} | https://www.kaggle.com/datasets/example/{s}-{r} |" for r in range(3))
+        parts.append("")
+    return "\n".join(parts)
+
+
+# Runs in the subprocess: render once, report wall time and peak RSS
+CHILD_SCRIPT = """
+import json, resource, sys, time
+import benchmarks
+from src.reports.pdf import render_pdf
+report = open(sys.argv[1]).read()
+start = time.perf_counter()
+pdf = render_pdf(report)
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "bytes": len(pdf),
+                  "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def render_in_subprocess(report: str) -> dict:
+    with tempfile.NamedTemporaryFile("w", suffix=".md") as f:
+        f.write(report)
+        f.flush()
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD_SCRIPT, f.name], capture_output=True, text=True, check=True,
+            cwd=benchmarks.ROOT_DIR,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16], help="Report size multipliers")
+    parser.add_argument("--sections", type=int, default=10, help="Use case sections at size 1")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        from src.config.settings import settings
+        settings.PDF_CACHE_DIR = cache_dir
+        from src.reports.pdf import request_pdf
+
+        print(f"\n{'size':>6}{'md (KB)':>10}{'pdf (KB)':>10}{'render (s)':>12}{'peak RSS (MB)':>15}{'cached (ms)':>13}")
+        for scale in args.sizes:
+            report = synthetic_report(scale, args.sections)
+            cold = render_in_subprocess(report)
+            # Cold render through the worker pool fills the cache, then time a hit
+            request_pdf(report).result()
+            start = time.perf_counter()
+            request_pdf(report).result()
+            cached_ms = (time.perf_counter() - start) * 1000
+            print(f"{scale:>6}{len(report) / 1024:>10.1f}{cold['bytes'] / 1024:>10.1f}"
+                  f"{cold['seconds']:>12.2f}{cold['peak_rss_mb']:>15.1f}{cached_ms:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Measure the cache hit rate gained by query canonicalization and near-duplicate matching.
+
+Run from the repo root:
+    python -m benchmarks.bench_query_canonicalization
+
+Replays a query log (one query per line, default: the built-in sample of
+agent-written queries) and counts how many lookups would have been served
+from cache, i.e. how many paid Tavily calls are avoided, under each keying
+strategy.
+"""
+import argparse
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+
+from src.tools.query_matching import NearDuplicateIndex, canonicalize_query
+
+# Queries in the shape the researcher / use_case_generator / resource_collector agents write them
+SAMPLE_QUERIES = [
+    "Tesla AI trends 2025",
+    "AI trends Tesla 2025",
+    "tesla ai trends 2025?",
+    "Tesla Motors strategic focus areas",
+    "Tesla Motors strategic focus area",
+    "Tesla strategic focus areas",
+    "AI in electric vehicle manufacturing",
+    "AI in Electric Vehicle Manufacturing",
+    "artificial intelligence electric vehicle manufacturing",
+    "GenAI use cases in the automotive industry",
+    "GenAI use cases automotive industry",
+    "generative AI use cases automotive industry",
+    "competitor AI activities electric vehicles",
+    "electric vehicle competitors AI activities",
+    "predictive maintenance dataset kaggle",
+    "predictive maintenance datasets kaggle",
+    "Kaggle predictive maintenance dataset",
+    "predictive maintenance github",
+    "predictive maintenance python github",
+    "battery degradation dataset kaggle",
+    "battery degradation datasets on Kaggle",
+    "EV battery degradation dataset huggingface",
+    "defect detection computer vision github",
+    "computer vision defect detection github",
+    "defect detection CV GitHub repository",
+    "demand forecasting python github",
+    "demand forecasting github python",
+    "demand forecasting supply chain huggingface dataset",
+    "llm document summarization implementation",
+    "LLM document summarization implementation github",
+    "autonomous driving dataset huggingface",
+    "autonomous driving datasets hugging face",
+    "customer service chatbot automotive llm",
+    "automotive customer service LLM chatbot",
+    "supply chain optimization AI automotive",
+    "AI supply chain optimization in automotive",
+]
+
+
+def replay(queries, key_fn, index=None, threshold=None):
+    seen, hits = set(), 0
+    for query in queries:
+        key = key_fn(query)
+        if key in seen or (index is not None and index.find_similar("bench", key, threshold)):
+            hits += 1
+            continue
+        seen.add(key)
+        if index is not None:
+            index.add("bench", key)
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", help="File with one query per line (defaults to the built-in sample)")
+    parser.add_argument("--thresholds", default="0.6,0.7,0.8", help="Comma separated similarity thresholds")
+    args = parser.parse_args()
+
+    if args.log:
+        with open(args.log, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = SAMPLE_QUERIES
+
+    rows = [
+        ("raw query (old key)", replay(queries, lambda q: q)),
+        ("canonical", replay(queries, canonicalize_query)),
+    ]
+    for threshold in (float(t) for t in args.thresholds.split(",")):
+        hits = replay(queries, canonicalize_query, NearDuplicateIndex(), threshold)
+        rows.append((f"canonical + near-dup >= {threshold:.2f}", hits))
+
+    total = len(queries)
+    baseline = rows[0][1]
+    print(f"\n{total} queries replayed")
+    print(f"{'strategy':<32}{'hits':>6}{'hit rate':>10}{'extra':>8}{'paid calls':>12}")
+    for name, hits in rows:
+        print(f"{name:<32}{hits:>6}{hits / total:>10.1%}{(hits - baseline) / total:>+8.1%}{total - hits:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Hammer a quota-limited fake provider with and without the rate limiter.
+
+Run from the repo root:
+    python -m benchmarks.bench_rate_limit --calls 120 --quota 20 --workers 16
+
+The fake provider accepts `quota` requests per second (sliding window) and
+answers HTTP 429 beyond that, like Tavily or Gemini do. "unlimited" sends
+calls as fast as the workers can; "limited" goes through ProviderLimiter
+(token bucket in fakeredis, AIMD concurrency, jittered retries).
+"""
+import argparse
+import collections
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+from loguru import logger
+
+from src.tools.clients import set_redis_client
+from src.tools.rate_limit import ProviderLimiter
+
+
+class QuotaExceeded(Exception):
+    status_code = 429
+
+
+class QuotaProvider:
+    """Fake API with a requests-per-second quota and a fixed latency"""
+
+    def __init__(self, quota: int, latency: float):
+        self.quota = quota
+        self.latency = latency
+        self.accepted = 0
+        self.rejected = 0
+        self._window = collections.deque()
+        self._lock = threading.Lock()
+
+    def search(self, query: str):
+        with self._lock:
+            now = time.monotonic()
+            while self._window and now - self._window[0] > 1.0:
+                self._window.popleft()
+            if len(self._window) >= self.quota:
+                self.rejected += 1
+                raise QuotaExceeded("429 Too Many Requests")
+            self._window.append(now)
+            self.accepted += 1
+        time.sleep(self.latency)
+        return {"query": query}
+
+
+def run(call, calls: int, workers: int):
+    errors = 0
+
+    def one(i):
+        nonlocal errors
+        try:
+            call(f"query {i}")
+        except QuotaExceeded:
+            errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(one, range(calls)))
+    return time.perf_counter() - start, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=120, help="Calls to make")
+    parser.add_argument("--quota", type=int, default=20, help="Provider quota (requests per second)")
+    parser.add_argument("--latency", type=float, default=0.1, help="Provider latency per call (seconds)")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent callers")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    try:
+        import fakeredis
+        set_redis_client(fakeredis.FakeStrictRedis(decode_responses=True))
+    except ImportError:
+        logger.warning("fakeredis not installed, the token bucket falls back to a local one")
+        set_redis_client(None)
+
+    rows = []
+    provider = QuotaProvider(args.quota, args.latency)
+    seconds, errors = run(provider.search, args.calls, args.workers)
+    rows.append(("unlimited", seconds, errors, provider.rejected))
+
+    provider = QuotaProvider(args.quota, args.latency)
+    # Bucket slightly under the quota, as it would be configured in production
+    limiter = ProviderLimiter("bench", per_minute=args.quota * 60 * 0.9, burst=args.quota // 2, max_concurrency=args.workers)
+    seconds, errors = run(lambda q: limiter.call(provider.search, q), args.calls, args.workers)
+    rows.append(("limited", seconds, errors, provider.rejected))
+
+    print(f"\n{args.calls} calls, {args.workers} workers, quota {args.quota}/s, {args.latency:.2f}s latency")
+    print(f"{'mode':<12}{'time (s)':>10}{'calls/s':>10}{'failed calls':>14}{'429s':>8}")
+    for name, seconds, errors, rejected in rows:
+        print(f"{name:<12}{seconds:>10.2f}{(args.calls - errors) / seconds:>10.1f}{errors:>14}{rejected:>8}")
+    print(f"\nlimiter stats: {limiter.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Latency and memory of the report store behind the app's history panel.
+
+Run from the repo root:
+    python -m benchmarks.bench_report_store --reports 2000 --report-kb 20
+
+Fills a fresh store with synthetic reports, then times what the app does:
+save a finished report, list a history page (summaries only), open a
+report from disk and again from the in-memory LRU, and find the latest
+report for some inputs. The LRU stays within REPORT_STORE_MEMORY_BYTES
+however many reports are opened.
+"""
+import argparse
+import tempfile
+import time
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+
+from benchmarks.fakes import LOREM, percentiles
+from src.config.settings import settings
+from src.reports.store import ReportStore
+
+
+def timed_ms(fn, count: int):
+    samples = []
+    for i in range(count):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples, 0.5, 0.95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=2000, help="Reports in the store")
+    parser.add_argument("--report-kb", type=int, default=20, help="Size of each report")
+    parser.add_argument("--samples", type=int, default=200, help="Operations timed per row")
+    args = parser.parse_args()
+
+    body = (LOREM * (args.report_kb * 1024 // len(LOREM) + 1))[:args.report_kb * 1024]
+    settings.REPORT_STORE_MAX_REPORTS = max(settings.REPORT_STORE_MAX_REPORTS, args.reports + args.samples)
+    with tempfile.TemporaryDirectory() as directory:
+        store = ReportStore(f"{directory}/reports.sqlite3")
+        inputs = [{"company_name": f"Company {i}", "industry_name": "Steel"} for i in range(args.reports + args.samples)]
+        start = time.perf_counter()
+        ids = [store.save(inputs[i], f"# Report {i}\n\n{body}", source="generated", timings={"run_seconds": 60.0})
+               for i in range(args.reports)]
+        fill_seconds = time.perf_counter() - start
+
+        rows = {
+            "save": timed_ms(lambda i: store.save(inputs[args.reports + i], f"# Extra {i}\n\n{body}"), args.samples),
+            "history page": timed_ms(lambda i: store.list(offset=(i * 10) % args.reports, limit=settings.REPORT_HISTORY_PAGE_SIZE), args.samples),
+            "open (disk)": timed_ms(lambda i: store.get(ids[-(i + 1)]), args.samples),
+            "open (memory)": timed_ms(lambda i: store.get(ids[-(i % 10 + 1)]), args.samples),
+            "latest for inputs": timed_ms(lambda i: store.latest_for(inputs[i % args.reports]), args.samples),
+        }
+        info = store.info()
+
+    print(f"\n{args.reports} reports of {args.report_kb} KB stored in {fill_seconds:.1f}s")
+    print(f"{'operation':<20}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for name, points in rows.items():
+        print(f"{name:<20}{points['p50']:>10.3f}{points['p95']:>10.3f}")
+    print(f"\nin-memory LRU: {info['memory_entries']} reports, {info['memory_bytes'] / 1024 / 1024:.1f} MB "
+          f"(REPORT_STORE_MEMORY_BYTES {settings.REPORT_STORE_MEMORY_BYTES / 1024 / 1024:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
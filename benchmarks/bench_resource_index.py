@@ -0,0 +1,99 @@
+"""Latency and hit rate of the local resource index against a web search.
+
+Run from the repo root:
+    python -m benchmarks.bench_resource_index --resources 20000 --queries 500
+
+Fills a fresh index with synthetic Kaggle/HuggingFace/GitHub resources found
+for half of a list of common techniques, across industries, then times
+resource collector style queries ("<technique> <industry> dataset kaggle").
+Queries for an indexed technique should be answered whatever the industry
+(techniques recur across industries); queries for the other techniques
+should not, so they show the false hit rate.
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+from loguru import logger
+
+from benchmarks.fakes import percentiles
+from src.config.settings import settings
+from src.tools.resource_index import ResourceIndex, extract_resources
+
+TECHNIQUES = [
+    "predictive maintenance", "defect detection computer vision", "demand forecasting", "churn prediction",
+    "document summarization llm", "anomaly detection sensors", "route optimization", "fraud detection",
+    "recommendation system", "sentiment analysis reviews", "energy consumption forecasting", "quality inspection",
+    "chatbot customer support", "invoice extraction ocr", "inventory optimization", "price optimization",
+]
+INDUSTRIES = [
+    "steel", "automotive", "retail", "banking", "insurance", "telecom", "pharma", "logistics", "energy",
+    "agriculture", "aviation", "textile", "mining", "food processing", "semiconductor", "ecommerce",
+]
+PLATFORMS = [
+    ("kaggle", "https://www.kaggle.com/datasets/{owner}/{slug}"),
+    ("huggingface", "https://huggingface.co/datasets/{owner}/{slug}"),
+    ("github", "https://github.com/{owner}/{slug}"),
+]
+
+
+def fill(index: ResourceIndex, resources: int, rng: random.Random, techniques) -> None:
+    per_search = 5
+    for i in range(resources // per_search):
+        technique, industry = rng.choice(techniques), rng.choice(INDUSTRIES)
+        platform, url = rng.choice(PLATFORMS)
+        results = [
+            {
+                "title": f"{industry} {technique} {platform} {i}-{j}".title(),
+                "url": url.format(owner=f"user{rng.randint(0, 5000)}", slug=f"{industry}-{technique}-{i}-{j}".replace(" ", "-")),
+                "content": f"{technique} for {industry}: labelled records, baseline notebooks and evaluation scripts. " * 3,
+            }
+            for j in range(per_search)
+        ]
+        index.add(extract_resources(json.dumps({"results": results})), f"{technique} {industry} dataset {platform}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resources", type=int, default=20000, help="Resources in the index")
+    parser.add_argument("--queries", type=int, default=500, help="Queries to time")
+    parser.add_argument("--web-latency", type=float, default=1.5, help="Typical Tavily search latency to compare with (seconds)")
+    args = parser.parse_args()
+
+    logger.remove()
+    rng = random.Random(3)
+    techniques = list(TECHNIQUES)
+    rng.shuffle(techniques)
+    seen, unseen = techniques[:len(techniques) // 2], techniques[len(techniques) // 2:]
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = ResourceIndex(f"{directory}/resource_index.sqlite3")
+        start = time.perf_counter()
+        fill(index, args.resources, rng, seen)
+        fill_seconds = time.perf_counter() - start
+
+        latencies, hits = {"seen": [], "unseen": []}, {"seen": 0, "unseen": 0}
+        for q in range(args.queries):
+            kind = "seen" if q % 2 == 0 else "unseen"
+            technique, industry = rng.choice(seen if kind == "seen" else unseen), rng.choice(INDUSTRIES)
+            platform = rng.choice(["kaggle", "github", "huggingface"])
+            start = time.perf_counter()
+            found = index.search(f"{technique} {industry} dataset {platform}", 5)
+            latencies[kind].append(time.perf_counter() - start)
+            hits[kind] += bool(found)
+
+        print(f"\n{index.info()['resources']} resources indexed in {fill_seconds:.1f}s, {args.queries} queries")
+        print(f"{'queries':<18}{'hit rate':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+        for kind in ("seen", "unseen"):
+            points = percentiles(latencies[kind], 0.5, 0.95)
+            print(f"{kind + ' techniques':<18}{hits[kind] / len(latencies[kind]):>10.0%}"
+                  f"{points['p50'] * 1000:>10.2f}{points['p95'] * 1000:>10.2f}")
+        print(f"{'web search':<18}{'-':>10}{args.web_latency * 1000:>10.0f}{'-':>10}  (--web-latency)")
+        print(f"\nmin term match: {settings.RESOURCE_INDEX_MIN_TERM_MATCH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measure cold import time and first-paint latency of the Streamlit app.
+
+Run from the repo root:
+    python -m benchmarks.bench_startup --repeat 3
+
+Every measurement runs in a fresh interpreter so nothing is warm:
+  * import <module>   -- cold import time of the crew stack and the page's own imports
+  * first paint       -- executing src/app.py once through streamlit's AppTest
+                         (what a new browser tab waits for), and a rerun of it
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+import benchmarks
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path[:0] = {paths!r}
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+FIRST_PAINT_SNIPPET = """
+import sys, time, json
+sys.path[:0] = {paths!r}
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({app!r}, default_timeout=120)
+app.run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+app.run()
+rerun = time.perf_counter() - start
+print(json.dumps({{"first_paint": first, "rerun": rerun, "exception": bool(app.exception)}}))
+"""
+
+
+def run_snippet(code: str) -> str:
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True, cwd=benchmarks.ROOT_DIR,
+    )
+    return out.stdout.strip().splitlines()[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh processes per measurement")
+    parser.add_argument("--app", default="src/app.py", help="Streamlit script to paint")
+    args = parser.parse_args()
+
+    paths = [benchmarks.ROOT_DIR, f"{benchmarks.ROOT_DIR}/src"]
+    results = {}
+    for module in ("streamlit", "src.crew.pipeline"):
+        samples = [float(run_snippet(IMPORT_SNIPPET.format(paths=paths, module=module))) for _ in range(args.repeat)]
+        results[f"import {module}"] = statistics.median(samples)
+
+    paints = [json.loads(run_snippet(FIRST_PAINT_SNIPPET.format(paths=paths, app=args.app))) for _ in range(args.repeat)]
+    results["first paint (cold process)"] = statistics.median(p["first_paint"] for p in paints)
+    results["rerun (same process)"] = statistics.median(p["rerun"] for p in paints)
+
+    print(f"\nMedian of {args.repeat} fresh processes")
+    for name, seconds in results.items():
+        print(f"{name:<30}{seconds:>8.3f}s")
+    if any(p["exception"] for p in paints):
+        print("\n⚠️ The app raised while rendering, first-paint numbers are not meaningful.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""First report latency with a cold search cache, with in-run prefetch, and
+after warming the cache ahead of the run.
+
+Run from the repo root:
+    python -m benchmarks.bench_warming --reports 2 --llm-latency 1.0 --tavily-latency 1.5
+
+Every report is for a company not seen before, so the research and use
+case searches are cold misses unless warmed:
+  cold      SEARCH_PREFETCH_ENABLED off, the agents search on their own
+  prefetch  the standard searches start in the background as each stage begins
+  warmed    src/warm_cache.py's warm() ran for the company first (not timed)
+The fake agents run the suggested searches when the prompt has them, and
+one search per task otherwise. Resource collection is the same in all three.
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+from loguru import logger
+
+from benchmarks.fakes import install_fakes
+from src.config.settings import settings
+from src.tools.warming import research_queries, use_case_queries, warm
+
+SCENARIOS = ("cold", "prefetch", "warmed")
+
+
+def first_report(scenario: str, index: int, tavily_latency: float, llm_latency: float):
+    """Seconds and Tavily calls of one report for a new company"""
+    from crew.pipeline import run_market_research
+
+    client = install_fakes(tavily_latency=tavily_latency, llm_latency=llm_latency)
+    settings.TRACE_DIR = ""
+    settings.SEARCH_PREFETCH_ENABLED = scenario != "cold"
+    inputs = {"company_name": f"Warming Bench {scenario} {index}", "industry_name": "Steel manufacturing"}
+    if scenario == "warmed":
+        warm(research_queries(inputs) + use_case_queries(inputs))
+    calls_before = client.calls
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # crewai's verbose panels
+        run_market_research(inputs, run_id=f"bench-warming-{scenario}-{index}-{time.time_ns()}")
+    return time.perf_counter() - start, client.calls - calls_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=2, help="Reports per scenario")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Fake LLM latency per call (seconds)")
+    parser.add_argument("--tavily-latency", type=float, default=1.5, help="Fake Tavily latency per call (seconds)")
+    args = parser.parse_args()
+
+    logger.remove()
+    results = {}
+    for scenario in SCENARIOS:
+        runs = [first_report(scenario, i, args.tavily_latency, args.llm_latency) for i in range(args.reports)]
+        results[scenario] = (sum(s for s, _ in runs) / len(runs), sum(c for _, c in runs) / len(runs))
+
+    cold_seconds = results["cold"][0]
+    print(f"\nFirst report for a new company, mean of {args.reports} "
+          f"(LLM {args.llm_latency}s/call, Tavily {args.tavily_latency}s/call)")
+    print(f"{'scenario':<10}{'seconds':>9}{'vs cold':>9}{'Tavily calls in run':>21}")
+    for scenario, (seconds, calls) in results.items():
+        print(f"{scenario:<10}{seconds:>9.2f}{(seconds - cold_seconds) / cold_seconds:>+9.0%}{calls:>21.1f}")
+
+
+if __name__ == "__main__":
+    main()
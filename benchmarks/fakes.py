@@ -0,0 +1,199 @@
+"""Offline stand-ins for Tavily, Gemini and Redis, shared by the benchmarks.
+
+    fakes = install_fakes(tavily_latency=0.05, llm_latency=0.1)
+    run_market_research({"company_name": "Acme"})   # no network involved
+
+The fake LLM answers every pipeline task with a canned completion of the
+shape the real agents produce (so use case splitting and the proposal work),
+and makes one search tool call per task first, like the real agents do.
+"""
+import hashlib
+import json
+import random
+import re
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+from crewai.llms.base_llm import BaseLLM
+from loguru import logger
+
+from src.config.settings import settings
+from src.tools import tavily_tool
+from src.tools.clients import set_redis_client, set_tavily_client
+from src.tools.rate_limit import tavily_limiter
+
+LOREM = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt. "
+
+
+class FakeTavilyClient:
+    """Stand-in for TavilyClient: fixed latency, advanced-depth shaped payloads"""
+
+    def __init__(self, latency: float = 0.05, content_chars: int = 1500, seed: int = 7):
+        self.latency = latency
+        self.content_chars = content_chars
+        self.random = random.Random(seed)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def search(self, query: str, search_depth: str = "advanced", max_results: int = 5):
+        with self._lock:
+            self.calls += 1
+            scores = [round(self.random.random(), 4) for _ in range(max_results)]
+        time.sleep(self.latency)
+        content = (f"{query}. " + LOREM * (self.content_chars // len(LOREM) + 1))[:self.content_chars]
+        return {
+            "query": query,
+            "follow_up_questions": None,
+            "answer": None,
+            "images": [],
+            "results": [
+                {
+                    "title": f"{query} #{i}",
+                    "url": f"https://www.kaggle.com/datasets/example/{abs(hash((query, i))) % 10**8}",
+                    "content": content,
+                    "score": score,
+                    "raw_content": None,
+                }
+                for i, score in enumerate(scores)
+            ],
+            "response_time": self.latency,
+        }
+
+
+def canned_completion(task_name: str, use_cases: int = 5) -> str:
+    """Final answer the real agent would give for the task, in the expected format"""
+    if task_name == "research_task":
+        return (
+            "- Target: Example Corp\n- Industry & Sector: Manufacturing, Steel\n"
+            "- Key Offerings: Special bar quality steel, wire rod\n"
+            "- Strategic Focus Area:\n  - Operational efficiency\n  - Sustainability\n"
+            "- key Business Functions/Departments: Operations, Maintenance, Supply Chain, Quality Assurance"
+        )
+    if task_name == "use_case_generation_task":
+        return "\n\n".join(
+            f"Use case title: Use case {i}\nObjective/Use Case: {LOREM}\nAI Application: Time series forecasting\n"
+            f"Cross-Functional Benefits:\n- Operations: {LOREM}\n- Finance: {LOREM}"
+            for i in range(use_cases)
+        )
+    if task_name == "resource_collection_task":
+        return (
+            f"Use case title: Use case\nObjective/Use Case: {LOREM}\nPotential Resources:\n"
+            "- https://www.kaggle.com/datasets/example/steel-defects\n- https://github.com/example/forecasting"
+        )
+    return "# AI Use Case Proposal for Example Corp\n\n" + "\n\n".join(
+        f"## Use case {i}\n{LOREM * 3}\n\n### Potential Resources\n- https://www.kaggle.com/datasets/example/{i}"
+        for i in range(use_cases)
+    )
+
+
+def suggested_searches(prompt: str) -> List[str]:
+    """Queries the pipeline suggests in the prompt (see _with_prefetch), which a real agent runs first"""
+    match = re.search(r"Suggested searches[^\n]*:\n((?:- [^\n]+\n?)+)", prompt)
+    return [line[2:].strip() for line in match.group(1).splitlines()] if match else []
+
+
+class FakeLLMTimeout(Exception):
+    """Raised like litellm's Timeout when a call takes longer than the LLM's timeout"""
+
+
+class FakeLLM(BaseLLM):
+    """Gemini stand-in: sleeps `latency` and returns canned ReAct answers per task.
+
+    The first call of a task with tools asks for a search (the suggested
+    searches if the prompt has any, batch search for the resource collection,
+    a single search otherwise), the next one gives the final answer.
+    """
+
+    latency: float = 0.1
+    use_cases: int = 5
+    # Request timeout, as crewai's LLM(timeout=...) (the agent's latency budget)
+    timeout: Optional[float] = None
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        if self.timeout and self.latency > self.timeout:
+            time.sleep(self.timeout)
+            raise FakeLLMTimeout(f"{self.model} did not answer within {self.timeout}s")
+        time.sleep(self.latency)
+        text = messages if isinstance(messages, str) else "\n".join(str(m.get("content", "")) for m in messages)
+        task_name = getattr(from_task, "name", None) or ""
+        first_call = isinstance(messages, str) or len(messages) <= 2
+        # Queries unique to the prompt (company and use case), like real ones
+        topic = hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]
+        suggested = suggested_searches(text)
+        if first_call and suggested and "tavily_batch_search_with_cache" in text:
+            action_input = {"queries": suggested, "search_depth": "advanced", "max_results": 5}
+            return f"Thought: I start with the suggested searches\nAction: tavily_batch_search_with_cache\nAction Input: {json.dumps(action_input)}"
+        if first_call and task_name == "resource_collection_task" and "tavily_batch_search_with_cache" in text:
+            action_input = {"queries": [f"{topic} dataset kaggle", f"{topic} github repository"],
+                            "search_depth": "advanced", "max_results": 5}
+            return f"Thought: I need resources\nAction: tavily_batch_search_with_cache\nAction Input: {json.dumps(action_input)}"
+        if first_call and "tavily_search_with_cache" in text:
+            action_input = {"query": f"{topic} industry overview", "search_depth": "advanced", "max_results": 5}
+            return f"Thought: I need to search\nAction: tavily_search_with_cache\nAction Input: {json.dumps(action_input)}"
+        return f"Thought: I now know the final answer\nFinal Answer: {canned_completion(task_name, self.use_cases)}"
+
+
+def fake_provider_llm(latency: float, model_latencies: Optional[Dict[str, float]] = None):
+    """Stand-in for crew.agents.provider_llm: a FakeLLM taking `latency` per call, or the
+    model's entry in `model_latencies`, behind the production routing and wrappers"""
+    def provider_llm(model: str, temperature: float, max_tokens: int = 0, timeout: float = 0, stream: bool = False) -> BaseLLM:
+        return FakeLLM(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens or None,
+            stream=stream,
+            latency=(model_latencies or {}).get(model, latency),
+            timeout=timeout or None,
+        )
+    return provider_llm
+
+
+def install_fakes(
+    tavily_latency: float = 0.05,
+    llm_latency: float = 0.1,
+    use_redis: bool = True,
+    llm_cache_policy: str = "off",
+    model_latencies: Optional[Dict[str, float]] = None,
+) -> FakeTavilyClient:
+    """Point the app at the fakes: Tavily client, fakeredis and the fake LLM
+    (`llm_latency` per call, or the model's entry in `model_latencies`).
+
+    Provider quotas are lifted (the rate limiters would otherwise dominate
+    every timing) and the LLM cache is off unless asked for, so every run
+    does the full work.
+    """
+    client = FakeTavilyClient(latency=tavily_latency)
+    set_tavily_client(client)
+    redis_client = None
+    if use_redis:
+        try:
+            import fakeredis
+            redis_client = fakeredis.FakeStrictRedis(decode_responses=True)
+        except ImportError:
+            logger.warning("fakeredis not installed, running without the Redis tiers")
+    set_redis_client(redis_client)
+    tavily_tool.l1_cache.clear()
+
+    settings.LLM_CACHE_POLICY = llm_cache_policy
+    # A resource index of its own, so runs neither use nor fill the real one
+    settings.RESOURCE_INDEX_PATH = f"{tempfile.mkdtemp(prefix='bench-resources-')}/resource_index.sqlite3"
+    settings.LLM_RATE_LIMIT_PER_MINUTE = 0
+    tavily_limiter.bucket.rate = 0
+
+    import crew.agents
+    import src.crew.agents
+    # main.py imports the pipeline as crew.pipeline, the job workers as src.crew.pipeline
+    for agents in (crew.agents, src.crew.agents):
+        agents.provider_llm = fake_provider_llm(llm_latency, model_latencies)
+    return client
+
+
+def percentiles(samples, *points: float) -> Dict[str, Optional[float]]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {f"p{int(p * 100)}": None for p in points}
+    return {f"p{int(p * 100)}": ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))] for p in points}
@@ -0,0 +1,254 @@
+"""Offline benchmark suite: cache throughput, orchestration overhead, end-to-end
+latency by concurrency and PDF rendering. No network: Tavily, Gemini and
+Redis are replaced by the stand-ins in benchmarks/fakes.py.
+
+Run from the repo root:
+    python -m benchmarks.run_all                 # run, compare with the baseline
+    python -m benchmarks.run_all --save          # run and record a new baseline
+    python -m benchmarks.run_all --suites cache pdf --quick
+
+Results are written as JSON (--output). Compared with the committed baseline
+(benchmarks/baselines/baseline.json), every metric that got worse by more
+than --tolerance is flagged, and --check turns flags into a failing exit
+code. Timings depend on the machine: record the baseline on the machine
+the comparison runs on, and expect the micro-benchmarks (cache, pdf) to
+swing by tens of percent on shared CI hosts.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict
+
+import benchmarks  # noqa: F401  (sets up sys.path)
+from loguru import logger
+
+from benchmarks.fakes import FakeLLM, install_fakes, percentiles
+from src.config.settings import settings
+
+BASELINE_PATH = Path(benchmarks.ROOT_DIR) / "benchmarks" / "baselines" / "baseline.json"
+
+# Metric name suffixes where a higher value is better; everything else is a duration
+HIGHER_IS_BETTER = ("_per_second", "_per_minute")
+
+
+def ops_per_second(fn: Callable[[int], None], count: int, repeat: int = 3) -> float:
+    """Best of `repeat` rounds of `count` calls, the least disturbed by other load"""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(count):
+            fn(i)
+        best = max(best, count / (time.perf_counter() - start))
+    return round(best, 1)
+
+
+def best_seconds(fn: Callable[[], object], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# --- Suites ---
+
+def bench_cache(quick: bool) -> Dict[str, float]:
+    """Throughput of the search result tiers and of LLM completion cache hits"""
+    from src.tools import tavily_tool
+    from src.tools.cache import LocalTTLCache
+    from crew.llm import CachedLLM
+
+    count = 2000 if quick else 20000
+    payload = json.dumps({"results": [{"content": "x" * 400}] * 5})
+    l1 = LocalTTLCache(max_bytes=64 * 1024 * 1024, ttl=3600)
+    results = {
+        "l1_set_per_second": ops_per_second(lambda i: l1.set(f"k{i}", payload), count),
+        "l1_get_per_second": ops_per_second(lambda i: l1.get(f"k{i}"), count),
+    }
+
+    install_fakes(tavily_latency=0.0)
+    tool = tavily_tool.create_search_tools()["search"]
+    queries = [f"cache benchmark query {i}" for i in range(count // 20)]
+    for query in queries:
+        tool._search(query, "advanced", 5)
+    results["search_l1_hit_per_second"] = ops_per_second(
+        lambda i: tool._search(queries[i % len(queries)], "advanced", 5), count // 4
+    )
+
+    def l2_hit(i):
+        tavily_tool.l1_cache.clear()
+        tool._search(queries[i % len(queries)], "advanced", 5)
+    results["search_l2_hit_per_second"] = ops_per_second(l2_hit, count // 10)
+
+    batch_tool = tavily_tool.create_search_tools()["batch_search"]
+
+    def batch_l2_hit(i):
+        tavily_tool.l1_cache.clear()
+        batch_tool._search(queries[(i * 10) % len(queries):][:10], "advanced", 5)
+    results["batch_search_10_l2_hit_per_second"] = ops_per_second(batch_l2_hit, count // 100)
+
+    llm = CachedLLM.wrap(FakeLLM(model="fake-gemini", temperature=0.0, latency=0.0), policy="always")
+    messages = [{"role": "user", "content": f"prompt {i} " * 200} for i in range(50)]
+    for message in messages:
+        llm.call([message])
+    results["llm_cache_hit_per_second"] = ops_per_second(lambda i: llm.call([messages[i % len(messages)]]), count // 10)
+    return results
+
+
+def _run_reports(count: int, concurrency: int, prefix: str):
+    """Generate `count` distinct reports, `concurrency` at a time; returns per-report seconds"""
+    from src.crew.pipeline import run_market_research
+
+    def one(i: int) -> float:
+        start = time.perf_counter()
+        run_market_research({"company_name": f"{prefix} Corp {i}", "industry_name": "Steel"})
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(one, range(count)))
+    return latencies, time.perf_counter() - start
+
+
+def bench_orchestration(quick: bool, llm_latency: float, tavily_latency: float) -> Dict[str, float]:
+    """Time spent per task outside LLM and tool calls (crewai, prompts, our wrappers)"""
+    install_fakes(tavily_latency=tavily_latency, llm_latency=llm_latency)
+    runs = 2 if quick else 5
+    with tempfile.TemporaryDirectory() as trace_dir:
+        settings.TRACE_DIR = trace_dir
+        _run_reports(runs, 1, "orchestration")
+        traces = [json.loads(path.read_text()) for path in Path(trace_dir).glob("*.json")]
+
+    overhead: Dict[str, list] = {}
+    for trace in traces:
+        spans = trace["spans"]
+        for task in (s for s in spans if s["kind"] == "task"):
+            inner = sum(s["duration"] for s in spans if s["parent_id"] == task["span_id"] and s["kind"] in ("llm", "tool"))
+            overhead.setdefault(task["name"], []).append(task["duration"] - inner)
+    return {f"{name}_overhead_seconds": round(statistics.median(values), 4) for name, values in sorted(overhead.items())}
+
+
+def bench_end_to_end(quick: bool, llm_latency: float, tavily_latency: float) -> Dict[str, float]:
+    """Report latency and throughput with several reports generated at once"""
+    install_fakes(tavily_latency=tavily_latency, llm_latency=llm_latency)
+    settings.TRACE_DIR = ""
+    results = {}
+    for concurrency in ((1, 4) if quick else (1, 2, 4, 8)):
+        latencies, elapsed = _run_reports(concurrency * 2, concurrency, f"c{concurrency}")
+        points = percentiles(latencies, 0.5, 0.95)
+        results[f"c{concurrency}_p50_seconds"] = round(points["p50"], 3)
+        results[f"c{concurrency}_p95_seconds"] = round(points["p95"], 3)
+        results[f"c{concurrency}_reports_per_minute"] = round(len(latencies) / elapsed * 60, 1)
+    return results
+
+
+def bench_pdf(quick: bool) -> Dict[str, float]:
+    """Render time by report size, and a content-hash cache hit"""
+    from benchmarks.bench_pdf import synthetic_report
+    from src.reports import pdf
+
+    results = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        settings.PDF_CACHE_DIR = cache_dir
+        pdf.render_pdf("# warm up")  # first render pays for importing and setting up xhtml2pdf
+        for scale in ((1,) if quick else (1, 4)):
+            report = synthetic_report(scale)
+            results[f"render_x{scale}_seconds"] = round(best_seconds(lambda: pdf.render_pdf(report)), 3)
+            pdf._store(pdf.pdf_key(report), pdf.render_pdf(report))
+
+            def disk_hit():
+                pdf._memory_cache.clear()
+                pdf.get_cached_pdf(report)
+            results[f"cached_x{scale}_disk_hit_ms"] = round(best_seconds(disk_hit) * 1000, 3)
+    return results
+
+
+# --- Comparison ---
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> int:
+    """Print current vs baseline per metric; returns the number of regressions"""
+    regressions = 0
+    settings_used = ("quick", "llm_latency", "tavily_latency")
+    if baseline and any(baseline["meta"].get(k) != current["meta"][k] for k in settings_used):
+        print(f"\n⚠️ The baseline was recorded with other settings: {[(k, baseline['meta'].get(k)) for k in settings_used]}")
+    print(f"\n{'metric':<60}{'baseline':>12}{'current':>12}{'change':>10}")
+    for suite, metrics in current["results"].items():
+        for name, value in metrics.items():
+            before = baseline.get("results", {}).get(suite, {}).get(name)
+            label = f"{suite}.{name}"
+            if before in (None, 0) or value is None:
+                print(f"{label:<60}{'-':>12}{value:>12}{'new':>10}")
+                continue
+            change = (value - before) / before
+            worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+            flag = ""
+            if worse > tolerance:
+                regressions += 1
+                flag = "  <-- regression"
+            print(f"{label:<60}{before:>12}{value:>12}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", nargs="+", default=["cache", "orchestration", "end_to_end", "pdf"],
+                        choices=["cache", "orchestration", "end_to_end", "pdf"], help="Suites to run")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations and concurrency levels")
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="Fake LLM latency per call (seconds)")
+    parser.add_argument("--tavily-latency", type=float, default=0.05, help="Fake Tavily latency per call (seconds)")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write this run's results")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline to compare with")
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown per metric")
+    parser.add_argument("--check", action="store_true", help="Exit with 1 when a metric regressed")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    suites = {
+        "cache": lambda: bench_cache(args.quick),
+        "orchestration": lambda: bench_orchestration(args.quick, args.llm_latency, args.tavily_latency),
+        "end_to_end": lambda: bench_end_to_end(args.quick, args.llm_latency, args.tavily_latency),
+        "pdf": lambda: bench_pdf(args.quick),
+    }
+    current = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": args.quick,
+            "llm_latency": args.llm_latency,
+            "tavily_latency": args.tavily_latency,
+        },
+        "results": {},
+    }
+    for name in args.suites:
+        print(f"⏱️  {name}...", file=sys.stderr)
+        current["results"][name] = suites[name]()
+
+    Path(args.output).write_text(json.dumps(current, indent=2))
+    if args.save:
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.baseline).write_text(json.dumps(current, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    baseline = json.loads(Path(args.baseline).read_text()) if Path(args.baseline).exists() else {}
+    regressions = compare(current, baseline, args.tolerance)
+    print(f"\n{regressions} regression(s) beyond {args.tolerance:.0%}; results in {args.output}")
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,237 @@
+import math
 import re
-from io import BytesIO
-from xhtml2pdf import pisa
-import markdown2
+import sqlite3
+import time
 import streamlit as st
-from src.crew.crew import market_research_crew #
 from loguru import logger
-from crewai.crews.crew_output import CrewOutput
+from src.config.settings import settings
+
+# crewai/litellm and the PDF stack are slow to import, so they are only loaded
+# when a report is generated or exported, never on a plain page render.
 
 st.set_page_config(page_title='Research Agent', layout='wide')
 st.title('Market Research & Use Case Generation Agent')
 
 # --- Helper Functions ---
+@st.cache_resource(show_spinner="Connecting to the report workers...")
+def load_job_queue():
+    """Reports are generated by background workers, see src/jobs"""
+    from src.jobs.queue import get_job_queue
+    return get_job_queue()
+
+@st.cache_resource
+def export_metrics():
+    """Prometheus metrics of this app process, see METRICS_PORT / METRICS_FILE"""
+    from src.telemetry.metrics import start_metrics_export
+    start_metrics_export()
+
+@st.cache_resource
+def load_report_store():
+    """Finished reports on disk, see src/reports/store.py; sessions only keep report IDs"""
+    from src.reports.store import get_report_store
+    return get_report_store()
+
+export_metrics()
+
+STAGE_TITLES = {
+    "research": "🔬 Research summary",
+    "use_cases": "💡 Use cases",
+    "resources": "📚 Resources",
+    "synthesis": "📝 Proposal",
+}
+CACHE_TIER_LABELS = {
+    "l1": "memory cache",
+    "l2": "Redis cache",
+    "near_duplicate": "similar query cache",
+    "coalesced": "shared in-flight search",
+    "resource_index": "local resource index",
+}
+
+REPORT_SOURCE_NOTES = {
+    "cached": "♻️ Served a cached report generated recently for the same inputs.",
+    "stale": "♻️ Served a cached report; a fresh one is being generated in the background.",
+    "stored": "🗂️ Opened the report generated earlier for the same inputs. Tick \"Ignore cached reports\" to generate a new one.",
+}
+
+def new_progress_view(target_display: str) -> dict:
+    """What the progress panel shows for a job, rebuilt from its events"""
+    return {
+        "target": target_display,
+        "label": f"🤖 Crew is working on the report for **{target_display}**...",
+        "outputs": {stage: [] for stage in STAGE_TITLES},
+        "tool_log": [],
+        "tokens": "",
+        "offset": 0,  # Events of the job already folded in
+        "state": "running",
+    }
+
+def apply_progress_events(view: dict, events: list) -> None:
+    for event in events:
+        kind, stage = event["kind"], event["stage"]
+        if kind == "stage_started":
+            view["label"] = f"{STAGE_TITLES[stage]}: in progress..."
+            view["tokens"] = ""
+        elif kind == "task_output" and stage in view["outputs"]:
+            view["outputs"][stage].append(event["text"])
+            view["tokens"] = ""
+        elif kind == "tool_call":
+            data = event["data"]
+            source = CACHE_TIER_LABELS.get(data.get("cache_tier"), "Tavily API")
+            icon = "❌" if data.get("status") == "error" else ("♻️" if data.get("cache_tier") else "🌐")
+            view["tool_log"].append(f"{icon} `{event['text']}` — {source}")
+        elif kind == "token":
+            view["tokens"] = (view["tokens"] + event["text"])[-1500:]
+    view["offset"] += len(events)
+
+def render_progress(view: dict) -> None:
+    running = view["state"] == "running"
+    with st.status(view["label"], state=view["state"], expanded=running):
+        for stage, outputs in view["outputs"].items():
+            if outputs:
+                with st.expander(f"{STAGE_TITLES[stage]} ({len(outputs)})", expanded=stage == "research"):
+                    st.markdown("\n\n---\n\n".join(outputs))
+        if view["tool_log"]:
+            st.markdown("**🔎 Searches**\n\n" + "\n".join(f"- {line}" for line in view["tool_log"][-8:]))
+        if running and view["tokens"]:
+            st.caption(view["tokens"])
+
+def job_progress_panel():
+    """Progress of the session's report job; only polled while the job is queued or running"""
+    view = st.session_state.get("job_view")
+    if not view:
+        return
+    if st.session_state.get("job_id"):
+        job_progress_poller()
+    else:
+        # Final state, no timer
+        render_progress(view)
+
+@st.fragment(run_every=1.0)
+def job_progress_poller():
+    """Poll the session's report job and show its progress; reruns the page once it ends"""
+    view = st.session_state.get("job_view")
+    job_id = st.session_state.get("job_id")
+    if not (view and job_id):
+        return
+    job_queue = load_job_queue()
+    try:
+        job = job_queue.get(job_id)
+        events = job_queue.events(job_id, view["offset"])
+        pending = job_queue.pending() if job and job.status == "queued" else 0
+        stalled = job is not None and not job.finished and job_queue.is_stalled(job)
+    except ConnectionError as e:
+        logger.warning(f"Could not poll report job {job_id}: {str(e)}")
+        st.warning("⚠️ Lost contact with the job queue, retrying...")
+        return
+    if job is None:
+        finish_job(None, "Error: The report job expired or was lost, please generate the report again.")
+        st.rerun()
+    apply_progress_events(view, events)
+    if job.status == "queued" and not stalled:
+        st.info(f"⏳ Waiting for a free worker ({pending} reports queued)...")
+        return
+    if job.finished or stalled:
+        if job.status == "done":
+            finish_job(job.result, source=job.source, job=job)
+        else:
+            finish_job(None, f"Unexpected Error: {job.error or 'the report job was lost (its worker stopped responding).'}")
+        # The full rerun shows the report and renders the panel without the poller
+        st.rerun()
+    render_progress(view)
+
+def finish_job(result_raw, error: str | None = None, source: str | None = None, job=None) -> None:
+    """Store the outcome of the session's report job for the results section"""
+    view = st.session_state.job_view
+    view["state"] = "error" if error else "complete"
+    view["label"] = f"Report for **{view['target']}** finished"
+    st.session_state.job_id = None
+    st.session_state.report_source = source
+    st.session_state.report_id = None
+    st.session_state.report_text = None
+    st.session_state.error_message = None
+    if error:
+        logger.error(f"Report job failed: {error}")
+        st.session_state.error_message = error
+    # Check if result is valid before cleaning 
+    elif result_raw and isinstance(result_raw, str) and result_raw.strip():
+        result_clean = remove_markdown_fences(text=result_raw)
+        logger.debug("Result cleaned")
+        keep_report(job.inputs if job else {}, result_clean, source, job_timings(job))
+    else:
+        logger.debug("Crew returned empty output.")
+        st.session_state.error_message = "Error: Process completed but returned no result."
+
+def job_timings(job) -> dict:
+    if job is None or not job.started_at:
+        return {}
+    return {
+        "queued_seconds": round(job.started_at - job.created_at, 1),
+        "run_seconds": round((job.finished_at or time.time()) - job.started_at, 1),
+    }
+
+def keep_report(inputs: dict, markdown: str, source: str | None, timings: dict) -> None:
+    """Save a finished report in the report store; the session only keeps its ID"""
+    from src.reports.store import save_report
+    report_id = save_report(inputs, markdown, source=source, timings=timings)
+    st.session_state.report_id = report_id
+    # Without the store (e.g. a read-only disk) the session holds the report itself
+    st.session_state.report_text = None if report_id else markdown
+
+def open_stored_report(report_id: str, source: str | None = None) -> None:
+    """Show a report of the report store in the results section"""
+    st.session_state.run_triggered = True
+    st.session_state.job_id = None
+    st.session_state.job_view = None
+    st.session_state.report_id = report_id
+    st.session_state.report_text = None
+    st.session_state.error_message = None
+    st.session_state.report_source = source
+
+def find_stored_report(inputs: dict) -> dict | None:
+    """A report for these inputs younger than REPORT_CACHE_STALE_AFTER, so the crew is not run again"""
+    try:
+        stored = load_report_store().latest_for(inputs)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not search the report store: {str(e)}")
+        return None
+    if stored and time.time() - stored["created_at"] < settings.REPORT_CACHE_STALE_AFTER:
+        return stored
+    return None
+
+def history_panel():
+    """Past reports in the sidebar, a page at a time; a report's text is only read when it is opened"""
+    page_size = settings.REPORT_HISTORY_PAGE_SIZE
+    page = st.session_state.get("history_page", 0)
+    with st.sidebar:
+        st.subheader("🗂️ Report history")
+        try:
+            store = load_report_store()
+            total = store.count()
+            reports = store.list(offset=page * page_size, limit=page_size)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read the report store: {str(e)}")
+            st.warning("⚠️ The report history is unavailable.")
+            return
+        if not total:
+            st.caption("Generated reports will be listed here.")
+            return
+        # Opening a past report would stop following the running job
+        busy = bool(st.session_state.get("job_id"))
+        for report in reports:
+            saved_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(report["updated_at"]))
+            if st.button(f"{report['target']} · {saved_at}", key=f"history_{report['id']}", disabled=busy):
+                open_stored_report(report["id"])
+        pages = math.ceil(total / page_size)
+        previous_col, page_col, next_col = st.columns([1, 2, 1])
+        if previous_col.button("◀", key="history_previous", disabled=page == 0):
+            st.session_state.history_page = page - 1
+            st.rerun()
+        page_col.caption(f"Page {page + 1} of {pages} ({total} reports)")
+        if next_col.button("▶", key="history_next", disabled=page + 1 >= pages):
+            st.session_state.history_page = page + 1
+            st.rerun()
+
+
 def remove_markdown_fences(text):
     """Removes the ```markdown ... ``` fences."""
     # Ensure input is a string
@@ -20,54 +241,62 @@ def remove_markdown_fences(text):
     text = re.sub(r'\s*```$', '', text)
     return text
 
-def convert_markdown_to_pdf(markdown_content: str) -> BytesIO | None:
-    """Converts a Markdown string to a PDF byte stream"""
-    # Convert markdown to HTML
-    try:
-        html_content = markdown2.markdown(
-            markdown_content,
-            extras=["tables", "fenced-code-blocks", "strike", "break-on-newline"]
+@st.fragment
+def pdf_download_panel(report_content: str, base_filename: str, report: dict | None = None):
+    """PDF export of the report; rendered in a worker process on request, never on a plain rerun.
+    `report` is its report store entry, which keeps the rendered PDF. Only polled while a
+    rendering is pending."""
+    from src.reports.pdf import PdfRenderError, get_cached_pdf, pdf_key, remember_pdf, request_pdf
+
+    key = pdf_key(report_content)
+    pdf = get_cached_pdf(report_content)
+    if pdf is None and report and report["has_pdf"]:
+        pdf = load_report_store().get_pdf(report["id"])
+        if pdf is not None:
+            remember_pdf(report_content, pdf)
+    future = st.session_state.get('pdf_future') if st.session_state.get('pdf_key') == key else None
+    if pdf is None and future is not None and future.done():
+        try:
+            pdf = future.result()
+        except PdfRenderError as e:
+            st.error(f"Could not generate PDF version: {str(e)}")
+            logger.error("PDF rendering failed, button not added.")
+            st.session_state.pdf_future = None
+            return
+        if report:
+            try:
+                load_report_store().attach_pdf(report["id"], pdf)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not save the PDF in the report store: {str(e)}")
+
+    if pdf is not None:
+        st.download_button(
+            label='Download as PDF (.pdf)',
+            data=pdf,
+            file_name=f"{base_filename}.pdf",
+            mime="application/pdf",
         )
-        html_with_style = f"""
-        <!DOCTYPE html>
-        <html>
-        <head><meta charset="UTF-8">
-            <style>
-            body {{ font-family: sans-serif; line-height: 1.6; }} h1, h2, h3 {{ color: #333; }}
-            a {{ color: #007bff; text-decoration: none; }} ul {{ margin-left: 20px; }}
-            li {{ margin-bottom: 5px; }} pre {{ background-color: #f4f4f4; padding: 10px; border-radius: 5px; overflow-x: auto; }}
-            code {{ font-family: monospace; }} table {{ border-collapse: collapse; width: 100%; margin-bottom: 1em; }}
-            th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }} th {{ background-color: #f2f2f2; }}
-            </style>
-        </head>
-        <body>
-        {html_content}
-        </body>
-        </html>
-        """
-    except Exception as e:
-        logger.debug(f" Error converting Markdown to HTML: {str(e)}") # logger.debug error
-        st.error(f"Error converting Markdown to HTML: {str(e)}")
-        return None
-    # Create PDF from HTML
-    pdf_stream = BytesIO()
-    try:
-        pisa_status = pisa.CreatePDF(BytesIO(html_with_style.encode('utf-8')), dest=pdf_stream, encoding='utf-8')
-        if pisa_status.err:
-            logger.debug(f" Error during PDF generation: {pisa_status.err}") # logger.debug error
-            st.error(f"Error during PDF generation: {pisa_status.err}")
-            return None
-        else:
-            pdf_stream.seek(0)
-            logger.debug(" PDF generation successful.") # logger.debug success
-            return pdf_stream
-    except Exception as e:
-        logger.debug(f" Error converting HTML to PDF: {str(e)}") # logger.debug error
-        st.error(f"Error converting HTML to PDF: {str(e)}")
-        return None
+        logger.debug("Added PDF download button")
+    elif future is not None or st.button("📄 Prepare PDF"):
+        if future is None:
+            logger.info("Requesting markdown to pdf conversion")
+            st.session_state.pdf_key = key
+            st.session_state.pdf_future = request_pdf(report_content)
+        pdf_render_poller(key)
+
+@st.fragment(run_every=1.0)
+def pdf_render_poller(key: str):
+    """Wait for the session's PDF rendering of the report with `key`; reruns the page once it ends"""
+    future = st.session_state.get('pdf_future') if st.session_state.get('pdf_key') == key else None
+    if future is None or future.done():
+        # The full rerun shows the download button and renders the panel without the poller
+        st.rerun()
+    st.caption("📄 Preparing the PDF...")
 
 # --- Main App Logic ---
 
+history_panel()
+
 st.markdown("---")
 st.subheader("Enter the company or industry name you want to research")
 col1, col2 = st.columns(2)
@@ -76,89 +305,101 @@ company_input = col1.text_input(label='Enter company name', key='company_name_in
 industry_input = col2.text_input(label='Enter industry name', key='industry_name_input')
 
 run_button = st.button("✨ Generate Report", type="primary", disabled=not (company_input or industry_input))
+force_refresh = st.checkbox("Ignore cached reports", value=False, help="Run the full crew even if a recent report for these inputs exists.")
 
 # --- Initialize Session State ---
-if 'crew_result' not in st.session_state:
-    st.session_state.crew_result = None   
+# Finished reports live in the report store; the session keeps the ID of the one shown
+if 'report_id' not in st.session_state:
+    st.session_state.report_id = None
+if 'report_text' not in st.session_state:
+    st.session_state.report_text = None
 if 'run_triggered' not in st.session_state:
     st.session_state.run_triggered = False
-if 'is_error' not in st.session_state:
-    st.session_state.is_error = False
+if 'error_message' not in st.session_state:
+    st.session_state.error_message = None
+
+# Set by the "Resume" button shown after a failed run
+resume_run = st.session_state.pop('resume_requested', False)
 
-if run_button: 
+if run_button or resume_run: 
     if not (company_input or industry_input): 
         st.error("Please provide either a Company Name or an Industry Name.")
     else:
         # Reset state for new run
         st.session_state.run_triggered = True
-        st.session_state.is_error = False
-        st.session_state.crew_result = None
+        st.session_state.error_message = None
+        st.session_state.report_id = None
+        st.session_state.report_text = None
 
         crew_inputs = {'company_name': company_input, 'industry_name': industry_input}
         target_display = company_input if company_input else industry_input
         logger.info(f"Run triggered for: {target_display}")
-        
-        try:
-            with st.spinner(f"🤖 Crew is working on the report for **{target_display}**... This may take a few minutes."):
-                logger.info("Kicking off Crew...")
-                result_raw = market_research_crew.kickoff(inputs=crew_inputs)
-                logger.info(f"Crew kickoff finished. Raw result type: {type(result_raw)}")
-
-                # Check if result is valid before cleaning 
-                if result_raw and isinstance(result_raw, str) and result_raw.strip():
-                    result_clean = remove_markdown_fences(text=result_raw)
-                    logger.debug("Result cleaned")
-                    st.session_state.crew_result = result_clean
-                    st.session_state.is_error = False
-                elif result_raw is None:
-                    logger.debug("Crew returned empty output.")
-                    st.session_state.crew_result = "Error: Process completed but returned no result."
-                    st.session_state.is_error = True
-                elif result_raw and isinstance(result_raw, CrewOutput):
-                    # Convert the Crew ouput to str and try again 
-                    logger.debug("Converting raw response from crew to <str>")
-                    try:
-                        result_str = str(result_raw)
-                        result_clean = remove_markdown_fences(text=result_str)
-                        logger.info(f"Resposne cleaned and converted to: type(result_str)")
-                        st.session_state.crew_result = result_clean
-                        st.session_state.is_error = False
-                    except Exception as e:
-                        logger.error(f"Crew respose output type: {type(result_raw)}, but failed to convert to <str>")
-                        st.error(f"Unable to process response type: {type(result_raw)}")
-                        st.session_state.crew_result = "Error: Response Invalid and could not be converted to a valid response."
-                        st.session_state.is_error = True
-
-        except ConnectionError as e:
-            logger.error(f"Connection Error during Kickoff: {str(e)}")
-            st.error(f"Connection Error: {str(e)}")
-            st.session_state.is_error = True
-            st.session_state.crew_result = f"Error: Connection Error - {str(e)}"
-        except Exception as e:
-            logger.error(f"Unexpected Error occured: {str(e)}")
-            st.error(f"Unexpected Error: {str(e)}")
-            st.exception(e)
-            st.session_state.is_error = True
-            st.session_state.crew_result = f"Unexpected Error: {str(e)}"
-
-        logger.debug(f"Run finished. is_error: '{st.session_state.is_error}', Result stored: '{st.session_state.crew_result[:100]}'")
+
+        stored = None if force_refresh or resume_run else find_stored_report(crew_inputs)
+        if stored:
+            logger.info(f"Opening stored report {stored['id']} for: {target_display}")
+            open_stored_report(stored["id"], source="stored")
+        else:
+            try:
+                from src.jobs.queue import QueueFullError
+                logger.info("Queueing report job..." if not resume_run else "Queueing report job resuming from its last checkpoint...")
+                st.session_state.job_id = load_job_queue().submit(
+                    crew_inputs, resume=resume_run, force_refresh=force_refresh or resume_run
+                )
+                st.session_state.job_view = new_progress_view(target_display)
+            except QueueFullError as e:
+                logger.warning(f"Report job rejected: {str(e)}")
+                st.warning(f"⏳ Too many reports in progress: {str(e)}")
+                st.session_state.run_triggered = False
+            except ConnectionError as e:
+                logger.error(f"Connection Error during Kickoff: {str(e)}")
+                st.error(f"Connection Error: {str(e)}")
+                st.session_state.error_message = f"Error: Connection Error - {str(e)}"
+            except Exception as e:
+                logger.error(f"Unexpected Error occured: {str(e)}")
+                st.error(f"Unexpected Error: {str(e)}")
+                st.exception(e)
+                st.session_state.error_message = f"Unexpected Error: {str(e)}"
+
+        logger.debug(f"Run submitted. job_id: '{st.session_state.get('job_id')}', error: '{st.session_state.error_message}'")
 
 # --- Display results ---
 if st.session_state.get('run_triggered', False):
     logger.debug("Checking display condition...")
-    report_content = st.session_state.get('crew_result')
-    is_error_flag = st.session_state.get('is_error', False)
+    # Polls the running job; its final state stays visible above the report
+    job_progress_panel()
+    error_message = st.session_state.get('error_message')
+    report = None
+    if st.session_state.get('report_id'):
+        try:
+            report = load_report_store().get(st.session_state.report_id)
+        except sqlite3.Error as e:
+            logger.error(f"Could not load report {st.session_state.report_id}: {str(e)}")
+        if report is None and not error_message:
+            error_message = "Error: The report could not be loaded from the report store."
+    report_content = report["markdown"] if report else st.session_state.get('report_text')
 
-    if report_content:
+    if error_message or report_content:
         st.markdown("---")
         st.subheader("📊 Generated Report")
+        if st.session_state.get('report_source') in REPORT_SOURCE_NOTES:
+            st.info(REPORT_SOURCE_NOTES[st.session_state.report_source])
         logger.debug("Entering display block.")
 
-        if is_error_flag:
-            st.error(report_content)
-            logger.info(f"Displaying Error message: {report_content}")
+        if error_message:
+            st.error(error_message)
+            logger.info(f"Displaying Error message: {error_message}")
+            # Completed stages are checkpointed, so a retry only redoes the failed ones
+            if (company_input or industry_input) and st.button("🔁 Resume from the last completed step"):
+                st.session_state.resume_requested = True
+                st.rerun()
         else:
             try:
+                if report:
+                    run_seconds = report["timings"].get("run_seconds")
+                    saved_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(report["created_at"]))
+                    st.caption(f"Report {report['id'][:12]} for {report['target']}, generated {saved_at}"
+                               + (f" in {run_seconds:.0f}s" if run_seconds else ""))
                 logger.debug("Attempting to display the report markdown.")
                 st.markdown(report_content)
                 logger.debug("Markdown displayed.")
@@ -167,7 +408,9 @@ if st.session_state.get('run_triggered', False):
                 st.markdown("---")
                 st.subheader("⬇️ Download Report")
 
-                base_filename = re.sub(r'[^\w\-]+', '_', company_input or industry_input or "report")
+                report_inputs = report["inputs"] if report else {}
+                target = report_inputs.get('company_name') or report_inputs.get('industry_name') or company_input or industry_input
+                base_filename = re.sub(r'[^\w\-]+', '_', target or "report")
 
                 # 1. Markdown Download button
                 try:
@@ -182,33 +425,18 @@ if st.session_state.get('run_triggered', False):
                     st.error(f"Error showing MD download button: {str(e)}")
                     logger.error("Could not display MD download button")
                 
-                # 2. PDF download button 
+                # 2. PDF download button
                 try:
-                    # Convert to pdf 
-                    logger.info("Initiating markdown to pdf conversion")
-                    pdf_buffer = convert_markdown_to_pdf(markdown_content=report_content)
-                    if pdf_buffer:
-                        st.download_button(
-                            label='Download as PDf (.pdf)',
-                            data=pdf_buffer,  # Already BytesIO object
-                            file_name=f"{base_filename}.pdf",
-                            mime="application/pdf",
-                        )
-                        logger.debug("Added PDF download button")
-                    else:
-                        st.error("Could not generate PDF version.")
-                        logger.error("PDF buffer was none, button not added.")
+                    pdf_download_panel(report_content, base_filename, report)
                 except Exception as e:
                     st.error(f"An error occurred during PDF conversion: {str(e)}")
                     logger.error("PDF conversion failed")
             
             except Exception as e:
                 logger.error(f"Error in markdown dislplay block: {str(e)}")
-                st.session_state.is_error = True
-                st.session_state.crew_result = f"Error displaying report: {str(e)}"
+                st.session_state.error_message = f"Error displaying report: {str(e)}"
 
-    elif not is_error_flag:
+    elif not st.session_state.get('job_id'):
         # If run was triggered but result is still None/empty and not marked as error
         st.info("Processing the report...")
         print("[DEBUG] Run triggered, but result is None/empty and not an error.")
-
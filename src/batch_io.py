@@ -0,0 +1,21 @@
+import csv
+import json
+from typing import Dict, List
+
+
+def load_batch(path: str) -> List[Dict[str, str]]:
+    """Read company/industry pairs from a CSV file with a header row, or from JSONL"""
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    entries = []
+    for row in rows:
+        inputs = {
+            'company_name': (row.get('company_name') or row.get('company') or '').strip(),
+            'industry_name': (row.get('industry_name') or row.get('industry') or '').strip(),
+        }
+        if inputs['company_name'] or inputs['industry_name']:
+            entries.append(inputs)
+    return entries
@@ -0,0 +1,176 @@
+import argparse
+import json
+import zlib
+from typing import Dict, Iterator, List, Tuple
+from src.config.settings import settings
+from src.tools.cache_format import HEADER_SIZE, decode_entry, entry_info
+from src.tools.clients import get_redis_bytes_client
+from src.tools.resource_index import extract_resources, get_resource_index
+from src.tools.tavily_tool import CACHE_STATS_KEY, CACHE_USAGE_KEY, _split_cache_key
+from loguru import logger
+
+# Search result entries, see _build_cache_key (leases, indexes and counters live under other prefixes)
+ENTRY_PATTERNS = ("tavily:basic:*", "tavily:advanced:*")
+BATCH_SIZE = 500
+
+
+def _batches(redis_client) -> Iterator[List[bytes]]:
+    batch = []
+    for pattern in ENTRY_PATTERNS:
+        for key in redis_client.scan_iter(match=pattern, count=BATCH_SIZE):
+            batch.append(key)
+            if len(batch) == BATCH_SIZE:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def scan_entries(redis_client) -> List[Dict]:
+    """Size, format, hit count and remaining TTL of every search cache entry"""
+    entries = []
+    for keys in _batches(redis_client):
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.strlen(key)
+            pipe.getrange(key, 0, HEADER_SIZE - 1)
+            pipe.zscore(CACHE_USAGE_KEY, key)
+            pipe.ttl(key)
+        replies = pipe.execute()
+        for i, key in enumerate(keys):
+            stored_bytes, head, hits, ttl = replies[4 * i:4 * i + 4]
+            if not stored_bytes:
+                continue  # expired since the scan
+            version, raw_bytes = entry_info(head, stored_bytes)
+            entries.append({
+                "key": key,
+                "bytes": len(key) + stored_bytes,
+                "raw_bytes": len(key) + (raw_bytes or stored_bytes),
+                "version": version,
+                "hits": int(hits or 0),
+                "ttl": ttl,
+            })
+    return entries
+
+
+def cache_stats(redis_client) -> Dict:
+    """Key counts, sizes, compression ratio and hit rates of the Redis search cache"""
+    entries = scan_entries(redis_client)
+    counters = {k.decode(): int(v) for k, v in redis_client.hgetall(CACHE_STATS_KEY).items()}
+    stored = sum(e["bytes"] for e in entries)
+    raw = sum(e["raw_bytes"] for e in entries)
+    lookups = counters.get("hits", 0) + counters.get("misses", 0)
+    versions: Dict[str, int] = {}
+    for entry in entries:
+        versions[f"v{entry['version']}"] = versions.get(f"v{entry['version']}", 0) + 1
+    return {
+        "entries": len(entries),
+        "entries_by_format": versions,
+        "total_bytes": stored,
+        "avg_bytes": round(stored / len(entries)) if entries else 0,
+        "uncompressed_bytes": raw,
+        "compression_ratio": round(raw / stored, 2) if stored else 0.0,
+        "never_hit": sum(1 for e in entries if e["hits"] == 0),
+        "hits": counters.get("hits", 0),
+        "misses": counters.get("misses", 0),
+        "writes": counters.get("writes", 0),
+        "hit_rate": round(counters.get("hits", 0) / lookups, 4) if lookups else 0.0,
+        "budget_bytes": settings.TAVILY_CACHE_MAX_BYTES,
+    }
+
+
+def evict_to_budget(redis_client, max_bytes: int, dry_run: bool = False) -> Tuple[int, int]:
+    """Delete the least used entries (fewest hits, then closest to expiry) until the
+    cache fits in `max_bytes`. Returns (entries evicted, bytes freed)."""
+    entries = scan_entries(redis_client)
+    excess = sum(e["bytes"] for e in entries) - max_bytes
+    victims = []
+    for entry in sorted(entries, key=lambda e: (e["hits"], e["ttl"])):
+        if excess <= 0:
+            break
+        victims.append(entry)
+        excess -= entry["bytes"]
+
+    if not dry_run:
+        for start in range(0, len(victims), BATCH_SIZE):
+            pipe = redis_client.pipeline(transaction=False)
+            for entry in victims[start:start + BATCH_SIZE]:
+                namespace, canonical = _split_cache_key(entry["key"].decode("utf-8"))
+                pipe.delete(entry["key"])
+                pipe.zrem(CACHE_USAGE_KEY, entry["key"])
+                pipe.srem(f"tavily:index:{namespace}", canonical)
+            pipe.execute()
+    return len(victims), sum(e["bytes"] for e in victims)
+
+
+def prune_usage(redis_client) -> int:
+    """Drop hit counts of entries that expired; returns how many were dropped"""
+    members = [member for member, _ in redis_client.zscan_iter(CACHE_USAGE_KEY, count=BATCH_SIZE)]
+    stale = []
+    for start in range(0, len(members), BATCH_SIZE):
+        batch = members[start:start + BATCH_SIZE]
+        pipe = redis_client.pipeline(transaction=False)
+        for member in batch:
+            pipe.exists(member)
+        stale.extend(member for member, exists in zip(batch, pipe.execute()) if not exists)
+    for start in range(0, len(stale), BATCH_SIZE):
+        redis_client.zrem(CACHE_USAGE_KEY, *stale[start:start + BATCH_SIZE])
+    return len(stale)
+
+
+def backfill_resource_index(redis_client) -> Tuple[int, int]:
+    """Record the dataset and repository hits of every cached search in the local
+    resource index. Returns (searches with resources, resources recorded)."""
+    index = get_resource_index()
+    searches = recorded = 0
+    for keys in _batches(redis_client):
+        for key, value in zip(keys, redis_client.mget(keys)):
+            if not value:
+                continue
+            try:
+                resources = extract_resources(decode_entry(value))
+            except (ValueError, zlib.error):
+                continue
+            if resources:
+                _, canonical = _split_cache_key(key.decode("utf-8"))
+                searches += 1
+                recorded += index.add(resources, canonical)
+    return searches, recorded
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Inspect and trim the Redis search result cache.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    stats = commands.add_parser("stats", help="Key counts, sizes, compression ratio and hit rates")
+    stats.add_argument("--json", action="store_true", help="Print the stats as JSON")
+    evict = commands.add_parser("evict", help="Evict the least used entries until the cache fits in a budget")
+    evict.add_argument("--max-bytes", type=int, default=settings.TAVILY_CACHE_MAX_BYTES,
+                       help="Budget for keys and values (default TAVILY_CACHE_MAX_BYTES)")
+    evict.add_argument("--dry-run", action="store_true", help="Only report what would be evicted")
+    commands.add_parser("index-resources", help="Add the datasets and repositories of cached searches to the local resource index")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    redis_client = get_redis_bytes_client()
+    if redis_client is None:
+        raise SystemExit("Redis is not reachable.")
+
+    if args.command == "stats":
+        stats = cache_stats(redis_client)
+        if args.json:
+            print(json.dumps(stats, indent=2))
+        else:
+            for name, value in stats.items():
+                print(f"{name:<22}{value}")
+    elif args.command == "evict":
+        if args.max_bytes <= 0:
+            raise SystemExit("No budget: pass --max-bytes or set TAVILY_CACHE_MAX_BYTES.")
+        pruned = 0 if args.dry_run else prune_usage(redis_client)
+        evicted, freed = evict_to_budget(redis_client, args.max_bytes, dry_run=args.dry_run)
+        verb = "Would evict" if args.dry_run else "Evicted"
+        logger.info(f"🧹 {verb} {evicted} entries ({freed} bytes) to fit in {args.max_bytes} bytes; dropped {pruned} stale hit counts.")
+    elif args.command == "index-resources":
+        searches, recorded = backfill_resource_index(redis_client)
+        logger.info(f"📇 Recorded {recorded} resources from {searches} cached searches in {settings.RESOURCE_INDEX_PATH}.")
@@ -1,5 +1,6 @@
+import json
 import os
-from typing import Optional
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -7,14 +8,94 @@ load_dotenv()
 
 class Settings(BaseSettings):
     LLM_MODEL: str = "gemini/gemini-2.0-flash-lite"
-    GEMINI_API_KEY: str = os.getenv('GEMINI_API_KEY')
-    TAVILY_API_KEY: str = os.getenv('TAVILY_API_KEY')
+    LLM_TEMPERATURE: float = float(os.environ.get("LLM_TEMPERATURE", 0.7)) # Sampling temperature of every agent
+    LLM_MAX_TOKENS: int = int(os.environ.get("LLM_MAX_TOKENS", 0)) # Completion token limit per call, 0 for the provider's
+    LLM_LATENCY_BUDGET: float = float(os.environ.get("LLM_LATENCY_BUDGET", 0)) # Seconds before a call times out (and goes to the fallback model), 0 for none
+    LLM_FALLBACK_MODEL: str = os.environ.get("LLM_FALLBACK_MODEL", "") # Answers calls the model times out, is rate limited or fails on, empty for none
+    # Per-agent overrides of the five settings above, as JSON keyed by agent name (see crew/agents.py), e.g.
+    # {"resource_collector": {"model": "gemini/gemini-2.0-flash-lite", "temperature": 0, "max_tokens": 2048, "latency_budget": 20,
+    #  "fallback_model": "gemini/gemini-2.0-flash"}, "proposal_synthesizer": {"model": "gemini/gemini-2.5-pro"}}
+    LLM_AGENT_ROUTES: Dict[str, Dict[str, Any]] = json.loads(os.environ.get("LLM_AGENT_ROUTES", "{}"))
+    LLM_CACHE_POLICY: str = os.environ.get("LLM_CACHE_POLICY", "deterministic") # "off", "deterministic" (temperature 0 only) or "always"
+    LLM_CACHE_TTL: int = int(os.environ.get("LLM_CACHE_TTL", 7 * 86400)) # Cached completions expiry
+    LLM_CACHE_SQLITE_PATH: str = os.environ.get("LLM_CACHE_SQLITE_PATH", ".cache/llm_completions.sqlite3") # Local fallback store
+    GEMINI_API_KEY: Optional[str] = os.getenv('GEMINI_API_KEY')
+    TAVILY_API_KEY: Optional[str] = os.getenv('TAVILY_API_KEY') # Checked when the Tavily client is first used
 
     REDIS_HOST: str = os.environ.get("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.environ.get("REDIS_PORT", 6379))
-    REDIS_PASSWORD: Optional[str] = str(os.environ.get("REDIS_PASSWORD", None))
+    REDIS_PASSWORD: Optional[str] = os.environ.get("REDIS_PASSWORD") or None
     REDIS_DB: int = int(os.environ.get("REDIS_DB", 0))
     TTL_TIME: int = int(os.environ.get("SESSION_TTL_SECONDS", 86400)) # 1 Day
+    REDIS_SOCKET_TIMEOUT: float = float(os.environ.get("REDIS_SOCKET_TIMEOUT", 1.0)) # Seconds, connect and read
+    REDIS_HEALTH_CHECK_INTERVAL: int = int(os.environ.get("REDIS_HEALTH_CHECK_INTERVAL", 30)) # Seconds between pooled connection checks
+    REDIS_BREAKER_FAILURES: int = int(os.environ.get("REDIS_BREAKER_FAILURES", 3)) # Consecutive failures before Redis is skipped
+    REDIS_BREAKER_RESET_SECONDS: float = float(os.environ.get("REDIS_BREAKER_RESET_SECONDS", 30)) # Time before Redis is probed again
+
+    L1_CACHE_MAX_BYTES: int = int(os.environ.get("L1_CACHE_MAX_BYTES", 32 * 1024 * 1024)) # In-process cache size
+    TAVILY_MAX_CONCURRENCY: int = int(os.environ.get("TAVILY_MAX_CONCURRENCY", 8)) # Parallel Tavily calls per batch
+    TAVILY_NEAR_DUP_ENABLED: bool = os.environ.get("TAVILY_NEAR_DUP_ENABLED", "false").lower() == "true" # Reuse results of paraphrased queries
+    TAVILY_NEAR_DUP_THRESHOLD: float = float(os.environ.get("TAVILY_NEAR_DUP_THRESHOLD", 0.8)) # Min Jaccard similarity of query tokens
+    TAVILY_COMPACT_RESULTS: bool = os.environ.get("TAVILY_COMPACT_RESULTS", "true").lower() == "true" # Hand agents title/url/snippet only
+    TAVILY_SNIPPET_CHARS: int = int(os.environ.get("TAVILY_SNIPPET_CHARS", 300)) # Max snippet length per search hit
+    TAVILY_RESULT_TOKEN_BUDGET: int = int(os.environ.get("TAVILY_RESULT_TOKEN_BUDGET", 600)) # Max (estimated) tokens per search tool response, split among the queries of a batch
+    TAVILY_CACHE_COMPRESSION_LEVEL: int = int(os.environ.get("TAVILY_CACHE_COMPRESSION_LEVEL", 6)) # zlib level of Redis cache entries (1 fastest, 9 smallest)
+    TAVILY_CACHE_MAX_BYTES: int = int(os.environ.get("TAVILY_CACHE_MAX_BYTES", 0)) # Redis cache budget enforced by `src/cache_admin.py evict`, 0 for none
+    TAVILY_COALESCE_LEASE_SECONDS: float = float(os.environ.get("TAVILY_COALESCE_LEASE_SECONDS", 30)) # Redis lease held by the worker fetching a query
+    TAVILY_COALESCE_WAIT_SECONDS: float = float(os.environ.get("TAVILY_COALESCE_WAIT_SECONDS", 15)) # Max wait for another worker's fetch before fetching ourselves
+    TAVILY_COALESCE_POLL_INTERVAL: float = float(os.environ.get("TAVILY_COALESCE_POLL_INTERVAL", 0.1)) # Cache polling interval while waiting
+
+    TAVILY_RATE_LIMIT_PER_MINUTE: float = float(os.environ.get("TAVILY_RATE_LIMIT_PER_MINUTE", 0)) # Shared by all workers, 0 disables; set to the plan's quota (e.g. 100 for development keys)
+    TAVILY_RATE_LIMIT_BURST: int = int(os.environ.get("TAVILY_RATE_LIMIT_BURST", 10)) # Requests allowed back to back (below TAVILY_MAX_CONCURRENCY, batches are throttled)
+    LLM_RATE_LIMIT_PER_MINUTE: float = float(os.environ.get("LLM_RATE_LIMIT_PER_MINUTE", 0)) # Per model, shared by all workers, 0 disables; set to the model's requests-per-minute quota
+    LLM_RATE_LIMIT_BURST: int = int(os.environ.get("LLM_RATE_LIMIT_BURST", 5)) # Requests allowed back to back
+    LLM_MAX_CONCURRENCY: int = int(os.environ.get("LLM_MAX_CONCURRENCY", 8)) # Upper bound of the adaptive LLM concurrency per process
+    RATE_LIMIT_MAX_RETRIES: int = int(os.environ.get("RATE_LIMIT_MAX_RETRIES", 5)) # Retries on 429/5xx/timeouts
+    RATE_LIMIT_BASE_DELAY: float = float(os.environ.get("RATE_LIMIT_BASE_DELAY", 1.0)) # First backoff ceiling, doubled per retry
+    RATE_LIMIT_MAX_DELAY: float = float(os.environ.get("RATE_LIMIT_MAX_DELAY", 30.0)) # Backoff ceiling
+
+    RESOURCE_COLLECTION_PARALLELISM: int = int(os.environ.get("RESOURCE_COLLECTION_PARALLELISM", 4)) # Use cases searched at once
+    RESOURCE_INDEX_ENABLED: bool = os.environ.get("RESOURCE_INDEX_ENABLED", "true").lower() == "true" # Record found datasets/repos and let the resource collector search them
+    RESOURCE_INDEX_PATH: str = os.environ.get("RESOURCE_INDEX_PATH", ".cache/resource_index.sqlite3") # SQLite FTS5 index shared by the processes of a machine
+    RESOURCE_INDEX_SNIPPET_CHARS: int = int(os.environ.get("RESOURCE_INDEX_SNIPPET_CHARS", 300)) # Snippet kept per resource
+    RESOURCE_INDEX_MIN_TERM_MATCH: float = float(os.environ.get("RESOURCE_INDEX_MIN_TERM_MATCH", 0.6)) # Share of a query's technique words a resource must match
+    RESOURCE_INDEX_MAX_AGE_DAYS: float = float(os.environ.get("RESOURCE_INDEX_MAX_AGE_DAYS", 180)) # Resources not seen in a search for longer are ignored
+
+    SEARCH_PREFETCH_ENABLED: bool = os.environ.get("SEARCH_PREFETCH_ENABLED", "true").lower() == "true" # Suggest the standard searches to the agents and fetch them in the background
+    SEARCH_PREFETCH_WORKERS: int = int(os.environ.get("SEARCH_PREFETCH_WORKERS", 2)) # Prefetch batches run at once per process
+
+    REPORT_CACHE_TTL: int = int(os.environ.get("REPORT_CACHE_TTL", os.environ.get("SESSION_TTL_SECONDS", 86400))) # Cached reports are dropped after this
+    REPORT_CACHE_STALE_AFTER: int = int(os.environ.get("REPORT_CACHE_STALE_AFTER", 6 * 3600)) # Older reports are served and refreshed in the background
+
+    REPORT_STORE_PATH: str = os.environ.get("REPORT_STORE_PATH", ".cache/reports.sqlite3") # Generated reports, PDFs, inputs and timings, by content hash
+    REPORT_STORE_MAX_REPORTS: int = int(os.environ.get("REPORT_STORE_MAX_REPORTS", 1000)) # Oldest reports beyond this are deleted
+    REPORT_STORE_MEMORY_BYTES: int = int(os.environ.get("REPORT_STORE_MEMORY_BYTES", 8 * 1024 * 1024)) # In-memory copies of recently opened reports
+    REPORT_STORE_MEMORY_TTL: int = int(os.environ.get("REPORT_STORE_MEMORY_TTL", 3600)) # In-memory copy expiry
+    REPORT_HISTORY_PAGE_SIZE: int = int(os.environ.get("REPORT_HISTORY_PAGE_SIZE", 10)) # Reports per page of the app's history panel
+
+    PDF_CACHE_DIR: str = os.environ.get("PDF_CACHE_DIR", ".cache/pdf") # Rendered PDFs, named by report content hash
+    PDF_CACHE_MAX_FILES: int = int(os.environ.get("PDF_CACHE_MAX_FILES", 500)) # Oldest PDFs beyond this are deleted
+    PDF_CACHE_TTL: int = int(os.environ.get("PDF_CACHE_TTL", 86400)) # In-memory copy expiry
+    PDF_MEMORY_CACHE_BYTES: int = int(os.environ.get("PDF_MEMORY_CACHE_BYTES", 64 * 1024 * 1024)) # In-memory copies size
+    PDF_RENDER_WORKERS: int = int(os.environ.get("PDF_RENDER_WORKERS", 2)) # Render processes
+
+    TRACE_DIR: str = os.environ.get("TRACE_DIR", ".cache/traces") # JSON trace per pipeline run, empty disables
+    TRACE_MAX_FILES: int = int(os.environ.get("TRACE_MAX_FILES", 1000)) # Oldest traces beyond this are deleted
+    TRACE_MAX_AGE: int = int(os.environ.get("TRACE_MAX_AGE", 7 * 86400)) # Traces older than this (seconds) are deleted, 0 keeps them
+    METRICS_PORT: int = int(os.environ.get("METRICS_PORT", 0)) # Serve Prometheus /metrics on this port, 0 disables
+    METRICS_FILE: str = os.environ.get("METRICS_FILE", "") # Prometheus textfile to rewrite, "{pid}" is replaced, empty disables
+    METRICS_FILE_INTERVAL: float = float(os.environ.get("METRICS_FILE_INTERVAL", 15)) # Seconds between metrics file writes
+
+    CHECKPOINT_DIR: str = os.environ.get("CHECKPOINT_DIR", ".checkpoints") # Local copy of per-stage outputs
+    CHECKPOINT_TTL: int = int(os.environ.get("CHECKPOINT_TTL", os.environ.get("SESSION_TTL_SECONDS", 86400))) # Redis copy expiry; older local files are deleted
+
+    JOB_BACKEND: str = os.environ.get("JOB_BACKEND", "local") # "local" (worker threads in the app) or "redis" (src/worker.py processes)
+    JOB_WORKERS: int = int(os.environ.get("JOB_WORKERS", 2)) # Reports generated at once per app process / worker host
+    JOB_MAX_PENDING: int = int(os.environ.get("JOB_MAX_PENDING", 20)) # New jobs are rejected when this many are waiting
+    JOB_POLL_INTERVAL: float = float(os.environ.get("JOB_POLL_INTERVAL", 1.0)) # Seconds between queue polls of an idle worker
+    JOB_STALL_SECONDS: int = int(os.environ.get("JOB_STALL_SECONDS", 600)) # A running job without heartbeat for this long is lost
+    JOB_SHUTDOWN_TIMEOUT: float = float(os.environ.get("JOB_SHUTDOWN_TIMEOUT", 30)) # Seconds a stopping worker lets its jobs finish before putting them back on the queue
+    JOB_TTL: int = int(os.environ.get("JOB_TTL", os.environ.get("SESSION_TTL_SECONDS", 86400))) # Job status and results expiry
 
 
 
@@ -1,17 +1,76 @@
 import os
+from typing import Any, Callable, Dict, List, Optional
 from crewai import LLM, Agent
+from crewai.llms.base_llm import BaseLLM
+from crewai.tools import BaseTool
 from src.config.settings import settings
-from src.tools.tavily_tool import cached_tavily_search_tool
-from langchain_google_genai import ChatGoogleGenerativeAI
+from crew.llm import CachedLLM, RateLimitedLLM, RoutedLLM, TracedLLM
+from src.tools.resource_index import resource_index_search_tool
+from src.tools.tavily_tool import cached_tavily_search_tool, cached_tavily_batch_search_tool
 from dotenv import load_dotenv
 
 load_dotenv()
 
-llm = LLM(
-    model=settings.LLM_MODEL,
-    api_key=os.getenv('GEMINI_API_KEY'),
-    temperature=0.7,
-)
+AGENT_NAMES = ("researcher", "use_case_generator", "resource_collector", "proposal_synthesizer")
+
+
+def agent_route(agent: Optional[str] = None) -> Dict[str, Any]:
+    """Model, temperature, max tokens, latency budget and fallback model of an agent:
+    the LLM_* settings, overridden by the agent's LLM_AGENT_ROUTES entry"""
+    route = {
+        "model": settings.LLM_MODEL,
+        "temperature": settings.LLM_TEMPERATURE,
+        "max_tokens": settings.LLM_MAX_TOKENS,
+        "latency_budget": settings.LLM_LATENCY_BUDGET,
+        "fallback_model": settings.LLM_FALLBACK_MODEL,
+    }
+    unknown_agents = set(settings.LLM_AGENT_ROUTES) - set(AGENT_NAMES)
+    if unknown_agents:
+        raise ValueError(f"Unknown agents {sorted(unknown_agents)} in LLM_AGENT_ROUTES, expected some of {AGENT_NAMES}")
+    overrides = settings.LLM_AGENT_ROUTES.get(agent, {}) if agent else {}
+    unknown_fields = set(overrides) - set(route)
+    if unknown_fields:
+        raise ValueError(f"Unknown fields {sorted(unknown_fields)} in LLM_AGENT_ROUTES['{agent}'], expected some of {tuple(route)}")
+    return {**route, **overrides}
+
+
+def provider_llm(model: str, temperature: float, max_tokens: int = 0, timeout: float = 0, stream: bool = False) -> BaseLLM:
+    """The provider's LLM for a model, before caching, rate limiting and tracing"""
+    return LLM(
+        model=model,
+        # Other providers read their keys from the environment
+        api_key=os.getenv('GEMINI_API_KEY') if model.startswith("gemini/") else None,
+        temperature=temperature,
+        max_tokens=max_tokens or None,
+        timeout=timeout or None,
+        stream=stream,
+    )
+
+
+def create_llm(stream: bool = False, agent: Optional[str] = None) -> RoutedLLM:
+    """LLM of an agent (see agent_route; the LLM_* defaults without `agent`),
+    streaming tokens as crewai events if `stream`.
+
+    Completions are cached according to LLM_CACHE_POLICY, cache misses
+    go through the shared rate limiter of the model and every call is traced.
+    A call the model does not answer within the latency budget, or fails with
+    a rate limit or server error, goes to the fallback model without retries.
+    """
+    route = agent_route(agent)
+    fallback_model = route["fallback_model"] if route["fallback_model"] != route["model"] else ""
+
+    def build(model: str, timeout: float, max_retries: Optional[int]) -> BaseLLM:
+        llm = provider_llm(model, route["temperature"], route["max_tokens"], timeout, stream)
+        return TracedLLM.wrap(CachedLLM.wrap(RateLimitedLLM.wrap(llm, max_retries=max_retries)))
+
+    primary = build(route["model"], route["latency_budget"], 0 if fallback_model else None)
+    fallback = build(fallback_model, 0, None) if fallback_model else None
+    return RoutedLLM.wrap(primary, fallback=fallback, agent=agent or "default")
+
+
+def create_agent_llms(stream: bool = False) -> Dict[str, RoutedLLM]:
+    """One LLM per agent, routed according to LLM_AGENT_ROUTES"""
+    return {agent: create_llm(stream, agent) for agent in AGENT_NAMES}
 
 # llm = ChatGoogleGenerativeAI(
 #     model=settings.LLM_MODEL,
@@ -20,68 +79,107 @@ llm = LLM(
 #     verbose=True,
 # )
 
-researcher = Agent(
-    role='Senior Industry Analyst',
-    goal='Conduct thorough and comprehensive research on a given company or industry',
-    backstory=(
-        "You are an expert in market research with years of experience in analyzing " \
-        "industry trends, company profiles, and strategic positioning. You can identify major " \
-        "breakthroughs and opportunities from your research. You use web searches" \
-        "to gather up-to-date information."
-    ),
-    verbose=True,
-    llm=llm,
-    tools=[cached_tavily_search_tool], 
-    allow_delegation=False
-)
-
-# Agen 2: Market standard and Use case generator
-use_case_generator = Agent(
-    role='AI Innovation Strategist',
-    goal=(
-        "Identify relevant AI/ML trends in the reserached industry and generate specific, actionable " \
-        "GenAI/ML use cases tailored to the target company's context and needs, following a specific detailed format."
-    ),
-    backstory=(
-        "You are a forward thinking AI strategist with deep knowledge of Machine Learning, Large Language Models and GenAI " \
-        "applications across various industries. You excel at connecting industry trends and company objectives " \
-        "(like operational efficiency, customer experience) to concrete AI use cases. You are meticulous about structuring " \
-        "your proposals, detailing objectives, AI application, and corss-functional benefits inspired by best practices and " \
-        "real-world examples."
-    ),
-    verbose=True,
-    llm=llm,
-    allow_delegation=False,
-    tools=[cached_tavily_search_tool]
-)
-
-# Agent 3: Resource asset collector
-resource_collector = Agent(
-    role='Data & Resource Scout',
-    goal='Find relevant public dataset (kaggle, hugginface) and code repositories (Github) related to the proposed AI use cases.',
-    backstory=(
-        "You are a specialist in navigating data science platforms and code repositories." \
-        "Given specific AI/ML use case, you efficiently formulate search queries to discover " \
-        "relevant datasets (for training/testing) and open-source code examples (for implementation ideas) " \
-        "on platform like Kaggle, Huggingface Hub, and Github. You focus on finding practical accessible resources."
-    ),
-    verbose=True,
-    llm=llm,
-    allow_delegation=False,
-    tools=[cached_tavily_search_tool]
-)
-
-# Agent 4: Synthesizer agent
-proposal_synthesizer = Agent(
-    role='Senior Proposal Manager',
-    goal='Consolidate research findings, prioritized use cases, and resource links into a final, well-structured, professional Markdown report.',
-    backstory=(
-        "You are and experienced proposal manager with a keen eye for details and clarity. " \
-        "You take inputs from researchers, strategist, and resource scouts to compile comprehensive yet concise reports. " \
-        "You pritoritize information based on relevance and impact, ensure professional formatting (especially markdown), " \
-        "and make sure all the reference and resource links are correctly included and clickable."
-    ),
-    verbose=True,
-    llm=llm,
-    allow_delegation=False,
-)
\ No newline at end of file
+
+def create_agents(
+    llm: Optional[BaseLLM] = None,
+    tools: Optional[Dict[str, BaseTool]] = None,
+    llms: Optional[Dict[str, BaseLLM]] = None,
+    tools_factory: Optional[Callable[[], Dict[str, BaseTool]]] = None,
+) -> Dict[str, Agent]:
+    """Build the four crew agents, keyed by name.
+
+    Each agent gets its LLM from `llms` (see create_agent_llms, built when
+    missing), or `llm` for all of them when given.
+    `tools` ({"search", "batch_search", "resource_index"}, see create_search_tools)
+    replaces the shared search tool instances, e.g. to attach a progress listener.
+    `tools_factory` instead builds such tools for each agent that searches, so
+    per-agent state (which URLs the agent has seen) is not shared.
+    """
+    if llm is not None:
+        llms = {agent: llm for agent in AGENT_NAMES}
+    llms = llms or create_agent_llms()
+    tools = tools or {
+        "search": cached_tavily_search_tool,
+        "batch_search": cached_tavily_batch_search_tool,
+        "resource_index": resource_index_search_tool,
+    }
+
+    def agent_tools(*names: str) -> List[BaseTool]:
+        instances = tools_factory() if tools_factory else tools
+        return [instances[name] for name in names]
+
+    # The local index comes first: the agent is told to try it before searching the web
+    resource_tools = ("resource_index",) if settings.RESOURCE_INDEX_ENABLED else ()
+
+    researcher = Agent(
+        role='Senior Industry Analyst',
+        goal='Conduct thorough and comprehensive research on a given company or industry',
+        backstory=(
+            "You are an expert in market research with years of experience in analyzing " \
+            "industry trends, company profiles, and strategic positioning. You can identify major " \
+            "breakthroughs and opportunities from your research. You use web searches" \
+            "to gather up-to-date information."
+        ),
+        verbose=True,
+        llm=llms["researcher"],
+        tools=agent_tools("batch_search", "search"),
+        allow_delegation=False
+    )
+
+    # Agen 2: Market standard and Use case generator
+    use_case_generator = Agent(
+        role='AI Innovation Strategist',
+        goal=(
+            "Identify relevant AI/ML trends in the reserached industry and generate specific, actionable " \
+            "GenAI/ML use cases tailored to the target company's context and needs, following a specific detailed format."
+        ),
+        backstory=(
+            "You are a forward thinking AI strategist with deep knowledge of Machine Learning, Large Language Models and GenAI " \
+            "applications across various industries. You excel at connecting industry trends and company objectives " \
+            "(like operational efficiency, customer experience) to concrete AI use cases. You are meticulous about structuring " \
+            "your proposals, detailing objectives, AI application, and corss-functional benefits inspired by best practices and " \
+            "real-world examples."
+        ),
+        verbose=True,
+        llm=llms["use_case_generator"],
+        allow_delegation=False,
+        tools=agent_tools("batch_search", "search")
+    )
+
+    # Agent 3: Resource asset collector
+    resource_collector = Agent(
+        role='Data & Resource Scout',
+        goal='Find relevant public dataset (kaggle, hugginface) and code repositories (Github) related to the proposed AI use cases.',
+        backstory=(
+            "You are a specialist in navigating data science platforms and code repositories." \
+            "Given specific AI/ML use case, you efficiently formulate search queries to discover " \
+            "relevant datasets (for training/testing) and open-source code examples (for implementation ideas) " \
+            "on platform like Kaggle, Huggingface Hub, and Github. You focus on finding practical accessible resources."
+        ),
+        verbose=True,
+        llm=llms["resource_collector"],
+        allow_delegation=False,
+        tools=agent_tools(*resource_tools, "batch_search", "search")
+    )
+
+    # Agent 4: Synthesizer agent
+    proposal_synthesizer = Agent(
+        role='Senior Proposal Manager',
+        goal='Consolidate research findings, prioritized use cases, and resource links into a final, well-structured, professional Markdown report.',
+        backstory=(
+            "You are and experienced proposal manager with a keen eye for details and clarity. " \
+            "You take inputs from researchers, strategist, and resource scouts to compile comprehensive yet concise reports. " \
+            "You pritoritize information based on relevance and impact, ensure professional formatting (especially markdown), " \
+            "and make sure all the reference and resource links are correctly included and clickable."
+        ),
+        verbose=True,
+        llm=llms["proposal_synthesizer"],
+        allow_delegation=False,
+    )
+
+    return {
+        "researcher": researcher,
+        "use_case_generator": use_case_generator,
+        "resource_collector": resource_collector,
+        "proposal_synthesizer": proposal_synthesizer,
+    }
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import redis.exceptions
+from loguru import logger
+from src.config.settings import settings
+from src.tools.clients import get_redis_client, redis_breaker
+
+# Pipeline stages in run order; a stage only depends on the ones before it
+STAGES = ["research", "use_cases", "resources", "synthesis"]
+
+
+def make_run_id(inputs: Dict[str, str]) -> str:
+    """Stable run ID for a set of inputs, so a retry finds the failed run's checkpoints"""
+    normalized = {k: " ".join(str(v or "").lower().split()) for k, v in sorted(inputs.items())}
+    return hashlib.sha256(json.dumps(normalized).encode("utf-8")).hexdigest()[:16]
+
+
+def _prune_checkpoint_files(directory: Path) -> None:
+    """Delete checkpoint files not written for CHECKPOINT_TTL, like their expired Redis copies"""
+    cutoff = time.time() - settings.CHECKPOINT_TTL
+    for path in directory.glob("*.json"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass  # Pruned by another process
+
+
+class CheckpointStore:
+    """Outputs of the completed stages of one run.
+
+    Written through to Redis (shared between workers, expires after
+    CHECKPOINT_TTL) and to a JSON file under CHECKPOINT_DIR, which is
+    also the fallback when Redis is unavailable. Files older than
+    CHECKPOINT_TTL are deleted as new checkpoints are saved.
+    """
+
+    def __init__(self, run_id: str, directory: Optional[str] = None):
+        self.run_id = run_id
+        self.path = Path(directory or settings.CHECKPOINT_DIR) / f"{run_id}.json"
+        self._lock = threading.Lock()
+
+    def _redis_key(self, stage: str) -> str:
+        return f"checkpoint:{self.run_id}:{stage}"
+
+    def _read_file(self) -> Dict[str, str]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not read checkpoint file {self.path}: {e}")
+            return {}
+
+    def _write_file(self, outputs: Dict[str, str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(outputs), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def load(self, stage: str) -> Optional[str]:
+        redis_client = get_redis_client()
+        if redis_client:
+            try:
+                output = redis_client.get(self._redis_key(stage))
+                redis_breaker.record_success()
+                if output is not None:
+                    return output
+            except redis.exceptions.RedisError as e:
+                redis_breaker.record_failure()
+                logger.info(f"⚠️ Redis GET Error for checkpoint: {e}. Using the local checkpoint.")
+        with self._lock:
+            return self._read_file().get(stage)
+
+    def save(self, stage: str, output: str) -> None:
+        with self._lock:
+            outputs = self._read_file()
+            outputs[stage] = output
+            self._write_file(outputs)
+        try:
+            _prune_checkpoint_files(self.path.parent)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not prune old checkpoint files: {e}")
+        redis_client = get_redis_client()
+        if redis_client:
+            try:
+                redis_client.setex(self._redis_key(stage), settings.CHECKPOINT_TTL, output)
+                redis_breaker.record_success()
+            except redis.exceptions.RedisError as e:
+                redis_breaker.record_failure()
+                logger.info(f"⚠️ Redis SETEX Error for checkpoint: {e}. Saved locally only.")
+        logger.info(f"💾 Checkpoint saved: run {self.run_id}, stage '{stage}'.")
+
+    def clear(self, from_stage: str = STAGES[0]) -> None:
+        """Drop the checkpoint of `from_stage` and of every stage after it"""
+        stages = STAGES[STAGES.index(from_stage):]
+        with self._lock:
+            outputs = {k: v for k, v in self._read_file().items() if k not in stages}
+            if self.path.exists():
+                self._write_file(outputs)
+        redis_client = get_redis_client()
+        if redis_client:
+            try:
+                redis_client.delete(*(self._redis_key(stage) for stage in stages))
+                redis_breaker.record_success()
+            except redis.exceptions.RedisError as e:
+                redis_breaker.record_failure()
+                logger.info(f"⚠️ Redis DEL Error for checkpoint: {e}.")
@@ -0,0 +1,440 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import redis.exceptions
+from crewai.llms.base_llm import BaseLLM, call_stop_override, call_stream_override
+from loguru import logger
+from pydantic import PrivateAttr
+from src.config.settings import settings
+from src.telemetry.metrics import LLM_AGENT_SECONDS
+from src.telemetry.tracing import annotate, span
+from src.tools.clients import get_redis_client, redis_breaker
+from src.tools.compaction import estimate_tokens
+from src.tools.rate_limit import get_llm_limiter, is_retryable
+
+CACHE_POLICIES = ("off", "deterministic", "always")
+
+
+class CompletionCacheStats:
+    """Thread-safe hit/miss counters and the LLM time hits saved"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+
+    def record_hit(self, latency: float) -> None:
+        with self._lock:
+            self.hits += 1
+            self.latency_saved += latency
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "latency_saved_seconds": round(self.latency_saved, 3),
+            }
+
+
+llm_cache_stats = CompletionCacheStats()
+
+
+class LatencyStats:
+    """Thread-safe latencies and outcomes of the LLM calls of one agent"""
+
+    def __init__(self, max_samples: int = 1000):
+        self._lock = threading.Lock()
+        self.samples = deque(maxlen=max_samples)
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.outcomes: Dict[str, int] = {}
+
+    def record(self, seconds: float, outcome: str) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+            self.calls += 1
+            self.total_seconds += seconds
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            ordered = sorted(self.samples)
+            calls, total, outcomes = self.calls, self.total_seconds, dict(self.outcomes)
+
+        def point(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))], 3) if ordered else 0.0
+
+        return {
+            "calls": calls,
+            "total_seconds": round(total, 3),
+            "p50_seconds": point(0.5),
+            "p95_seconds": point(0.95),
+            "max_seconds": point(1.0),
+            "fallbacks": outcomes.get("fallback", 0),
+            "errors": outcomes.get("error", 0),
+        }
+
+
+class SQLiteCompletionStore:
+    """Local completion store, used when Redis is unavailable and to replay runs offline"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM completions WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM completions WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            conn.commit()
+
+
+_sqlite_store: Optional[SQLiteCompletionStore] = None
+_sqlite_store_lock = threading.Lock()
+
+
+def get_sqlite_store() -> SQLiteCompletionStore:
+    global _sqlite_store
+    if _sqlite_store is None:
+        with _sqlite_store_lock:
+            if _sqlite_store is None:
+                _sqlite_store = SQLiteCompletionStore(settings.LLM_CACHE_SQLITE_PATH)
+    return _sqlite_store
+
+
+def completion_cache_key(llm: BaseLLM, messages: Any, tools: Any, stop: Any, response_model: Any) -> str:
+    """Content hash of everything that shapes a completion"""
+    identity = json.dumps({
+        "model": llm.model,
+        "messages": messages,
+        "tools": tools,
+        "temperature": llm.temperature,
+        "top_p": llm.top_p,
+        "max_tokens": llm.max_tokens,
+        "seed": llm.seed,
+        "stop": sorted(stop or []),
+        "response_model": getattr(response_model, "__name__", None),
+    }, sort_keys=True, default=str)
+    return f"llm:{hashlib.sha256(identity.encode('utf-8')).hexdigest()}"
+
+
+def _read_entry(key: str) -> Optional[Dict]:
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            cached = redis_client.get(key)
+            redis_breaker.record_success()
+            if cached:
+                return json.loads(cached)
+        except redis.exceptions.RedisError as e:
+            redis_breaker.record_failure()
+            logger.info(f"⚠️ Redis GET Error for LLM cache: {e}. Using the local cache.")
+    try:
+        cached = get_sqlite_store().get(key)
+        return json.loads(cached) if cached else None
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ SQLite LLM cache read failed: {e}")
+        return None
+
+
+def _write_entry(key: str, entry: Dict) -> None:
+    value = json.dumps(entry)
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            redis_client.setex(key, settings.LLM_CACHE_TTL, value)
+            redis_breaker.record_success()
+        except redis.exceptions.RedisError as e:
+            redis_breaker.record_failure()
+            logger.info(f"⚠️ Redis SETEX Error for LLM cache: {e}. Cached locally only.")
+    try:
+        get_sqlite_store().set(key, value, settings.LLM_CACHE_TTL)
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ SQLite LLM cache write failed: {e}")
+
+
+class LLMWrapper(BaseLLM):
+    """Base for LLMs that add behavior around another crewai LLM.
+
+    Subclasses implement `call` and send the request on with `_call_inner`.
+    """
+
+    inner: BaseLLM
+
+    @classmethod
+    def _wrap(cls, llm: BaseLLM, **fields) -> "LLMWrapper":
+        return cls(
+            inner=llm,
+            model=llm.model,
+            provider=llm.provider,
+            temperature=llm.temperature,
+            top_p=llm.top_p,
+            max_tokens=llm.max_tokens,
+            seed=llm.seed,
+            stream=llm.stream,
+            stop=list(llm.stop),
+            is_litellm=llm.is_litellm,
+            **fields,
+        )
+
+    def _call_inner(self, messages, stop, llm: Optional[BaseLLM] = None, **kwargs):
+        # The agent's stop words and streaming mode are set on this wrapper, pass them on
+        llm = llm or self.inner
+        with call_stop_override(llm, stop), call_stream_override(llm, bool(self._effective_stream())):
+            return llm.call(messages, **kwargs)
+
+    def supports_function_calling(self) -> bool:
+        # Not part of the BaseLLM interface, custom LLMs may lack it
+        supports = getattr(self.inner, "supports_function_calling", None)
+        return bool(supports and supports())
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
+
+    def supports_multimodal(self) -> bool:
+        return self.inner.supports_multimodal()
+
+    def get_token_usage_summary(self):
+        return self.inner.get_token_usage_summary()
+
+
+class CachedLLM(LLMWrapper):
+    """Wraps a crewai LLM and replays completions for identical requests.
+
+    Requests are keyed by model, messages, tool schemas, sampling parameters
+    and stop words. With the "deterministic" policy only temperature 0 calls
+    are cached (a repeat would return the same text anyway); "always" also
+    caches sampled calls, which is what makes re-runs and prompt iteration
+    on later tasks cheap. Only text completions are cached.
+    """
+
+    policy: str = "deterministic"
+
+    @classmethod
+    def wrap(cls, llm: BaseLLM, policy: Optional[str] = None) -> BaseLLM:
+        """Return `llm` wrapped in the cache, or as is when the policy is "off" """
+        policy = policy or settings.LLM_CACHE_POLICY
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"Unknown LLM_CACHE_POLICY '{policy}', expected one of {CACHE_POLICIES}")
+        if policy == "off":
+            return llm
+        return cls._wrap(llm, policy=policy)
+
+    def _cacheable(self) -> bool:
+        return self.policy == "always" or (self.policy == "deterministic" and not self.temperature)
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ):
+        stop = self.stop_sequences
+        key = completion_cache_key(self, messages, tools, stop, response_model) if self._cacheable() else None
+        if key:
+            entry = _read_entry(key)
+            if entry is not None:
+                llm_cache_stats.record_hit(entry.get("latency", 0.0))
+                annotate(cached=True)
+                logger.success(f"✅ LLM cache HIT ({entry.get('latency', 0.0):.1f}s saved).")
+                return entry["response"]
+            llm_cache_stats.record_miss()
+
+        start = time.perf_counter()
+        response = self._call_inner(
+            messages,
+            stop,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+            response_model=response_model,
+        )
+        latency = time.perf_counter() - start
+
+        if key and isinstance(response, str) and response.strip():
+            _write_entry(key, {"response": response, "latency": latency, "model": self.model, "created_at": time.time()})
+        return response
+
+
+class RateLimitedLLM(LLMWrapper):
+    """Sends calls through the shared rate limiter of the model (see src/tools/rate_limit.py)"""
+
+    # Retries of transient failures, RATE_LIMIT_MAX_RETRIES when None
+    max_retries: Optional[int] = None
+
+    @classmethod
+    def wrap(cls, llm: BaseLLM, max_retries: Optional[int] = None) -> BaseLLM:
+        return cls._wrap(llm, max_retries=max_retries)
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ):
+        return get_llm_limiter(self.model).call(
+            self._call_inner,
+            messages,
+            self.stop_sequences,
+            max_retries=self.max_retries,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+            response_model=response_model,
+        )
+
+
+class TracedLLM(LLMWrapper):
+    """Records every call as an "llm" span (see src/telemetry).
+
+    Outermost wrapper, so cache hits and rate limit waits are part of the
+    span. Token counts on the span are estimates from the message and
+    response sizes; the provider's exact totals are on the run's trace.
+    """
+
+    @classmethod
+    def wrap(cls, llm: BaseLLM) -> BaseLLM:
+        return cls._wrap(llm)
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ):
+        with span("llm", self.model, agent=getattr(from_agent, "role", None), cached=False) as llm_span:
+            response = self._call_inner(
+                messages,
+                self.stop_sequences,
+                tools=tools,
+                callbacks=callbacks,
+                available_functions=available_functions,
+                from_task=from_task,
+                from_agent=from_agent,
+                response_model=response_model,
+            )
+            llm_span.attributes.update(
+                prompt_tokens=estimate_tokens(messages),
+                completion_tokens=estimate_tokens(response) if isinstance(response, str) else None,
+            )
+            return response
+
+
+class RoutedLLM(LLMWrapper):
+    """An agent's model (see create_llm in crew/agents.py) with an optional fallback.
+
+    Calls the primary model fails with a timeout (its latency budget), rate
+    limit or server error are sent to the fallback model. Every call's
+    latency is recorded for the agent, in `latency` and as a metric.
+    """
+
+    agent: str = "default"
+    fallback: Optional[BaseLLM] = None
+    _latency: LatencyStats = PrivateAttr(default_factory=LatencyStats)
+
+    @classmethod
+    def wrap(cls, llm: BaseLLM, fallback: Optional[BaseLLM] = None, agent: str = "default") -> "RoutedLLM":
+        return cls._wrap(llm, fallback=fallback, agent=agent)
+
+    @property
+    def latency(self) -> LatencyStats:
+        return self._latency
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ):
+        kwargs = dict(
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+            response_model=response_model,
+        )
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            try:
+                response = self._call_inner(messages, self.stop_sequences, **kwargs)
+            except Exception as e:
+                if self.fallback is None or not is_retryable(e):
+                    raise
+                logger.warning(f"⏱️ {self.model} failed for {self.agent} ({type(e).__name__}), using {self.fallback.model}.")
+                response = self._call_inner(messages, self.stop_sequences, llm=self.fallback, **kwargs)
+                outcome = "fallback"
+            else:
+                outcome = "ok"
+            return response
+        finally:
+            seconds = time.perf_counter() - start
+            self._latency.record(seconds, outcome)
+            LLM_AGENT_SECONDS.observe(seconds, agent=self.agent, model=self.model, outcome=outcome)
+
+    def usage_by_model(self) -> Dict[str, Any]:
+        """Provider token usage of the primary and the fallback model"""
+        usage = {self.inner.model: self.inner.get_token_usage_summary()}
+        if self.fallback is not None:
+            usage[self.fallback.model] = self.fallback.get_token_usage_summary()
+        return usage
@@ -0,0 +1,259 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from crewai import Crew, Process, Task
+from loguru import logger
+from src.config.settings import settings
+from crew.agents import create_agent_llms, create_agents, create_llm
+from crew.checkpoints import STAGES, CheckpointStore, make_run_id
+from crew.llm import llm_cache_stats
+from crew.progress import ProgressReporter
+from crew.tasks import create_tasks
+from src.telemetry.metrics import LLM_TOKENS, RUNS
+from src.telemetry.tracing import propagate, record_agent_step, span, start_trace
+from src.tools.compaction import CompactionStats, SearchResultCompactor
+from src.tools.tavily_tool import create_search_tools
+from src.tools.warming import format_suggestions, prefetch, research_queries, use_case_queries
+
+# Upstream outputs are handed to a stage through kickoff inputs under these names
+CONTEXT_LABELS = {
+    "research_summary": "Research summary",
+    "use_cases": "Use cases",
+    "use_cases_with_resources": "Use cases with resource links",
+    "suggested_searches": "Suggested searches (already being fetched: run them together with the batch search tool first)",
+}
+
+# Start of each use case in the use_case_generation_task output ("Use case title: ...",
+# possibly bulleted, numbered or bolded by the LLM)
+_USE_CASE_START = re.compile(r"^[\s#>*\-\d.)]*use case title\s*\**\s*:", re.IGNORECASE | re.MULTILINE)
+
+
+def split_use_cases(use_cases_text: str) -> List[str]:
+    """Split the use case generator output into one block per use case"""
+    starts = [m.start() for m in _USE_CASE_START.finditer(use_cases_text)]
+    if len(starts) < 2:
+        return [use_cases_text.strip()]
+    # Keep any preamble attached to the first use case
+    starts[0] = 0
+    bounds = starts + [len(use_cases_text)]
+    return [use_cases_text[a:b].strip() for a, b in zip(bounds, bounds[1:])]
+
+
+def _with_context(task: Task, *context_keys: str, agent=None) -> Task:
+    """Standalone copy of a task that reads its upstream outputs from the kickoff inputs"""
+    context = "".join(f"\n\n{CONTEXT_LABELS[key]}:\n{{{key}}}" for key in context_keys)
+    return Task(
+        name=task.name,
+        description=task.description + context,
+        expected_output=task.expected_output,
+        agent=agent or task.agent,
+    )
+
+
+def _with_prefetch(task: Task, inputs: Dict[str, str], queries: List[str], *context_keys: str) -> Tuple[Task, Dict[str, str]]:
+    """Task and inputs of a stage, suggesting `queries` to its agent after starting them
+    in the background (see src/tools/warming.py) when SEARCH_PREFETCH_ENABLED"""
+    if not settings.SEARCH_PREFETCH_ENABLED or not queries:
+        return _with_context(task, *context_keys), inputs
+    prefetch(queries)
+    return _with_context(task, *context_keys, "suggested_searches"), {**inputs, "suggested_searches": format_suggestions(queries)}
+
+
+def _run_task(
+    task: Task,
+    inputs: Dict[str, str],
+    progress: Optional[ProgressReporter] = None,
+    stage: Optional[str] = None,
+) -> str:
+    """Run a single task in its own crew and return the raw output"""
+    callbacks = {"step_callback": record_agent_step}
+    if progress:
+        def on_step(step) -> None:
+            record_agent_step(step)
+            progress.step_callback(step)
+        callbacks = {"step_callback": on_step, "task_callback": progress.task_callback(stage)}
+    crew = Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=True, **callbacks)
+    with span("task", task.name or "task", stage=stage, agent=task.agent.role):
+        return crew.kickoff(inputs=inputs).raw
+
+
+def collect_resources_parallel(
+    use_cases: List[str],
+    inputs: Dict[str, str],
+    llm=None,
+    parallelism: Optional[int] = None,
+    tools_factory=None,
+    progress: Optional[ProgressReporter] = None,
+) -> str:
+    """Run one resource collection job per use case concurrently and merge the results.
+
+    Every job gets its own agent, since crewai agents are not safe to share
+    between threads, with its own tools from `tools_factory` (see
+    create_agents). A failed job keeps its use case without resources
+    rather than failing the report.
+    """
+    llm = llm or create_llm(agent="resource_collector")
+    parallelism = max(1, min(parallelism or settings.RESOURCE_COLLECTION_PARALLELISM, len(use_cases)))
+    logger.info(f"📚 Collecting resources for {len(use_cases)} use cases ({parallelism} at a time)...")
+
+    def collect(use_case: str) -> str:
+        agents = create_agents(llm, tools_factory=tools_factory)
+        if progress:
+            progress.watch_agents([agents["resource_collector"]])
+        task = _with_context(create_tasks(agents)["resource_collection_task"], "use_cases")
+        try:
+            return _run_task(task, {**inputs, "use_cases": use_case}, progress, stage="resources")
+        except Exception as e:
+            logger.error(f"❌ Resource collection failed for a use case: {e}")
+            return f"{use_case}\nPotential Resources:\n- No Specific public resources readily found"
+
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        collected = list(executor.map(propagate(collect), use_cases))
+    return "\n\n".join(collected)
+
+
+def _run_stage(
+    store: CheckpointStore,
+    stage: str,
+    resume: bool,
+    run: Callable[[], str],
+    progress: Optional[ProgressReporter] = None,
+) -> str:
+    """Return the checkpointed output of a stage when resuming, otherwise run and checkpoint it"""
+    if progress:
+        progress.stage_started(stage)
+    with span("stage", stage, resumed=False) as stage_span:
+        if resume:
+            output = store.load(stage)
+            if output is not None:
+                logger.info(f"⏭️ Skipping stage '{stage}', using its checkpoint from run {store.run_id}.")
+                stage_span.attributes["resumed"] = True
+                if progress:
+                    progress.emit("task_output", text=output, stage=stage, resumed=True)
+                return output
+        output = run()
+        store.save(stage, output)
+        return output
+
+
+def run_market_research(
+    inputs: Dict[str, str],
+    parallelism: Optional[int] = None,
+    run_id: Optional[str] = None,
+    resume: bool = False,
+    rerun_from: Optional[str] = None,
+    progress: Optional[ProgressReporter] = None,
+) -> str:
+    """Run the full report pipeline and return the final Markdown proposal.
+
+    research -> use case generation -> resource collection (fanned out per
+    use case) -> proposal synthesis. Latency of the resource stage is bound
+    by the slowest use case instead of the sum of all of them.
+
+    Each stage output is checkpointed under `run_id` (derived from the inputs
+    by default). With `resume`, completed stages are skipped and their
+    checkpoints fed forward. `rerun_from` discards the checkpoint of that
+    stage and the ones after it, e.g. rerun_from="synthesis" only rewrites
+    the proposal.
+
+    With a `progress` reporter, task outputs, agent steps, search calls and
+    LLM tokens are pushed to it as they happen.
+
+    With SEARCH_PREFETCH_ENABLED, the standard company profile, AI trend and
+    competitor searches (src/tools/warming.py) of the research and use case
+    stages are started in the background as each stage begins, and suggested
+    to its agent.
+
+    Stages, tasks, agent steps, LLM and tool calls are recorded as spans of
+    one trace per run, written under TRACE_DIR (see src/telemetry).
+    """
+    store = CheckpointStore(run_id or make_run_id(inputs))
+    if rerun_from:
+        if rerun_from not in STAGES:
+            raise ValueError(f"Unknown stage '{rerun_from}', expected one of {STAGES}")
+        store.clear(from_stage=rerun_from)
+        resume = True
+    elif not resume:
+        # A fresh run must not leave an older run's later stages behind for a future resume
+        store.clear()
+
+    llms = create_agent_llms(stream=progress is not None)
+    # Every agent gets its own tools (and seen URLs); their compaction is totalled for the run
+    compaction = CompactionStats()
+
+    def make_tools():
+        listener = progress.on_search if progress else None
+        return create_search_tools(listener=listener, compactor=SearchResultCompactor(stats=compaction))
+
+    agents = create_agents(llms=llms, tools_factory=make_tools)
+    tasks = create_tasks(agents)
+    if progress:
+        progress.watch_agents(agents.values())
+
+    status = "error"
+    with start_trace(store.run_id, inputs=inputs, resume=resume, rerun_from=rerun_from) as trace:
+        try:
+            # 1. Research the company/industry
+            logger.info("🔬 Stage 1/4: research")
+            research_summary = _run_stage(store, "research", resume, lambda: _run_task(
+                *_with_prefetch(tasks["research_task"], inputs, research_queries(inputs)), progress, "research"
+            ), progress)
+
+            # 2. Generate use cases from the research; its trend and competitor searches
+            # start as soon as the research is done, while the agent's first LLM call runs
+            logger.info("💡 Stage 2/4: use case generation")
+            use_cases_text = _run_stage(store, "use_cases", resume, lambda: _run_task(
+                *_with_prefetch(
+                    tasks["use_case_generation_task"],
+                    {**inputs, "research_summary": research_summary},
+                    use_case_queries(inputs, research_summary),
+                    "research_summary",
+                ),
+                progress, "use_cases",
+            ), progress)
+
+            # 3. Collect resources for every use case concurrently
+            logger.info("📚 Stage 3/4: resource collection")
+            use_cases_with_resources = _run_stage(store, "resources", resume, lambda: collect_resources_parallel(
+                split_use_cases(use_cases_text), inputs, llm=llms["resource_collector"], parallelism=parallelism, tools_factory=make_tools,
+                progress=progress,
+            ), progress)
+
+            # 4. Write the proposal
+            logger.info("📝 Stage 4/4: proposal synthesis")
+            report = _run_stage(store, "synthesis", resume, lambda: _run_task(
+                _with_context(tasks["proposal_synthesis_task"], "research_summary", "use_cases_with_resources"),
+                {**inputs, "research_summary": research_summary, "use_cases_with_resources": use_cases_with_resources},
+                progress, "synthesis",
+            ), progress)
+            status = "success"
+            return report
+        finally:
+            RUNS.inc(status=status)
+            stats = compaction.snapshot()
+            if stats["results"]:
+                logger.info(
+                    f"✂️ Search results compacted: {stats['raw_tokens']} -> {stats['compact_tokens']} tokens "
+                    f"({stats['tokens_saved']} saved, {stats['duplicate_urls']} repeated URLs)."
+                )
+            # Exact provider counts for the run (spans only carry estimates)
+            usage_by_model: Dict[str, Dict[str, int]] = {}
+            for agent_llm in llms.values():
+                for model, usage in agent_llm.usage_by_model().items():
+                    LLM_TOKENS.inc(usage.prompt_tokens, model=model, type="prompt")
+                    LLM_TOKENS.inc(usage.completion_tokens, model=model, type="completion")
+                    totals = usage_by_model.setdefault(model, {"prompt_tokens": 0, "completion_tokens": 0})
+                    totals["prompt_tokens"] += usage.prompt_tokens
+                    totals["completion_tokens"] += usage.completion_tokens
+            latency = {agent: agent_llm.latency.snapshot() for agent, agent_llm in llms.items() if agent_llm.latency.calls}
+            if latency:
+                logger.info("⏱️ LLM time by agent: " + ", ".join(
+                    f"{agent} {s['total_seconds']:.0f}s over {s['calls']} calls (p95 {s['p95_seconds']:.1f}s, {s['fallbacks']} fallbacks)"
+                    for agent, s in latency.items()
+                ))
+            trace.attributes.update(llm_usage=usage_by_model, llm_latency=latency, search_compaction=stats, status=status)
+            llm_stats = llm_cache_stats.snapshot()
+            if llm_stats["hits"]:
+                logger.info(f"♻️ LLM cache: {llm_stats['hits']} hits in this process, {llm_stats['latency_saved_seconds']:.0f}s of LLM time saved.")
+            if progress:
+                progress.close()
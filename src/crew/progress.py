@@ -0,0 +1,110 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+
+@dataclass
+class ProgressEvent:
+    kind: str  # "stage_started", "task_output", "tool_call", "step" or "token"
+    stage: Optional[str] = None
+    text: str = ""
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+
+# Agent id -> reporter of the run the agent belongs to, for LLM token events
+_reporters_by_agent: Dict[str, "ProgressReporter"] = {}
+_reporters_lock = threading.Lock()
+_stream_handler_registered = False
+
+
+def _on_stream_chunk(source, event) -> None:
+    with _reporters_lock:
+        reporter = _reporters_by_agent.get(str(event.agent_id or ""))
+    if reporter and event.chunk:
+        reporter.emit("token", text=event.chunk, agent=event.agent_role)
+
+
+def _ensure_stream_handler() -> None:
+    """Register one process-wide crewai listener that fans token chunks out to reporters"""
+    global _stream_handler_registered
+    with _reporters_lock:
+        if _stream_handler_registered:
+            return
+        from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+        crewai_event_bus.on(LLMStreamChunkEvent)(_on_stream_chunk)
+        _stream_handler_registered = True
+
+
+class ProgressReporter:
+    """Thread-safe feed of one pipeline run's progress.
+
+    The pipeline pushes events from its worker threads (crewai step and
+    task callbacks, search tool calls, LLM token chunks) and a consumer such
+    as the Streamlit script thread drains them to update the page.
+    """
+
+    def __init__(self):
+        self._events: "queue.Queue[ProgressEvent]" = queue.Queue()
+        self._agent_ids: List[str] = []
+        self.current_stage: Optional[str] = None
+
+    def emit(self, kind: str, text: str = "", stage: Optional[str] = None, **data) -> None:
+        self._events.put(ProgressEvent(kind=kind, stage=stage or self.current_stage, text=text, data=data))
+
+    def drain(self) -> List[ProgressEvent]:
+        """Return every event pushed since the last call"""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    # --- Hooks handed to the pipeline ---
+
+    def stage_started(self, stage: str) -> None:
+        self.current_stage = stage
+        self.emit("stage_started", stage=stage)
+
+    def task_callback(self, stage: str):
+        """crewai task_callback that reports the task output under a pipeline stage"""
+        def on_task(task_output) -> None:
+            self.emit("task_output", text=str(task_output.raw), stage=stage, agent=task_output.agent)
+        return on_task
+
+    def step_callback(self, step) -> None:
+        """crewai step_callback: reports tool actions and finished reasoning steps"""
+        tool = getattr(step, "tool", None)
+        if tool:
+            self.emit("step", text=f"{tool}: {getattr(step, 'tool_input', '')}", tool=tool)
+        else:
+            self.emit("step", text=str(getattr(step, "thought", "") or ""))
+
+    def on_search(self, result: Dict[str, Any]) -> None:
+        """Listener for the search tools, called once per query with its result"""
+        self.emit(
+            "tool_call",
+            text=result.get("query", ""),
+            status=result.get("status"),
+            cache_tier=result.get("cache_tier") if result.get("response_type") == "cached" else None,
+        )
+
+    def watch_agents(self, agents: Iterable) -> None:
+        """Forward LLM token chunks produced by these agents to this reporter"""
+        _ensure_stream_handler()
+        with _reporters_lock:
+            for agent in agents:
+                self._agent_ids.append(str(agent.id))
+                _reporters_by_agent[str(agent.id)] = self
+
+    def close(self) -> None:
+        with _reporters_lock:
+            for agent_id in self._agent_ids:
+                _reporters_by_agent.pop(agent_id, None)
+        self._agent_ids.clear()
+        logger.debug("Progress reporter closed.")
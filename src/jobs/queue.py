@@ -0,0 +1,324 @@
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import redis.exceptions
+from loguru import logger
+from src.config.settings import settings
+from src.crew.checkpoints import make_run_id
+from src.tools.clients import get_redis_client, redis_breaker
+
+FINISHED_STATES = ("done", "failed")
+
+
+class QueueFullError(RuntimeError):
+    """Raised when admission control turns a job away"""
+
+
+def _tracking_key(inputs: Dict[str, str], track_active: bool) -> str:
+    """Key of the job submit joins for these inputs: the job serving requests, or their background refresh"""
+    return f"jobs:{'active' if track_active else 'refresh'}:{make_run_id(inputs)}"
+
+
+@dataclass
+class Job:
+    id: str
+    inputs: Dict[str, str]
+    options: Dict[str, Any] = field(default_factory=dict)  # resume / force_refresh
+    status: str = "queued"  # "queued", "running", "done" or "failed"
+    result: Optional[str] = None
+    source: Optional[str] = None  # "generated", "cached" or "stale", see get_or_generate_report
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    updated_at: float = field(default_factory=time.time)  # Worker heartbeat while running
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def is_stalled(self) -> bool:
+        """True when the worker running this job stopped reporting (e.g. it was killed)"""
+        return self.status == "running" and time.time() - self.updated_at > settings.JOB_STALL_SECONDS
+
+
+class RedisJobQueue:
+    """Job queue shared by the app and any number of worker processes.
+
+    jobs:pending            list of queued job IDs (LPUSH / RPOP, so FIFO; requeued jobs go back on the RPOP end)
+    job:{id}                JSON job record
+    job:{id}:events         progress events pushed by the worker
+    jobs:active:{run_id}    job currently generating the report for some inputs
+    jobs:refresh:{run_id}   background refresh of a stale report for some inputs (not joined by submit)
+    """
+
+    PENDING_KEY = "jobs:pending"
+
+    def __init__(self, redis_client=None):
+        self._client = redis_client
+
+    @property
+    def client(self):
+        client = self._client or get_redis_client()
+        if client is None:
+            raise ConnectionError("Redis is unavailable, cannot reach the job queue.")
+        return client
+
+    def _call(self, method: str, *args, **kwargs):
+        try:
+            result = getattr(self.client, method)(*args, **kwargs)
+            redis_breaker.record_success()
+            return result
+        except redis.exceptions.RedisError as e:
+            redis_breaker.record_failure()
+            raise ConnectionError(f"Job queue Redis error: {e}") from e
+
+    def _execute(self, pipe):
+        try:
+            result = pipe.execute()
+            redis_breaker.record_success()
+            return result
+        except redis.exceptions.RedisError as e:
+            redis_breaker.record_failure()
+            raise ConnectionError(f"Job queue Redis error: {e}") from e
+
+    def _enqueue(self, job: Job, push: str, *extra) -> None:
+        """Write `job` and list it as pending in one transaction, so it is never queued but unlisted"""
+        job.updated_at = time.time()
+        pipe = self.client.pipeline()
+        pipe.set(f"job:{job.id}", json.dumps(asdict(job)), ex=settings.JOB_TTL)
+        for command in extra:
+            command(pipe)
+        getattr(pipe, push)(self.PENDING_KEY, job.id)
+        self._execute(pipe)
+
+    def submit(self, inputs: Dict[str, str], track_active: bool = True, **options) -> str:
+        """Queue a report job and return its ID.
+
+        A report already queued or running for the same inputs is joined
+        instead of starting a second crew (the two would also share checkpoints).
+        With `track_active` False (background refreshes) the job is only
+        deduplicated against other refreshes, so requests for the inputs are
+        still answered from the stale report rather than waiting on it.
+        """
+        active_key = _tracking_key(inputs, track_active)
+        active_id = self._call("get", active_key)
+        if active_id:
+            active = self.get(active_id)
+            if active and not active.finished and not self.is_stalled(active):
+                logger.info(f"🔗 Joining job {active_id} already working on {inputs}.")
+                return active_id
+        if self._call("llen", self.PENDING_KEY) >= settings.JOB_MAX_PENDING:
+            raise QueueFullError(f"{settings.JOB_MAX_PENDING} reports are already waiting, please try again later.")
+
+        job = Job(id=uuid.uuid4().hex, inputs=inputs, options=options)
+        self._enqueue(job, "lpush", lambda pipe: pipe.set(active_key, job.id, ex=settings.JOB_TTL))
+        logger.info(f"📥 Job {job.id} queued for {inputs}.")
+        return job.id
+
+    def claim(self) -> Optional[Job]:
+        """Take the oldest queued job and mark it running, or None if there is none.
+
+        The pop and the status change are one transaction (retried when another
+        worker claims first), so a worker dying in between cannot leave a job
+        that is neither on the pending list nor running.
+        """
+
+        def pop_and_mark(pipe) -> Optional[Job]:
+            job_id = pipe.lindex(self.PENDING_KEY, -1)
+            if job_id is None:
+                return None
+            pipe.watch(f"job:{job_id}")
+            raw = pipe.get(f"job:{job_id}")
+            pipe.multi()
+            pipe.rpop(self.PENDING_KEY)
+            if not raw:
+                return None  # Expired record, the ID is dropped
+            job = Job(**json.loads(raw))
+            job.status, job.started_at = "running", time.time()
+            job.updated_at = job.started_at
+            pipe.set(f"job:{job.id}", json.dumps(asdict(job)), ex=settings.JOB_TTL)
+            return job
+
+        try:
+            job = self.client.transaction(pop_and_mark, self.PENDING_KEY, value_from_callable=True)
+            redis_breaker.record_success()
+            return job
+        except redis.exceptions.RedisError as e:
+            redis_breaker.record_failure()
+            raise ConnectionError(f"Job queue Redis error: {e}") from e
+
+    def requeue(self, job: Job) -> None:
+        """Put a running job its worker gave up on back at the front of the queue.
+
+        The next worker resumes it from its stage checkpoints.
+        """
+        job.status, job.started_at = "queued", None
+        job.options = {**job.options, "resume": True}
+        self._enqueue(job, "rpush")
+        logger.info(f"↩️ Job {job.id} put back on the queue.")
+
+    def is_stalled(self, job: Job) -> bool:
+        """True when no worker is going to finish `job`: its worker stopped
+        reporting, or it is queued but no longer on the pending list"""
+        if job.status != "queued":
+            return job.is_stalled()
+        if self._call("lpos", self.PENDING_KEY, job.id) is not None:
+            return False
+        # Not listed: lost, unless a worker claimed it since it was read
+        current = self.get(job.id)
+        return current is None or current.status == "queued" or current.is_stalled()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        raw = self._call("get", f"job:{job_id}")
+        return Job(**json.loads(raw)) if raw else None
+
+    def update(self, job: Job) -> None:
+        job.updated_at = time.time()
+        self._call("set", f"job:{job.id}", json.dumps(asdict(job)), ex=settings.JOB_TTL)
+
+    def finish(self, job: Job) -> None:
+        job.finished_at = time.time()
+        self.update(job)
+        for active_key in (_tracking_key(job.inputs, True), _tracking_key(job.inputs, False)):
+            if self._call("get", active_key) == job.id:
+                self._call("delete", active_key)
+
+    def add_events(self, job_id: str, events: List[Dict[str, Any]]) -> None:
+        if not events:
+            return
+        key = f"job:{job_id}:events"
+        pipe = self.client.pipeline()
+        pipe.rpush(key, *(json.dumps(event, default=str) for event in events))
+        pipe.expire(key, settings.JOB_TTL)
+        self._execute(pipe)
+
+    def events(self, job_id: str, start: int = 0) -> List[Dict[str, Any]]:
+        """Events of a job from index `start` on"""
+        return [json.loads(event) for event in self._call("lrange", f"job:{job_id}:events", start, -1)]
+
+    def pending(self) -> int:
+        return self._call("llen", self.PENDING_KEY)
+
+
+class LocalJobQueue:
+    """In-process stand-in for RedisJobQueue, worked by threads of this process.
+
+    Used when JOB_BACKEND is "local": no separate workers to deploy, but the
+    number of concurrent crews and waiting jobs is still bounded.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._events: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending = deque()
+        self._active: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, inputs: Dict[str, str], track_active: bool = True, **options) -> str:
+        active_key = _tracking_key(inputs, track_active)
+        with self._lock:
+            active = self._jobs.get(self._active.get(active_key, ""))
+            if active and not active.finished and not active.is_stalled():
+                logger.info(f"🔗 Joining job {active.id} already working on {inputs}.")
+                return active.id
+            if len(self._pending) >= settings.JOB_MAX_PENDING:
+                raise QueueFullError(f"{settings.JOB_MAX_PENDING} reports are already waiting, please try again later.")
+            job = Job(id=uuid.uuid4().hex, inputs=inputs, options=options)
+            self._jobs[job.id] = job
+            self._events[job.id] = []
+            self._active[active_key] = job.id
+            self._pending.append(job.id)
+        logger.info(f"📥 Job {job.id} queued for {inputs}.")
+        return job.id
+
+    def claim(self) -> Optional[Job]:
+        with self._lock:
+            if not self._pending:
+                return None
+            job = self._jobs[self._pending.popleft()]
+            job.status, job.started_at = "running", time.time()
+            job.updated_at = time.time()
+            return Job(**asdict(job))
+
+    def requeue(self, job: Job) -> None:
+        job.status, job.started_at = "queued", None
+        job.options = {**job.options, "resume": True}
+        job.updated_at = time.time()
+        with self._lock:
+            self._jobs[job.id] = Job(**asdict(job))
+            self._pending.appendleft(job.id)
+
+    def is_stalled(self, job: Job) -> bool:
+        with self._lock:
+            # Claiming happens under the lock, so a listed job is never lost
+            current = self._jobs.get(job.id)
+            if current is None or (current.status == "queued" and job.id not in self._pending):
+                return True
+        return current.is_stalled()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            # Copies, so readers never see a half-updated job
+            return Job(**asdict(job)) if job else None
+
+    def update(self, job: Job) -> None:
+        job.updated_at = time.time()
+        with self._lock:
+            self._jobs[job.id] = Job(**asdict(job))
+
+    def finish(self, job: Job) -> None:
+        job.finished_at = time.time()
+        self.update(job)
+        with self._lock:
+            for active_key in (_tracking_key(job.inputs, True), _tracking_key(job.inputs, False)):
+                if self._active.get(active_key) == job.id:
+                    del self._active[active_key]
+            self._expire()
+
+    def _expire(self) -> None:
+        # Finished jobs are kept for JOB_TTL, like their Redis counterparts
+        cutoff = time.time() - settings.JOB_TTL
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+            self._events.pop(job_id, None)
+
+    def add_events(self, job_id: str, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._events.setdefault(job_id, []).extend(events)
+
+    def events(self, job_id: str, start: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._events.get(job_id, [])[start:])
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+_local_queue: Optional[LocalJobQueue] = None
+_local_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Job queue for the configured JOB_BACKEND.
+
+    "redis": jobs are consumed by worker processes (`PYTHONPATH=. python src/worker.py`).
+    "local": jobs are consumed by JOB_WORKERS threads started in this process.
+    """
+    global _local_queue
+    if settings.JOB_BACKEND == "redis":
+        return RedisJobQueue()
+    if _local_queue is None:
+        with _local_queue_lock:
+            if _local_queue is None:
+                from src.jobs.worker import start_worker_threads
+                _local_queue = LocalJobQueue()
+                start_worker_threads(_local_queue, settings.JOB_WORKERS)
+    return _local_queue
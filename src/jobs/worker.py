@@ -0,0 +1,165 @@
+import threading
+import uuid
+from dataclasses import asdict
+from functools import partial
+from typing import Dict, List, Optional
+
+from loguru import logger
+from src.config.settings import settings
+
+# Seconds between progress flushes (and heartbeats) of a running job
+EVENT_FLUSH_INTERVAL = 0.5
+
+# Jobs the workers of this process are running, by ID
+_running_jobs: Dict[str, object] = {}
+# Held while writing a running job's progress or outcome; once the jobs are
+# released (see release_running_jobs) their threads write nothing more
+_publish_lock = threading.Lock()
+_released = threading.Event()
+
+
+def _serialize_events(events) -> List[dict]:
+    """ProgressEvents as dicts, with consecutive LLM token chunks merged into one event"""
+    serialized = []
+    for event in events:
+        event = asdict(event)
+        last = serialized[-1] if serialized else None
+        if event["kind"] == "token" and last and last["kind"] == "token" and last["stage"] == event["stage"]:
+            last["text"] += event["text"]
+        else:
+            serialized.append(event)
+    return serialized
+
+
+def run_job(queue, job) -> None:
+    """Generate the report of a claimed job, publishing its progress and result on the queue"""
+    from src.crew.pipeline import run_market_research
+    from src.crew.progress import ProgressReporter
+    from src.reports.cache import get_or_generate_report
+
+    reporter = ProgressReporter()
+    stop = threading.Event()
+
+    def pump():
+        while not stop.wait(EVENT_FLUSH_INTERVAL):
+            with _publish_lock:
+                if _released.is_set():
+                    return
+                try:
+                    queue.add_events(job.id, _serialize_events(reporter.drain()))
+                    queue.update(job)  # Heartbeat
+                except ConnectionError as e:
+                    logger.warning(f"⚠️ Could not publish progress of job {job.id}: {e}")
+
+    pump_thread = threading.Thread(target=pump, name=f"job-{job.id[:8]}-events", daemon=True)
+    pump_thread.start()
+    logger.info(f"⚙️ Job {job.id} started for {job.inputs}.")
+    # The outcome is only set on the job once its last events are published,
+    # so a poller that sees it finished has every event
+    outcome = {"status": "failed", "error": "Worker stopped before the report was finished."}
+    try:
+        generate = partial(
+            run_market_research,
+            run_id=job.options.get("run_id"),
+            resume=job.options.get("resume", False),
+            progress=reporter,
+        )
+        result, source = get_or_generate_report(
+            job.inputs, generate, force_refresh=job.options.get("force_refresh", False), background_refresh=False
+        )
+        outcome = {"status": "done", "error": None, "result": result, "source": source}
+        logger.success(f"✅ Job {job.id} finished (report {source}).")
+    except Exception as e:
+        outcome = {"status": "failed", "error": str(e)}
+        logger.error(f"❌ Job {job.id} failed: {e}")
+    finally:
+        stop.set()
+        pump_thread.join()
+        with _publish_lock:
+            _running_jobs.pop(job.id, None)
+            if not _released.is_set():
+                queue.add_events(job.id, _serialize_events(reporter.drain()))
+                for name, value in outcome.items():
+                    setattr(job, name, value)
+                queue.finish(job)
+    if outcome.get("source") == "stale" and not _released.is_set():
+        _queue_refresh(queue, job.inputs)
+
+
+def _queue_refresh(queue, inputs) -> None:
+    """Regenerate a stale report as a job of its own, once the job that served it is finished.
+
+    It gets its own run ID, so it neither clears nor resumes the checkpoints
+    of a job working on the same inputs. It is not tracked as the active job
+    of the inputs, so requests meanwhile keep getting the stale report
+    instead of joining it; a refresh already queued is joined instead.
+    """
+    from src.crew.checkpoints import make_run_id
+    from src.jobs.queue import QueueFullError
+
+    try:
+        queue.submit(
+            inputs, track_active=False, force_refresh=True, run_id=f"{make_run_id(inputs)}-refresh-{uuid.uuid4().hex[:8]}"
+        )
+    except (QueueFullError, ConnectionError) as e:
+        logger.warning(f"⚠️ Could not queue a refresh of the stale report for {inputs}: {e}")
+
+
+def work(queue, stop: Optional[threading.Event] = None) -> None:
+    """Claim and run jobs one at a time until `stop` is set"""
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            job = queue.claim()
+        except ConnectionError as e:
+            logger.warning(f"⚠️ Could not poll the job queue: {e}")
+            job = None
+        if job is None:
+            stop.wait(settings.JOB_POLL_INTERVAL)
+            continue
+        with _publish_lock:
+            released = _released.is_set()
+            if not released:
+                _running_jobs[job.id] = job
+        if released:
+            # Claimed while the process was shutting down
+            queue.requeue(job)
+            return
+        try:
+            run_job(queue, job)
+        except ConnectionError as e:
+            logger.error(f"❌ Could not record the outcome of job {job.id}: {e}")
+        finally:
+            with _publish_lock:
+                _running_jobs.pop(job.id, None)
+
+
+def release_running_jobs(queue) -> List[str]:
+    """Put the jobs still running in this process back on the queue, for a
+    worker shutting down; returns their IDs.
+
+    Their threads stop publishing progress or outcomes, so the process can
+    exit without them; another worker resumes each job from its checkpoints.
+    """
+    with _publish_lock:
+        _released.set()
+        jobs = list(_running_jobs.values())
+        _running_jobs.clear()
+    for job in jobs:
+        try:
+            queue.requeue(job)
+        except ConnectionError as e:
+            # Reported as failed once JOB_STALL_SECONDS pass without a heartbeat
+            logger.error(f"❌ Could not put job {job.id} back on the queue: {e}")
+    return [job.id for job in jobs]
+
+
+def start_worker_threads(queue, count: int) -> List[threading.Thread]:
+    """Work the queue with `count` daemon threads of this process"""
+    threads = []
+    for i in range(count):
+        thread = threading.Thread(target=work, args=(queue,), name=f"job-worker-{i}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    logger.info(f"👷 Started {count} local job workers.")
+    return threads
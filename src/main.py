@@ -1,4 +1,17 @@
-from crew.crew import market_research_crew
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+from crew.checkpoints import STAGES, make_run_id
+from crew.pipeline import run_market_research
+from src.batch_io import load_batch
+from src.config.settings import settings
+from src.reports.cache import get_cached_report, get_or_generate_report, wait_for_background_refreshes
 from loguru import logger
 
 inputs = {
@@ -7,12 +20,138 @@ inputs = {
 }
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate an AI use case proposal for a company or industry.")
+    parser.add_argument("--company", default=inputs['company_name'], help="Company name to research")
+    parser.add_argument("--industry", default=inputs['industry_name'], help="Industry name to research")
+    parser.add_argument("--run-id", help="Checkpoint run ID (defaults to one derived from the inputs)")
+    parser.add_argument("--resume", action="store_true", help="Skip stages completed by a previous run with the same run ID")
+    parser.add_argument("--rerun-from", choices=STAGES, help="Re-run this stage and the ones after it, reusing earlier checkpoints")
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--input", help="CSV or JSONL file of company_name/industry_name pairs; generates a report for each")
+    batch.add_argument("--output-dir", default="reports", help="Directory the batch proposals are written to")
+    batch.add_argument("--concurrency", type=int, default=4, help="Reports generated at once (one process each)")
+    batch.add_argument("--max-age", type=float, default=settings.REPORT_CACHE_STALE_AFTER,
+                       help="Skip entries whose proposal in the output directory is younger than this (seconds)")
+    return parser.parse_args()
+
+
+def output_path(inputs, output_dir) -> Path:
+    name = re.sub(r'[^\w\-]+', '_', inputs.get('company_name') or inputs.get('industry_name') or 'output')
+    return Path(output_dir) / f"proposal_{name}.md"
+
+
+def unique_entries(entries):
+    """Batch entries without repeats (same inputs once normalized), which would run
+    as one report twice and clear each other's checkpoints"""
+    unique = {}
+    for inputs in entries:
+        unique.setdefault(make_run_id(inputs), inputs)
+    return list(unique.values())
+
+
+def output_paths(entries, output_dir):
+    """Proposal path of each entry; entries whose names clash (e.g. one company in two
+    industries) get their run ID in the file name instead of overwriting each other"""
+    paths = [output_path(inputs, output_dir) for inputs in entries]
+    counts = Counter(paths)
+    return [
+        path.with_name(f"{path.stem}_{make_run_id(inputs)[:8]}{path.suffix}") if counts[path] > 1 else path
+        for inputs, path in zip(entries, paths)
+    ]
+
+
+def generate_report(inputs, path):
+    """Batch worker (runs in its own process): write one proposal and report how it went"""
+    started = time.perf_counter()
+    try:
+        result, source = get_or_generate_report(inputs, run_market_research)
+        if source == "stale":
+            # The batch is there to produce fresh reports, so wait for the refresh
+            wait_for_background_refreshes()
+            result = (get_cached_report(inputs) or {}).get("report", result)
+        Path(path).write_text(str(result), encoding='utf-8')
+        return {"inputs": inputs, "status": source, "seconds": time.perf_counter() - started}
+    except Exception as e:
+        logger.error(f"❌ Report failed for {inputs}: {e}")
+        return {"inputs": inputs, "status": "failed", "error": str(e), "seconds": time.perf_counter() - started}
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))] if values else 0.0
+
+
+def run_batch(args):
+    loaded = load_batch(args.input)
+    entries = unique_entries(loaded)
+    if len(entries) < len(loaded):
+        logger.info(f"🔁 Batch: {len(loaded) - len(entries)} repeated entries dropped.")
+    os.makedirs(args.output_dir, exist_ok=True)
+    outcomes, todo = [], []
+    for inputs, path in zip(entries, output_paths(entries, args.output_dir)):
+        if path.exists() and time.time() - path.stat().st_mtime < args.max_age:
+            outcomes.append({"inputs": inputs, "status": "skipped", "seconds": 0.0})
+        else:
+            todo.append((inputs, path))
+    logger.info(f"🚀 Batch: {len(entries)} entries, {len(outcomes)} already fresh, generating {len(todo)} ({args.concurrency} at a time)...")
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        futures = {executor.submit(generate_report, inputs, str(path)): inputs for inputs, path in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                outcome = future.result()
+            except Exception as e:
+                # The worker process itself died; the rest of the batch carries on
+                outcome = {"inputs": futures[future], "status": "failed", "error": repr(e), "seconds": 0.0}
+            outcomes.append(outcome)
+            logger.info(f"📄 [{done}/{len(todo)}] {outcome['inputs']}: {outcome['status']} in {outcome['seconds']:.0f}s")
+    wall_seconds = time.perf_counter() - started
+
+    produced = [o for o in outcomes if o["status"] in ("generated", "cached", "stale")]
+    failed = [o for o in outcomes if o["status"] == "failed"]
+    latencies = [o["seconds"] for o in produced]
+    summary = {
+        "entries": len(entries),
+        "duplicates": len(loaded) - len(entries),
+        "generated": sum(o["status"] == "generated" for o in outcomes),
+        "from_cache": sum(o["status"] in ("cached", "stale") for o in outcomes),
+        "skipped": sum(o["status"] == "skipped" for o in outcomes),
+        "failed": len(failed),
+        "wall_seconds": round(wall_seconds, 1),
+        "reports_per_hour": round(len(produced) / wall_seconds * 3600, 1) if wall_seconds and produced else 0.0,
+        "p50_seconds": round(percentile(latencies, 50), 1),
+        "p95_seconds": round(percentile(latencies, 95), 1),
+        "failures": [{"inputs": o["inputs"], "error": o["error"]} for o in failed],
+    }
+    Path(args.output_dir, "batch_summary.json").write_text(json.dumps(summary, indent=2), encoding='utf-8')
+
+    print("\n📊 Batch summary")
+    print(f"  Entries: {summary['entries']} (generated {summary['generated']}, from cache {summary['from_cache']}, "
+          f"skipped {summary['skipped']}, failed {summary['failed']}; {summary['duplicates']} repeats dropped)")
+    print(f"  Throughput: {summary['reports_per_hour']} reports/hour over {summary['wall_seconds']}s")
+    print(f"  Latency per report: p50 {summary['p50_seconds']}s, p95 {summary['p95_seconds']}s")
+    for failure in summary["failures"]:
+        print(f"  ❌ {failure['inputs']}: {failure['error']}")
+    return summary
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.input:
+        summary = run_batch(args)
+        raise SystemExit(1 if summary["failed"] else 0)
+
+    inputs = {'company_name': args.company, 'industry_name': args.industry}
+
     logger.info("🚀 Starting Market Research & Use Case Generation Crew...")
     # Kick off the crew
     try:
-        result = market_research_crew.kickoff(inputs=inputs)
-        logger.info("\n\n✅ Crew execution finished successfully!")
+        generate = partial(run_market_research, run_id=args.run_id, resume=args.resume, rerun_from=args.rerun_from)
+        # Resuming or re-running a stage is an explicit request for a new report
+        result, source = get_or_generate_report(inputs, generate, force_refresh=bool(args.resume or args.rerun_from))
+        logger.info(f"\n\n✅ Crew execution finished successfully! (report {source})")
         logger.info("📝 Final Proposal:\n")
         print(result)
 
@@ -23,5 +162,10 @@ if __name__ == "__main__":
             f.write(result_str)
         print(f"\n📄 Report saved to: {output_filename}")
 
+        if source == "stale":
+            logger.info("🔄 Waiting for the stale report to be refreshed in the background...")
+            wait_for_background_refreshes()
+
     except Exception as e:
-        logger.error(f"\n\n❌ An error occurred during crew execution: {e}")
\ No newline at end of file
+        logger.error(f"\n\n❌ An error occurred during crew execution: {e}")
+        logger.info("💡 Completed stages were checkpointed, re-run with --resume to continue from the failed stage.")
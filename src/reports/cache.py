@@ -0,0 +1,160 @@
+import hashlib
+import json
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import redis.exceptions
+from loguru import logger
+from src.config.settings import settings
+from src.tools.clients import get_redis_client, redis_breaker
+
+# Editing any prompt in these files invalidates every cached report
+PROMPT_FILES = [
+    Path(__file__).resolve().parent.parent / "crew" / "agents.py",
+    Path(__file__).resolve().parent.parent / "crew" / "tasks.py",
+]
+
+# A refresh that died without releasing its lock blocks others for at most this long
+REFRESH_LOCK_SECONDS = 1800
+
+# Reports being regenerated in the background by this process
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+_refresh_threads = []
+
+
+@lru_cache(maxsize=1)
+def prompt_version() -> str:
+    """Hash of the agent and task definitions"""
+    digest = hashlib.sha256()
+    for path in PROMPT_FILES:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _normalize(name: Optional[str]) -> str:
+    return " ".join((name or "").lower().split())
+
+
+def report_cache_key(inputs: Dict[str, str]) -> str:
+    """Redis key for a report, from the normalized inputs, the models and the prompt version"""
+    identity = json.dumps({
+        "company_name": _normalize(inputs.get("company_name")),
+        "industry_name": _normalize(inputs.get("industry_name")),
+        "model": settings.LLM_MODEL,
+        "prompts": prompt_version(),
+        # Only when set, so that keys of reports made without per-agent routes stay the same
+        **({"routes": settings.LLM_AGENT_ROUTES} if settings.LLM_AGENT_ROUTES else {}),
+    }, sort_keys=True)
+    return f"report:{hashlib.sha256(identity.encode('utf-8')).hexdigest()}"
+
+
+def get_cached_report(inputs: Dict[str, str]) -> Optional[Dict]:
+    """Cached report entry ({"report", "created_at"}) for the inputs, if any"""
+    redis_client = get_redis_client()
+    if not redis_client:
+        return None
+    try:
+        cached = redis_client.get(report_cache_key(inputs))
+        redis_breaker.record_success()
+    except redis.exceptions.RedisError as e:
+        redis_breaker.record_failure()
+        logger.info(f"⚠️ Redis GET Error for report cache: {e}.")
+        return None
+    return json.loads(cached) if cached else None
+
+
+def store_report(inputs: Dict[str, str], report: str) -> None:
+    redis_client = get_redis_client()
+    if not redis_client or not report:
+        return
+    entry = {"report": report, "created_at": time.time(), "inputs": inputs, "model": settings.LLM_MODEL}
+    try:
+        redis_client.setex(report_cache_key(inputs), settings.REPORT_CACHE_TTL, json.dumps(entry))
+        redis_breaker.record_success()
+        logger.info(f"💾 Report cached (TTL: {settings.REPORT_CACHE_TTL}s).")
+    except redis.exceptions.RedisError as e:
+        redis_breaker.record_failure()
+        logger.warning(f"⚠️ Redis SETEX Error for report cache: {e}. Report not cached.")
+
+
+def _claim_refresh(inputs: Dict[str, str]) -> bool:
+    """Make sure only one process/thread regenerates a stale report"""
+    cache_key = report_cache_key(inputs)
+    with _refreshing_lock:
+        if cache_key in _refreshing:
+            return False
+        _refreshing.add(cache_key)
+    redis_client = get_redis_client()
+    try:
+        if redis_client and not redis_client.set(f"{cache_key}:refresh", 1, nx=True, ex=REFRESH_LOCK_SECONDS):
+            with _refreshing_lock:
+                _refreshing.discard(cache_key)
+            return False
+    except redis.exceptions.RedisError:
+        redis_breaker.record_failure()
+    return True
+
+
+def _refresh_in_background(inputs: Dict[str, str], generate: Callable[[Dict[str, str]], str]) -> None:
+    if not _claim_refresh(inputs):
+        return
+
+    def refresh():
+        try:
+            logger.info(f"🔄 Refreshing stale report for {inputs}...")
+            store_report(inputs, str(generate(inputs)))
+        except Exception as e:
+            logger.error(f"❌ Background report refresh failed: {e}")
+        finally:
+            cache_key = report_cache_key(inputs)
+            with _refreshing_lock:
+                _refreshing.discard(cache_key)
+            redis_client = get_redis_client()
+            try:
+                if redis_client:
+                    redis_client.delete(f"{cache_key}:refresh")
+            except redis.exceptions.RedisError:
+                redis_breaker.record_failure()
+
+    thread = threading.Thread(target=refresh, name="report-refresh", daemon=True)
+    thread.start()
+    _refresh_threads.append(thread)
+
+
+def wait_for_background_refreshes(timeout: Optional[float] = None) -> None:
+    """Block until background refreshes finish (for short-lived processes like the CLI)"""
+    while _refresh_threads:
+        _refresh_threads.pop().join(timeout)
+
+
+def get_or_generate_report(
+    inputs: Dict[str, str],
+    generate: Callable[[Dict[str, str]], str],
+    force_refresh: bool = False,
+    background_refresh: bool = True,
+) -> Tuple[str, str]:
+    """Return (report, source) where source is "generated", "cached" or "stale".
+
+    Stale reports (older than REPORT_CACHE_STALE_AFTER) are returned at once
+    and regenerated in a background thread for the next request, unless
+    `background_refresh` is False: the job workers queue the refresh as a
+    job of its own instead (see src/jobs/worker.py).
+    """
+    cached = None if force_refresh else get_cached_report(inputs)
+    if cached:
+        age = time.time() - cached["created_at"]
+        if age < settings.REPORT_CACHE_STALE_AFTER:
+            logger.success(f"✅ Report cache HIT ({age / 60:.0f} min old).")
+            return cached["report"], "cached"
+        logger.info(f"⌛ Report cache HIT but stale ({age / 3600:.1f} h old). Serving it and refreshing in the background.")
+        if background_refresh:
+            _refresh_in_background(inputs, generate)
+        return cached["report"], "stale"
+
+    report = str(generate(inputs))
+    store_report(inputs, report)
+    return report, "generated"
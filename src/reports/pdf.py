@@ -0,0 +1,180 @@
+import hashlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Optional
+
+from loguru import logger
+from src.config.settings import settings
+from src.telemetry.tracing import record_span
+from src.tools.cache import LocalTTLCache
+
+HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head><meta charset="UTF-8">
+    <style>
+    body {{ font-family: sans-serif; line-height: 1.6; }} h1, h2, h3 {{ color: #333; }}
+    a {{ color: #007bff; text-decoration: none; }} ul {{ margin-left: 20px; }}
+    li {{ margin-bottom: 5px; }} pre {{ background-color: #f4f4f4; padding: 10px; border-radius: 5px; overflow-x: auto; }}
+    code {{ font-family: monospace; }} table {{ border-collapse: collapse; width: 100%; margin-bottom: 1em; }}
+    th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }} th {{ background-color: #f2f2f2; }}
+    </style>
+</head>
+<body>
+{html_content}
+</body>
+</html>
+"""
+
+# Bump when the template or renderer options change, so cached PDFs are rebuilt
+RENDER_VERSION = "1"
+
+# Rendered PDFs of this process, in front of the disk cache
+_memory_cache = LocalTTLCache(max_bytes=settings.PDF_MEMORY_CACHE_BYTES, ttl=settings.PDF_CACHE_TTL)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_in_flight: Dict[str, Future] = {}
+_lock = threading.Lock()
+
+
+class PdfRenderError(Exception):
+    """Raised when a report cannot be rendered to PDF"""
+
+
+def pdf_key(markdown_content: str) -> str:
+    return hashlib.sha256(f"{RENDER_VERSION}\n{markdown_content}".encode("utf-8")).hexdigest()
+
+
+def markdown_to_html(markdown_content: str) -> str:
+    import markdown2
+    html_content = markdown2.markdown(
+        markdown_content,
+        extras=["tables", "fenced-code-blocks", "strike", "break-on-newline"]
+    )
+    return HTML_TEMPLATE.format(html_content=html_content)
+
+
+def render_pdf(markdown_content: str) -> bytes:
+    """Markdown -> HTML -> PDF, synchronously (runs in the render worker processes)"""
+    from io import BytesIO
+    from xhtml2pdf import pisa
+
+    html = markdown_to_html(markdown_content)
+    pdf_stream = BytesIO()
+    pisa_status = pisa.CreatePDF(BytesIO(html.encode("utf-8")), dest=pdf_stream, encoding="utf-8")
+    if pisa_status.err:
+        raise PdfRenderError(f"Error during PDF generation: {pisa_status.err}")
+    return pdf_stream.getvalue()
+
+
+def _disk_path(key: str) -> Path:
+    return Path(settings.PDF_CACHE_DIR) / f"{key}.pdf"
+
+
+def get_cached_pdf(markdown_content: str) -> Optional[bytes]:
+    """The PDF of this exact report if it was rendered before, from memory or disk"""
+    key = pdf_key(markdown_content)
+    pdf = _memory_cache.get(key)
+    if pdf is not None:
+        return pdf
+    try:
+        pdf = _disk_path(key).read_bytes()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"⚠️ Could not read cached PDF {key}: {e}")
+        return None
+    _memory_cache.set(key, pdf)
+    return pdf
+
+
+def remember_pdf(markdown_content: str, pdf: bytes) -> None:
+    """Keep a PDF of the report rendered earlier (e.g. read from the report store) in memory"""
+    _memory_cache.set(pdf_key(markdown_content), pdf)
+
+
+def _store(key: str, pdf: bytes) -> None:
+    _memory_cache.set(key, pdf)
+    path = _disk_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(pdf)
+        tmp_path.replace(path)
+        _prune_disk_cache(path.parent)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not write PDF cache {path}: {e}")
+
+
+def _prune_disk_cache(directory: Path) -> None:
+    """Keep the PDF_CACHE_MAX_FILES most recently written PDFs"""
+    files = sorted(directory.glob("*.pdf"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in files[settings.PDF_CACHE_MAX_FILES:]:
+        stale.unlink(missing_ok=True)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: forking a process full of server threads is not safe
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PDF_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _reset_executor() -> None:
+    global _executor
+    with _lock:
+        broken, _executor = _executor, None
+    if broken:
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+def request_pdf(markdown_content: str) -> Future:
+    """Future of the report's PDF bytes.
+
+    Already rendered: a completed future. Otherwise the report is rendered in
+    a worker process; concurrent requests for the same report share one render.
+    """
+    key = pdf_key(markdown_content)
+    cached = get_cached_pdf(markdown_content)
+    if cached is not None:
+        future = Future()
+        future.set_result(cached)
+        return future
+
+    with _lock:
+        if key in _in_flight:
+            return _in_flight[key]
+        logger.info(f"📄 Rendering PDF {key[:12]} ({len(markdown_content)} chars) in a worker process...")
+        submitted_at = time.perf_counter()
+        render = _get_executor().submit(render_pdf, markdown_content)
+        future = Future()
+        _in_flight[key] = future
+
+    def on_rendered(render_future: Future) -> None:
+        try:
+            pdf = render_future.result()
+            record_span("pdf", "render", time.perf_counter() - submitted_at, markdown_chars=len(markdown_content), pdf_bytes=len(pdf))
+            _store(key, pdf)
+            future.set_result(pdf)
+            logger.debug(f"PDF {key[:12]} rendered ({len(pdf)} bytes).")
+        except Exception as e:
+            logger.error(f"❌ PDF rendering failed: {e}")
+            record_span("pdf", "render", time.perf_counter() - submitted_at, status="error", error=str(e))
+            if isinstance(e, BrokenProcessPool):
+                # A worker died (e.g. out of memory); start a fresh pool next time
+                _reset_executor()
+            future.set_exception(e if isinstance(e, PdfRenderError) else PdfRenderError(str(e)))
+        finally:
+            with _lock:
+                _in_flight.pop(key, None)
+
+    render.add_done_callback(on_rendered)
+    return future
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+from src.config.settings import settings
+from src.reports.cache import report_cache_key
+from src.tools.cache import LocalTTLCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id TEXT PRIMARY KEY,
+    cache_key TEXT NOT NULL,
+    target TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    markdown TEXT NOT NULL,
+    pdf BLOB,
+    source TEXT,
+    timings TEXT NOT NULL,
+    model TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_updated_at ON reports(updated_at);
+CREATE INDEX IF NOT EXISTS reports_cache_key ON reports(cache_key, updated_at);
+"""
+
+# A report produced again (e.g. served from the report cache) keeps its first
+# inputs and timings and moves to the top of the history
+UPSERT = """
+INSERT INTO reports (id, cache_key, target, inputs, markdown, source, timings, model, created_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET updated_at = excluded.updated_at
+"""
+
+# Columns of the history listing: everything but the report and its PDF
+SUMMARY_COLUMNS = "id, target, inputs, source, timings, model, created_at, updated_at, length(markdown), pdf IS NOT NULL"
+
+
+def content_id(markdown: str) -> str:
+    """Content hash of a report, its ID in the store"""
+    return hashlib.sha256(markdown.encode("utf-8")).hexdigest()[:32]
+
+
+def _summary(row) -> Dict:
+    report_id, target, inputs, source, timings, model, created_at, updated_at, chars, has_pdf = row
+    return {
+        "id": report_id,
+        "target": target,
+        "inputs": json.loads(inputs),
+        "source": source,
+        "timings": json.loads(timings),
+        "model": model,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "chars": chars,
+        "has_pdf": bool(has_pdf),
+    }
+
+
+class ReportStore:
+    """Generated reports (Markdown, rendered PDF, inputs, timings) in SQLite, keyed by content hash.
+
+    Keeps the REPORT_STORE_MAX_REPORTS most recently produced reports on
+    disk and a small LRU of recently opened ones in memory, so the app holds
+    report IDs instead of report texts.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._memory = LocalTTLCache(max_bytes=settings.REPORT_STORE_MEMORY_BYTES, ttl=settings.REPORT_STORE_MEMORY_TTL)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def save(
+        self,
+        inputs: Dict[str, str],
+        markdown: str,
+        source: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> str:
+        """Record a produced report; returns its ID"""
+        report_id = content_id(markdown)
+        now = time.time()
+        target = inputs.get("company_name") or inputs.get("industry_name") or "report"
+        row = (report_id, report_cache_key(inputs), target, json.dumps(inputs), markdown, source,
+               json.dumps(timings or {}), settings.LLM_MODEL, now, now)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(UPSERT, row)
+                # Oldest reports beyond the limit go, PDFs included
+                conn.execute(
+                    "DELETE FROM reports WHERE id IN (SELECT id FROM reports ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                    (settings.REPORT_STORE_MAX_REPORTS,),
+                )
+        return report_id
+
+    def get(self, report_id: str) -> Optional[Dict]:
+        """A report with its Markdown (the PDF is read with get_pdf), from memory when recently opened"""
+        cached = self._memory.get(report_id)
+        if cached is not None:
+            return json.loads(cached)
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT {SUMMARY_COLUMNS}, markdown FROM reports WHERE id = ?", (report_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        report = {**_summary(row[:-1]), "markdown": row[-1]}
+        self._memory.set(report_id, json.dumps(report))
+        return report
+
+    def get_pdf(self, report_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connection().execute("SELECT pdf FROM reports WHERE id = ?", (report_id,)).fetchone()
+        return row[0] if row else None
+
+    def attach_pdf(self, report_id: str, pdf: bytes) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("UPDATE reports SET pdf = ? WHERE id = ? AND pdf IS NULL", (pdf, report_id))
+        # The cached copy says whether there is a PDF
+        self._memory.delete(report_id)
+
+    def latest_for(self, inputs: Dict[str, str]) -> Optional[Dict]:
+        """Summary of the newest report for these inputs (same model and prompts), if any"""
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM reports WHERE cache_key = ? ORDER BY updated_at DESC LIMIT 1",
+                (report_cache_key(inputs),),
+            ).fetchone()
+        return _summary(row) if row else None
+
+    def list(self, offset: int = 0, limit: int = 10) -> List[Dict]:
+        """Summaries of stored reports, newest first, without their Markdown or PDF"""
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM reports ORDER BY updated_at DESC LIMIT ? OFFSET ?", (limit, offset)
+            ).fetchall()
+        return [_summary(row) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def info(self) -> Dict[str, float]:
+        """Stored reports, and entries and bytes of the in-memory copies"""
+        memory = self._memory.info()
+        return {"reports": self.count(), "memory_entries": memory["entries"], "memory_bytes": memory["size_bytes"]}
+
+
+_store: Optional[ReportStore] = None
+_store_lock = threading.Lock()
+
+
+def get_report_store() -> ReportStore:
+    """Store at REPORT_STORE_PATH, opened on first use"""
+    global _store
+    if _store is None or _store.path != Path(settings.REPORT_STORE_PATH):
+        with _store_lock:
+            if _store is None or _store.path != Path(settings.REPORT_STORE_PATH):
+                _store = ReportStore(settings.REPORT_STORE_PATH)
+    return _store
+
+
+def save_report(inputs: Dict[str, str], markdown: str, **details) -> Optional[str]:
+    """Record a report in the store; returns its ID, or None when the store cannot be written"""
+    try:
+        return get_report_store().save(inputs, markdown, **details)
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Could not save the report in the report store: {e}")
+        return None
@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Tuple
+
+from loguru import logger
+from src.config.settings import settings
+
+# Seconds; covers Redis round-trips up to multi-minute LLM tasks
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = {key: list(state) for key, state in self._values.items()}
+        lines = []
+        for key, state in sorted(values.items()):
+            for bound, count in zip(self.buckets, state):
+                labels = _format_labels((*self.labelnames, "le"), (*key, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {int(count)}")
+            labels = _format_labels((*self.labelnames, "le"), (*key, "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {int(state[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(round(state[-2], 6))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {int(state[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics of this process, rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+SPAN_SECONDS = registry.histogram(
+    "market_research_span_seconds",
+    "Duration of instrumented operations (stages, tasks, agent steps, LLM and tool calls, Redis, PDF)",
+    ("kind", "name", "status"),
+)
+SEARCH_RESULTS = registry.counter(
+    "market_research_search_results_total",
+    "Search results returned to agents, by cache tier ('miss' for Tavily API calls, 'index_hit'/'index_miss' for the local resource index)",
+    ("tool", "cache_tier", "status"),
+)
+SEARCH_PAYLOAD_BYTES = registry.counter(
+    "market_research_search_payload_bytes_total",
+    "Bytes of search results returned by the search tools, before compaction",
+    ("tool",),
+)
+LLM_TOKENS = registry.counter(
+    "market_research_llm_tokens_total",
+    "LLM tokens used by report runs, as reported by the provider",
+    ("model", "type"),
+)
+LLM_AGENT_SECONDS = registry.histogram(
+    "market_research_llm_agent_seconds",
+    "LLM call latency per agent and primary model, by outcome ('fallback' when the fallback model answered)",
+    ("agent", "model", "outcome"),
+)
+RUNS = registry.counter(
+    "market_research_runs_total",
+    "Report pipeline runs, by outcome",
+    ("status",),
+)
+
+
+def write_metrics_file(path: str) -> None:
+    """Write the metrics atomically, e.g. for the node_exporter textfile collector"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_export_started = False
+_export_lock = threading.Lock()
+
+
+def start_metrics_export() -> None:
+    """Serve /metrics on METRICS_PORT and/or rewrite METRICS_FILE periodically (once per process).
+
+    METRICS_FILE may contain "{pid}" so that several worker processes on one
+    host each keep their own file.
+    """
+    global _export_started
+    with _export_lock:
+        if _export_started:
+            return
+        _export_started = True
+
+    if settings.METRICS_PORT:
+        try:
+            server = ThreadingHTTPServer(("0.0.0.0", settings.METRICS_PORT), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            logger.info(f"📈 Serving metrics on :{settings.METRICS_PORT}/metrics")
+        except OSError as e:
+            # e.g. a second worker process on the same host
+            logger.warning(f"⚠️ Could not serve metrics on port {settings.METRICS_PORT}: {e}")
+
+    if settings.METRICS_FILE:
+        path = settings.METRICS_FILE.format(pid=os.getpid())
+
+        def write_periodically():
+            while True:
+                try:
+                    write_metrics_file(path)
+                except OSError as e:
+                    logger.warning(f"⚠️ Could not write metrics file {path}: {e}")
+                time.sleep(settings.METRICS_FILE_INTERVAL)
+
+        threading.Thread(target=write_periodically, name="metrics-file", daemon=True).start()
+        logger.info(f"📈 Writing metrics to {path} every {settings.METRICS_FILE_INTERVAL}s")
@@ -0,0 +1,205 @@
+import contextvars
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from loguru import logger
+from src.config.settings import settings
+from src.telemetry.metrics import SPAN_SECONDS
+
+# Span kinds: "stage", "task", "agent_step", "llm", "tool", "tavily", "redis", "pdf"
+
+
+@dataclass
+class Span:
+    kind: str
+    name: str
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    parent_id: Optional[str] = None
+    start: float = field(default_factory=time.time)
+    duration: Optional[float] = None
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    thread: str = field(default_factory=lambda: threading.current_thread().name)
+
+
+class Trace:
+    """Spans recorded during one pipeline run, written as JSON when the run ends"""
+
+    def __init__(self, run_id: str, **attributes):
+        self.trace_id = uuid.uuid4().hex
+        self.run_id = run_id
+        self.started_at = time.time()
+        self.attributes = attributes
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count and total seconds per span kind"""
+        with self._lock:
+            spans = list(self.spans)
+        summary: Dict[str, Dict[str, float]] = {}
+        for span in spans:
+            totals = summary.setdefault(span.kind, {"count": 0, "seconds": 0.0, "errors": 0})
+            totals["count"] += 1
+            totals["seconds"] = round(totals["seconds"] + (span.duration or 0.0), 6)
+            totals["errors"] += span.status == "error"
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = [asdict(span) for span in sorted(self.spans, key=lambda s: s.start)]
+        return {
+            "trace_id": self.trace_id,
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "duration": round(time.time() - self.started_at, 6),
+            "attributes": self.attributes,
+            "summary": self.summary(),
+            "spans": spans,
+        }
+
+    def write(self, directory: str) -> Path:
+        path = Path(directory) / f"{self.run_id}-{int(self.started_at)}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), indent=2, default=str), encoding="utf-8")
+        tmp_path.replace(path)
+        return path
+
+
+def _prune_traces(directory: Path) -> None:
+    """Keep the TRACE_MAX_FILES most recent traces, none older than TRACE_MAX_AGE"""
+    traces = []
+    for path in directory.glob("*.json"):
+        try:
+            traces.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            pass  # Pruned by another process
+    traces.sort(reverse=True)
+    cutoff = time.time() - settings.TRACE_MAX_AGE if settings.TRACE_MAX_AGE else 0
+    for i, (mtime, path) in enumerate(traces):
+        if i >= settings.TRACE_MAX_FILES or mtime < cutoff:
+            path.unlink(missing_ok=True)
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(run_id: str, **attributes) -> Iterator[Trace]:
+    """Collect the spans of everything run inside this block (and threads started
+    with its context copied, see `propagate`) into one trace file under TRACE_DIR"""
+    trace = Trace(run_id, **attributes)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        if settings.TRACE_DIR:
+            try:
+                path = trace.write(settings.TRACE_DIR)
+                logger.info(f"🧭 Trace of run {run_id} written to {path}")
+                _prune_traces(path.parent)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not write trace of run {run_id}: {e}")
+
+
+def _finish(span: Span) -> None:
+    SPAN_SECONDS.observe(span.duration or 0.0, kind=span.kind, name=span.name, status=span.status)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(span)
+
+
+@contextmanager
+def span(kind: str, name: str, **attributes) -> Iterator[Span]:
+    """Time the block as a span, nested under the current one.
+
+    Recorded in the run's trace (if any) and the span duration histogram.
+    Set extra attributes on the yielded span while the block runs.
+    """
+    parent = _current_span.get()
+    current = Span(kind=kind, name=name, parent_id=parent.span_id if parent else None, attributes=attributes)
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.attributes["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration = round(time.perf_counter() - started, 6)
+        current.attributes.pop("_last_step_at", None)
+        _current_span.reset(token)
+        _finish(current)
+
+
+def annotate(**attributes) -> None:
+    """Add attributes to the current span, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def record_span(kind: str, name: str, duration: float, status: str = "ok", **attributes) -> Span:
+    """Record an operation timed elsewhere (e.g. in another process) as a finished span"""
+    parent = _current_span.get()
+    finished = Span(
+        kind=kind,
+        name=name,
+        parent_id=parent.span_id if parent else None,
+        start=time.time() - duration,
+        duration=round(duration, 6),
+        status=status,
+        attributes=attributes,
+    )
+    _finish(finished)
+    return finished
+
+
+def record_agent_step(step) -> None:
+    """crewai step_callback: one span per agent step, timed from the previous step of
+    the task (or the task start) since crewai only reports steps when they end"""
+    task_span = _current_span.get()
+    # crewai reports a tool call twice: its ToolResult, then the AgentAction that asked for it
+    if task_span is None or type(step).__name__ == "ToolResult":
+        return
+    now = time.time()
+    started = task_span.attributes.pop("_last_step_at", task_span.start)
+    task_span.attributes["_last_step_at"] = now
+    tool = getattr(step, "tool", None)
+    record_span(
+        "agent_step",
+        f"tool:{tool}" if tool else "final_answer",
+        now - started,
+        agent=task_span.attributes.get("agent"),
+    )
+
+
+def propagate(fn):
+    """Wrap `fn` to run in a copy of the caller's context, so spans recorded in
+    worker threads land in the caller's trace"""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class TierStats:
+    """Thread-safe hit/miss counters for one cache tier"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool, count: int = 1) -> None:
+        with self._lock:
+            if hit:
+                self.hits += count
+            else:
+                self.misses += count
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class LocalTTLCache:
+    """In-process LRU cache bounded by total bytes, with a TTL per entry.
+
+    Used as the L1 tier in front of Redis so repeated lookups inside one
+    process skip the network round-trip, and so caching keeps working when
+    Redis is unreachable.
+    """
+
+    def __init__(self, max_bytes: int, ttl: int):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = TierStats()
+        self.evictions = 0
+        self._size_bytes = 0
+        # key -> (expires_at, value, size in bytes), oldest use first
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry_size(key: str, value) -> int:
+        # str values (search results) or bytes (rendered PDFs)
+        data = value if isinstance(value, bytes) else value.encode("utf-8")
+        return len(key.encode("utf-8")) + len(data)
+
+    def _drop(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._size_bytes -= size
+
+    def get(self, key: str, record_stats: bool = True) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                if record_stats:
+                    self.stats.record(hit=False)
+                return None
+            self._entries.move_to_end(key)
+        if record_stats:
+            self.stats.record(hit=True)
+        return entry[1]
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        size = self._entry_size(key, value)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, value, size)
+            self._size_bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries first, then least recently used ones until under budget"""
+        if self._size_bytes <= self.max_bytes:
+            return
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _, _) in self._entries.items() if expires_at <= now]:
+            self._drop(key)
+        while self._size_bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def info(self) -> Dict[str, float]:
+        with self._lock:
+            entries, size_bytes = len(self._entries), self._size_bytes
+        return {
+            **self.stats.snapshot(),
+            "entries": entries,
+            "size_bytes": size_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,58 @@
+import json
+import struct
+import zlib
+from typing import Any, Optional, Tuple
+
+# Search results are stored in Redis as
+#   version 1: the Tavily response as JSON text (entries written before version 2)
+#   version 2: b"\x00" + version byte + length of the JSON (uint32, big endian) + zlib(compact JSON)
+# JSON text never starts with a NUL byte, so the first byte tells the versions apart.
+CACHE_FORMAT_VERSION = 2
+_MARKER = b"\x00"
+_HEADER = struct.Struct(">cBI")
+HEADER_SIZE = _HEADER.size
+
+# Tavily response fields no agent or report reads
+_DROPPED_FIELDS = {"response_time", "request_id"}
+
+
+def _compact(value: Any) -> Any:
+    """Drop unused fields and empty values (None, "", [], {}) at any depth"""
+    if isinstance(value, dict):
+        return {
+            k: _compact(v) for k, v in value.items()
+            if k not in _DROPPED_FIELDS and v not in (None, "", [], {})
+        }
+    if isinstance(value, list):
+        return [_compact(v) for v in value]
+    return value
+
+
+def encode_entry(result_json: str, level: int = 6) -> bytes:
+    """Version 2 bytes for a Tavily response given as JSON text"""
+    try:
+        compact = json.dumps(_compact(json.loads(result_json)), ensure_ascii=False, separators=(",", ":"))
+    except ValueError:
+        compact = result_json  # not JSON: stored as is, still compressed
+    data = compact.encode("utf-8")
+    return _HEADER.pack(_MARKER, CACHE_FORMAT_VERSION, len(data)) + zlib.compress(data, level)
+
+
+def decode_entry(value: bytes) -> str:
+    """JSON text of a stored entry, whichever version wrote it"""
+    if not value.startswith(_MARKER):
+        return value.decode("utf-8")
+    _, version, _ = _HEADER.unpack_from(value)
+    if version != CACHE_FORMAT_VERSION:
+        raise ValueError(f"Unknown search cache format version {version}")
+    return zlib.decompress(value[HEADER_SIZE:]).decode("utf-8")
+
+
+def entry_info(head: bytes, stored_bytes: int) -> Tuple[int, Optional[int]]:
+    """(format version, uncompressed bytes) from the first HEADER_SIZE bytes of an entry"""
+    if not head.startswith(_MARKER):
+        return 1, stored_bytes
+    if len(head) < HEADER_SIZE:
+        return 0, None
+    _, version, raw_bytes = _HEADER.unpack_from(head)
+    return version, raw_bytes
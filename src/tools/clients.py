@@ -0,0 +1,149 @@
+import threading
+import time
+from typing import Dict, Optional
+
+import redis
+from tavily import TavilyClient
+from loguru import logger
+from src.config.settings import settings
+
+
+class CircuitBreaker:
+    """Skip calls to a dependency quickly while it keeps failing.
+
+    closed    -> calls go through; `failure_threshold` consecutive failures open it
+    open      -> calls are skipped until `reset_timeout` seconds have passed
+    half_open -> a single probe call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            # Also re-probe if a previous probe never reported back
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                logger.info(f"🔌 {self.name} circuit half-open, probing for recovery...")
+                self.state = "half_open"
+                self._opened_at = time.monotonic()
+                return True
+            # Open, or a probe is already in flight
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"✅ {self.name} recovered, circuit closed.")
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"⚠️ {self.name} unhealthy, skipping it for {self.reset_timeout}s.")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+redis_breaker = CircuitBreaker(
+    "Redis",
+    failure_threshold=settings.REDIS_BREAKER_FAILURES,
+    reset_timeout=settings.REDIS_BREAKER_RESET_SECONDS,
+)
+
+_lock = threading.Lock()
+_redis_pool: Optional[redis.ConnectionPool] = None
+_redis_client: Optional[redis.StrictRedis] = None
+_redis_override = False
+# Bytes-returning twins of the Redis clients, by id of the client they mirror
+_redis_bytes_clients: Dict[int, redis.StrictRedis] = {}
+_tavily_client: Optional[TavilyClient] = None
+
+
+def get_redis_client() -> Optional[redis.StrictRedis]:
+    """Shared Redis client backed by a connection pool, created on first use.
+
+    Returns None while the circuit breaker is open. Callers report the
+    outcome of their Redis calls through `redis_breaker`.
+    """
+    global _redis_pool, _redis_client
+    if _redis_override:
+        return _redis_client
+    if not redis_breaker.allow():
+        return None
+    if _redis_client is None:
+        with _lock:
+            if _redis_client is None:
+                _redis_pool = redis.ConnectionPool(
+                    host=settings.REDIS_HOST,
+                    port=settings.REDIS_PORT,
+                    db=settings.REDIS_DB,
+                    password=settings.REDIS_PASSWORD,
+                    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                    decode_responses=True # Decode responses from bytes to strings
+                )
+                _redis_client = redis.StrictRedis(connection_pool=_redis_pool)
+                logger.info(f"🔌 Redis connection pool created for {settings.REDIS_HOST}:{settings.REDIS_PORT}")
+    return _redis_client
+
+
+def get_redis_bytes_client() -> Optional[redis.StrictRedis]:
+    """Like get_redis_client, but replies are not decoded: for binary values such
+    as compressed cache entries. Same server and settings, own connection pool."""
+    client = get_redis_client()
+    if client is None:
+        return None
+    bytes_client = _redis_bytes_clients.get(id(client))
+    if bytes_client is None:
+        with _lock:
+            bytes_client = _redis_bytes_clients.get(id(client))
+            if bytes_client is None:
+                pool = client.connection_pool
+                bytes_client = _redis_bytes_clients[id(client)] = redis.StrictRedis(
+                    connection_pool=pool.__class__(
+                        connection_class=pool.connection_class,
+                        max_connections=pool.max_connections,
+                        **{**pool.connection_kwargs, "decode_responses": False},
+                    )
+                )
+    return bytes_client
+
+
+def set_redis_client(client: Optional[redis.StrictRedis]) -> None:
+    """Use the given client (or None to disable Redis) instead of the pooled one"""
+    global _redis_client, _redis_override
+    _redis_client = client
+    _redis_override = True
+    _redis_bytes_clients.clear()
+    redis_breaker.record_success()
+
+
+def get_tavily_client() -> TavilyClient:
+    """Shared Tavily client, created on first use"""
+    global _tavily_client
+    if _tavily_client is None:
+        with _lock:
+            if _tavily_client is None:
+                if not settings.TAVILY_API_KEY:
+                    raise ValueError("TAVILY_API_KEY environment variable not set.")
+                # Tavily Client (using the direct library)
+                _tavily_client = TavilyClient(api_key=settings.TAVILY_API_KEY)
+    return _tavily_client
+
+
+def set_tavily_client(client) -> None:
+    """Use the given client instead of the real Tavily API"""
+    global _tavily_client
+    _tavily_client = client
@@ -0,0 +1,151 @@
+import json
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from src.config.settings import settings
+
+# Rough size of a token for Gemini/GPT style tokenizers, good enough for budgets
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(value: Any) -> int:
+    text = value if isinstance(value, str) else json.dumps(value)
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_url(url: str) -> str:
+    """Key used to spot the same page behind trivially different URLs"""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+
+
+def trim_snippet(text: str, max_chars: int) -> str:
+    """Collapse whitespace and cut at a word boundary"""
+    text = " ".join((text or "").split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return cut + "…"
+
+
+class CompactionStats:
+    """Thread-safe token counters of search results before and after compaction"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.results = 0
+        self.raw_tokens = 0
+        self.compact_tokens = 0
+        self.duplicate_urls = 0
+
+    def record(self, raw_tokens: int, compact_tokens: int, duplicate_urls: int) -> None:
+        with self._lock:
+            self.results += 1
+            self.raw_tokens += raw_tokens
+            self.compact_tokens += compact_tokens
+            self.duplicate_urls += duplicate_urls
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "results": self.results,
+                "raw_tokens": self.raw_tokens,
+                "compact_tokens": self.compact_tokens,
+                "tokens_saved": self.raw_tokens - self.compact_tokens,
+                "duplicate_urls": self.duplicate_urls,
+                "saved_ratio": round(1 - self.compact_tokens / self.raw_tokens, 4) if self.raw_tokens else 0.0,
+            }
+
+
+# Totals over every compactor of this process
+compaction_stats = CompactionStats()
+
+
+class SearchResultCompactor:
+    """Shrinks Tavily results before they are handed to an agent.
+
+    Every result keeps only title, URL and a trimmed snippet, and is cut to a
+    token budget. A compactor serves the tools of one agent in one run: a URL
+    it already handed out is repeated as title + URL only, since that agent
+    has seen its snippet in an earlier call. Compactors of the agents of one
+    run can share their `stats`.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        snippet_chars: Optional[int] = None,
+        stats: Optional[CompactionStats] = None,
+    ):
+        self.token_budget = token_budget or settings.TAVILY_RESULT_TOKEN_BUDGET
+        self.snippet_chars = snippet_chars or settings.TAVILY_SNIPPET_CHARS
+        self.stats = stats or CompactionStats()
+        self._seen_urls = set()
+        self._lock = threading.Lock()
+
+    def compact(self, result: Dict) -> Dict:
+        """Compacted copy of a search tool result; errors are passed through as they are"""
+        return self.compact_batch([result])[0]
+
+    def compact_batch(self, results: List[Dict]) -> List[Dict]:
+        """Compacted copies of the results of one tool call, together within one token budget.
+
+        The results take turns adding their next entry, so the budget is split
+        among the queries of a batch and each keeps its top hits. Errors are
+        passed through as they are.
+        """
+        entries: Dict[int, deque] = {}
+        for i, result in enumerate(results):
+            if result.get("status") != "success" or not result.get("response"):
+                continue
+            try:
+                entries[i] = deque(json.loads(result["response"]).get("results") or [])
+            except (TypeError, ValueError, AttributeError):
+                continue
+
+        items: Dict[int, List[Dict[str, str]]] = {i: [] for i in entries}
+        duplicates = dict.fromkeys(entries, 0)
+        seen_in_call = {i: set() for i in entries}
+        budget = self.token_budget - sum(
+            estimate_tokens({"status": "success", "query": results[i]["query"], "response": []}) for i in entries
+        )
+        with self._lock:
+            shown = set(self._seen_urls)
+            turns = list(entries)
+            while turns:
+                for i in list(turns):
+                    entry = None
+                    while entries[i] and entry is None:
+                        entry = entries[i].popleft()
+                        key = normalize_url(entry.get("url") or "")
+                        if not key or key in seen_in_call[i]:
+                            duplicates[i] += 1
+                            entry = None
+                    if entry is None:
+                        turns.remove(i)
+                        continue
+                    seen_in_call[i].add(key)
+                    item = {"title": trim_snippet(entry.get("title", ""), 120), "url": entry["url"]}
+                    if key in shown:
+                        duplicates[i] += 1
+                        item["note"] = "returned by an earlier search"
+                    else:
+                        item["snippet"] = trim_snippet(entry.get("content", ""), self.snippet_chars)
+                    cost = estimate_tokens(item)
+                    if cost > budget:
+                        turns.remove(i)
+                        continue
+                    budget -= cost
+                    items[i].append(item)
+                    shown.add(key)
+            self._seen_urls = shown
+
+        compacted = list(results)
+        for i in entries:
+            compacted[i] = {"status": "success", "query": results[i]["query"], "response": items[i]}
+            raw_tokens, compact_tokens = estimate_tokens(results[i]), estimate_tokens(compacted[i])
+            self.stats.record(raw_tokens, compact_tokens, duplicates[i])
+            compaction_stats.record(raw_tokens, compact_tokens, duplicates[i])
+        return compacted
@@ -0,0 +1,97 @@
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, Optional, Set
+
+# Filler words LLM-written queries add or drop without changing what Tavily returns
+STOPWORDS = {
+    "a", "an", "and", "are", "by", "for", "from", "how", "in", "is", "of",
+    "on", "or", "the", "to", "what", "with",
+}
+
+# Words ending in "s" that are not plurals of the word without it
+NOT_PLURALS = {
+    "always", "does", "economics", "ethics", "logistics", "news", "perhaps", "physics", "series", "species",
+}
+
+# Punctuation that tells queries apart ("C++" / "C#", "AT&T", "node.js") is kept
+_NON_WORD = re.compile(r"[^\w\s+#&.]+")
+
+
+def _normalize_token(token: str) -> str:
+    # Cheap plural folding so "datasets" and "dataset" share a key, but not
+    # "analysis" / "analysi", "status" / "statu" or "news" / "new"
+    if len(token) > 3 and token.isalpha() and token.endswith("s") and not token.endswith(("ss", "us", "is")) and token not in NOT_PLURALS:
+        return token[:-1]
+    return token
+
+
+def canonicalize_query(query: str) -> str:
+    """Normalize a search query so trivially different phrasings share a cache key.
+
+    Case, unicode width, whitespace, stopwords, simple plurals, word order and
+    punctuation other than "+", "#", "&" and dots inside words are ignored:
+    "Tesla AI trends, 2025" and "ai trend tesla 2025" both become
+    "2025 ai tesla trend". Repeated words are kept, as they can matter
+    ("new york new jersey"); looser matching is left to NearDuplicateIndex.
+    """
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = _NON_WORD.sub(" ", text)
+    tokens = [_normalize_token(t) for t in (t.strip(".") for t in text.split()) if t and t not in STOPWORDS]
+    if not tokens:
+        # Query made only of stopwords/punctuation, keep it searchable
+        return " ".join(text.split())
+    return " ".join(sorted(tokens))
+
+
+def jaccard_similarity(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """Token inverted index over canonical queries that have a cached result.
+
+    Lets a paraphrased query reuse the cached result of the most similar
+    known query (Jaccard similarity of their token sets). Entries are grouped
+    by namespace (search depth + max results) since those change the result.
+    """
+
+    def __init__(self, refresh_interval: int = 60):
+        self.refresh_interval = refresh_interval
+        self._postings: Dict[str, Dict[str, Set[str]]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def needs_refresh(self, namespace: str) -> bool:
+        """True when the namespace should be re-synced from the shared store"""
+        return time.monotonic() - self._loaded_at.get(namespace, float("-inf")) > self.refresh_interval
+
+    def load(self, namespace: str, canonical_queries: Iterable[str]) -> None:
+        """Merge queries recorded by other processes into the local index"""
+        for canonical in canonical_queries:
+            self.add(namespace, canonical)
+        self._loaded_at[namespace] = time.monotonic()
+
+    def add(self, namespace: str, canonical: str) -> None:
+        with self._lock:
+            postings = self._postings.setdefault(namespace, {})
+            for token in canonical.split():
+                postings.setdefault(token, set()).add(canonical)
+
+    def find_similar(self, namespace: str, canonical: str, threshold: float) -> Optional[str]:
+        """Return the most similar indexed query at or above the threshold, if any"""
+        tokens = set(canonical.split())
+        with self._lock:
+            postings = self._postings.get(namespace, {})
+            candidates = set().union(*(postings.get(t, set()) for t in tokens)) if tokens else set()
+        best, best_score = None, 0.0
+        for candidate in sorted(candidates):
+            if candidate == canonical:
+                continue
+            score = jaccard_similarity(tokens, set(candidate.split()))
+            if score >= threshold and score > best_score:
+                best, best_score = candidate, score
+        return best
@@ -0,0 +1,243 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, TypeVar
+
+import redis.exceptions
+from loguru import logger
+from src.config.settings import settings
+from src.tools.clients import get_redis_client, redis_breaker
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Refill a bucket and take `requested` tokens in one atomic step. Uses the
+# Redis clock so every worker agrees on elapsed time. Returns the number of
+# milliseconds to wait before retrying, 0 when the tokens were taken.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = math.ceil((requested - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return wait
+"""
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    for source in (error, getattr(error, "response", None)):
+        code = getattr(source, "status_code", None)
+        if isinstance(code, int):
+            return code
+    return None
+
+
+def is_throttled(error: Exception) -> bool:
+    """True for "slow down" answers: HTTP 429 / provider rate-limit errors"""
+    return _status_code(error) == 429 or type(error).__name__ in ("RateLimitError", "UsageLimitExceededError")
+
+
+def is_retryable(error: Exception) -> bool:
+    """Throttling, 5xx and timeouts are worth another try; anything else is not"""
+    if is_throttled(error) or _status_code(error) in RETRYABLE_STATUS_CODES:
+        return True
+    name = type(error).__name__
+    return "Timeout" in name or name in ("ServiceUnavailableError", "InternalServerError", "APIConnectionError")
+
+
+class TokenBucket:
+    """Request rate limit shared by every process through Redis.
+
+    Falls back to a bucket local to this process while Redis is unavailable,
+    so limiting keeps working (per process) instead of stopping the run.
+    """
+
+    def __init__(self, name: str, per_minute: float, burst: int):
+        self.key = f"ratelimit:{name}"
+        self.rate = per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._scripts: Dict[int, Callable] = {}
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take_shared(self) -> Optional[float]:
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return None
+        try:
+            script = self._scripts.get(id(redis_client))
+            if script is None:
+                script = self._scripts[id(redis_client)] = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+            wait_ms = script(keys=[self.key], args=[self.rate, self.capacity, 1])
+            redis_breaker.record_success()
+            return int(wait_ms) / 1000.0
+        except redis.exceptions.RedisError as e:
+            redis_breaker.record_failure()
+            logger.info(f"⚠️ Redis rate limiter error: {e}. Limiting locally.")
+            return None
+
+    def _take_local(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; returns the seconds spent waiting"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            wait = self._take_shared()
+            if wait is None:
+                wait = self._take_local()
+            if wait <= 0:
+                return waited
+            # A little jitter so waiting workers do not all retry on the same tick
+            wait += random.uniform(0, 0.05)
+            time.sleep(wait)
+            waited += wait
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on requests in flight in this process.
+
+    Every success adds 1/limit (so +1 per limit's worth of successes), every
+    throttled response halves the limit. The limit settles just under the
+    level the provider accepts without erroring.
+    """
+
+    def __init__(self, name: str, initial: int, maximum: int, minimum: int = 1):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify()
+
+    def on_success(self) -> None:
+        with self._condition:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify()
+
+    def on_throttle(self) -> None:
+        with self._condition:
+            previous = self.limit
+            self.limit = max(self.minimum, self.limit / 2)
+        if int(previous) != int(self.limit):
+            logger.warning(f"🐢 {self.name} throttled, concurrency {int(previous)} -> {int(self.limit)}.")
+
+
+class ProviderLimiter:
+    """Rate limit, adaptive concurrency and retries for calls to one API provider"""
+
+    def __init__(self, name: str, per_minute: float, burst: int, max_concurrency: int):
+        self.name = name
+        self.bucket = TokenBucket(name, per_minute, burst)
+        self.concurrency = AdaptiveConcurrency(name, initial=max(1, max_concurrency // 2), maximum=max_concurrency)
+        self._stats_lock = threading.Lock()
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "failed": 0, "wait_seconds": 0.0}
+
+    def _count(self, **increments) -> None:
+        with self._stats_lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+
+    def call(self, fn: Callable[..., T], *args, max_retries: Optional[int] = None, **kwargs) -> T:
+        """Call `fn`, waiting for the rate limit and retrying transient failures
+        with exponential backoff and full jitter (RATE_LIMIT_MAX_RETRIES times
+        unless `max_retries` is given)"""
+        max_retries = settings.RATE_LIMIT_MAX_RETRIES if max_retries is None else max_retries
+        for attempt in range(max_retries + 1):
+            # Wait for the rate limit before taking a slot, so a throttled caller
+            # does not keep the others from calls the limit allows
+            waited = self.bucket.acquire()
+            self._count(calls=1, wait_seconds=waited)
+            with self.concurrency.slot():
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    if not is_retryable(e) or attempt == max_retries:
+                        self._count(failed=1)
+                        raise
+                    if is_throttled(e):
+                        self._count(throttled=1)
+                        self.concurrency.on_throttle()
+                    retry_after = getattr(e, "retry_after_seconds", None)
+                    delay = retry_after or random.uniform(
+                        0, min(settings.RATE_LIMIT_MAX_DELAY, settings.RATE_LIMIT_BASE_DELAY * 2 ** attempt)
+                    )
+                    logger.info(f"🔁 {self.name} call failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s.")
+                else:
+                    self.concurrency.on_success()
+                    return result
+            self._count(retries=1)
+            time.sleep(delay)
+        raise RuntimeError("unreachable")  # the last attempt either returned or raised
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {**stats, "wait_seconds": round(stats["wait_seconds"], 3), "concurrency_limit": int(self.concurrency.limit)}
+
+
+tavily_limiter = ProviderLimiter(
+    "tavily",
+    per_minute=settings.TAVILY_RATE_LIMIT_PER_MINUTE,
+    burst=settings.TAVILY_RATE_LIMIT_BURST,
+    max_concurrency=settings.TAVILY_MAX_CONCURRENCY,
+)
+
+_llm_limiters: Dict[str, ProviderLimiter] = {}
+_llm_limiters_lock = threading.Lock()
+
+
+def get_llm_limiter(model: str) -> ProviderLimiter:
+    """Limiter for one LLM model; quotas are per model"""
+    with _llm_limiters_lock:
+        if model not in _llm_limiters:
+            _llm_limiters[model] = ProviderLimiter(
+                f"llm:{model}",
+                per_minute=settings.LLM_RATE_LIMIT_PER_MINUTE,
+                burst=settings.LLM_RATE_LIMIT_BURST,
+                max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            )
+        return _llm_limiters[model]
+
+
+def get_rate_limit_stats() -> Dict[str, Dict]:
+    with _llm_limiters_lock:
+        limiters = [tavily_limiter, *_llm_limiters.values()]
+    return {limiter.name: limiter.snapshot() for limiter in limiters}
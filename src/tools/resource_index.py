@@ -0,0 +1,281 @@
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from itertools import combinations
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from crewai.tools import BaseTool
+from loguru import logger
+from pydantic import Field
+from src.config.settings import settings
+from src.telemetry.metrics import SEARCH_RESULTS
+from src.telemetry.tracing import span
+from src.tools.cache import TierStats
+from src.tools.compaction import normalize_url, trim_snippet
+from src.tools.query_matching import STOPWORDS
+
+# Words that name where or what kind of resource to look for, not the technique
+# ("steel defect detection dataset kaggle" is indexed and searched as "steel defect detection")
+RESOURCE_WORDS = {
+    "kaggle", "github", "huggingface", "hugging", "face", "hf", "hub", "dataset", "datasets", "data",
+    "repo", "repos", "repository", "repositories", "code", "python", "implementation", "open", "source",
+    "model", "models", "notebook", "notebooks", "example", "examples", "public", "free",
+}
+PLATFORM_WORDS = {"kaggle": "kaggle", "github": "github", "huggingface": "huggingface", "hf": "huggingface"}
+
+# Pages that list or search resources rather than being one
+_GITHUB_NON_REPOS = {"topics", "search", "orgs", "marketplace", "collections", "features", "sponsors", "trending", "explore"}
+_KAGGLE_RESOURCES = {"datasets", "code", "competitions", "models"}
+
+_WORD = re.compile(r"\w+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL,
+    title TEXT NOT NULL,
+    snippet TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    technique TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts USING fts5(
+    title, snippet, technique, platform, content='resources', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS resources_ai AFTER INSERT ON resources BEGIN
+    INSERT INTO resources_fts(rowid, title, snippet, technique, platform) VALUES (new.id, new.title, new.snippet, new.technique, new.platform);
+END;
+CREATE TRIGGER IF NOT EXISTS resources_ad AFTER DELETE ON resources BEGIN
+    INSERT INTO resources_fts(resources_fts, rowid, title, snippet, technique, platform) VALUES ('delete', old.id, old.title, old.snippet, old.technique, old.platform);
+END;
+CREATE TRIGGER IF NOT EXISTS resources_au AFTER UPDATE ON resources BEGIN
+    INSERT INTO resources_fts(resources_fts, rowid, title, snippet, technique, platform) VALUES ('delete', old.id, old.title, old.snippet, old.technique, old.platform);
+    INSERT INTO resources_fts(rowid, title, snippet, technique, platform) VALUES (new.id, new.title, new.snippet, new.technique, new.platform);
+END;
+"""
+
+# A known URL keeps its first title/snippet and collects every technique it was found for
+UPSERT = """
+INSERT INTO resources (url, title, snippet, platform, technique, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(url) DO UPDATE SET
+    technique = CASE WHEN instr(technique, excluded.technique) > 0 OR length(technique) > 500 THEN technique
+                     ELSE technique || '; ' || excluded.technique END,
+    last_seen = excluded.last_seen
+"""
+
+# bm25 weights of the title, snippet, technique and platform (filter only) columns
+BM25_WEIGHTS = (2.0, 1.0, 2.0, 0.0)
+# Longer queries are cut, to bound the number of AND groups a search tries
+MAX_QUERY_TERMS = 8
+# Only the most recently added matches are ranked, which bounds the cost of
+# frequent techniques and favours fresher links
+MAX_CANDIDATES = 200
+
+
+def resource_platform(url: str) -> Optional[str]:
+    """"kaggle", "huggingface" or "github" when the URL is a dataset, model, notebook or repository page"""
+    parts = urlsplit(url)
+    host = parts.netloc.lower().removeprefix("www.")
+    segments = [s for s in parts.path.split("/") if s]
+    if host == "kaggle.com" and len(segments) >= 2 and segments[0] in _KAGGLE_RESOURCES:
+        return "kaggle"
+    if host == "huggingface.co" and len(segments) >= 2:
+        return "huggingface"
+    if host == "github.com" and len(segments) >= 2 and segments[0] not in _GITHUB_NON_REPOS:
+        return "github"
+    return None
+
+
+def technique_terms(query: str) -> List[str]:
+    """Words of a query that describe the technique or domain, in order"""
+    words = [w for w in _WORD.findall(query.lower()) if w not in STOPWORDS and w not in RESOURCE_WORDS]
+    return list(dict.fromkeys(words))
+
+
+def query_platforms(query: str) -> List[str]:
+    """Platforms a query names, e.g. ["kaggle"] for "steel defect dataset kaggle\""""
+    words = set(_WORD.findall(query.lower()))
+    platforms = {platform for word, platform in PLATFORM_WORDS.items() if word in words}
+    if {"hugging", "face"} <= words:
+        platforms.add("huggingface")
+    return sorted(platforms)
+
+
+def extract_resources(response_json: str) -> List[Dict[str, str]]:
+    """Dataset and repository hits of a Tavily response (JSON text)"""
+    try:
+        payload = json.loads(response_json)
+    except (TypeError, ValueError):
+        return []
+    resources = []
+    for entry in payload.get("results") or []:
+        url = entry.get("url") or ""
+        platform = resource_platform(url)
+        if platform:
+            resources.append({
+                "url": normalize_url(url),
+                "title": trim_snippet(entry.get("title") or "", 200),
+                "snippet": trim_snippet(entry.get("content") or "", settings.RESOURCE_INDEX_SNIPPET_CHARS),
+                "platform": platform,
+            })
+    return resources
+
+
+class ResourceIndex:
+    """BM25 (SQLite FTS5) index of dataset and repository pages surfaced by past searches.
+
+    Shared by every process on the machine through the SQLite file. Each
+    resource is indexed on its title, snippet and the techniques it was
+    found for (the search queries, minus platform words).
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.stats = TierStats()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def add(self, resources: Iterable[Dict[str, str]], technique: str) -> int:
+        """Record resources found for `technique` (a search query); returns how many were given"""
+        technique = " ".join(technique_terms(technique))
+        now = time.time()
+        rows = [(r["url"], r["title"], r["snippet"], r["platform"], technique, now, now) for r in resources]
+        if not rows or not technique:
+            return 0
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(UPSERT, rows)
+        return len(rows)
+
+    def search(self, query: str, limit: int = 5) -> List[Dict]:
+        """Best matches for a resource search query, best first.
+
+        A resource must match at least RESOURCE_INDEX_MIN_TERM_MATCH of the
+        query's technique words; platforms named in the query filter the
+        results.
+        """
+        terms = technique_terms(query)
+        if not terms:
+            return []
+        platforms = query_platforms(query)
+        terms = terms[:MAX_QUERY_TERMS]
+        needed = max(1, math.ceil(len(terms) * settings.RESOURCE_INDEX_MIN_TERM_MATCH))
+        # Any `needed` of the words: an OR of AND groups, so only qualifying resources get ranked
+        match = " OR ".join("(" + " AND ".join(f'"{term}"' for term in group) + ")" for group in combinations(terms, needed))
+        if platforms:
+            match = f"({match}) AND platform : ({' OR '.join(platforms)})"
+        min_seen = time.time() - settings.RESOURCE_INDEX_MAX_AGE_DAYS * 86400
+
+        with self._lock:
+            rows = self._connection().execute(
+                """
+                SELECT r.url, r.title, r.snippet, r.platform, r.technique
+                FROM (
+                    SELECT rowid AS id, bm25(resources_fts, ?, ?, ?, ?) AS score FROM resources_fts
+                    WHERE resources_fts MATCH ? ORDER BY rowid DESC LIMIT ?
+                ) m JOIN resources r ON r.id = m.id
+                WHERE r.last_seen >= ?
+                ORDER BY m.score LIMIT ?
+                """,
+                (*BM25_WEIGHTS, match, MAX_CANDIDATES, min_seen, limit),
+            ).fetchall()
+
+        results = [
+            {"title": title, "url": url, "platform": platform, "snippet": snippet, "found_for": technique}
+            for url, title, snippet, platform, technique in rows
+        ]
+        self.stats.record(hit=bool(results))
+        return results
+
+    def info(self) -> Dict[str, float]:
+        with self._lock:
+            rows = self._connection().execute("SELECT platform, COUNT(*) FROM resources GROUP BY platform").fetchall()
+        return {**self.stats.snapshot(), "resources": sum(n for _, n in rows), "by_platform": dict(rows)}
+
+
+_index: Optional[ResourceIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_resource_index() -> ResourceIndex:
+    """Index at RESOURCE_INDEX_PATH, opened on first use"""
+    global _index
+    if _index is None or _index.path != Path(settings.RESOURCE_INDEX_PATH):
+        with _index_lock:
+            if _index is None or _index.path != Path(settings.RESOURCE_INDEX_PATH):
+                _index = ResourceIndex(settings.RESOURCE_INDEX_PATH)
+    return _index
+
+
+def index_search_result(result: Dict) -> None:
+    """Record the dataset and repository hits of a successful search tool result"""
+    if not settings.RESOURCE_INDEX_ENABLED or result.get("status") != "success" or not result.get("response"):
+        return
+    resources = extract_resources(result["response"])
+    if not resources:
+        return
+    try:
+        get_resource_index().add(resources, result["query"])
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Could not record resources in the local index: {e}")
+
+
+class ResourceIndexSearchTool(BaseTool):
+    name: str = "Local Resource Index Search"
+    description: str = (
+        "Looks up datasets and code repositories (Kaggle, HuggingFace, GitHub) that earlier reports "
+        "found, for a list of queries such as 'predictive maintenance dataset kaggle'. Answers instantly "
+        "without a web search: use it first, and only web search the queries it has no relevant results for."
+    )
+    # Called with every query that had matches, e.g. to stream progress to the UI
+    listener: Optional[Callable[[Dict], None]] = Field(default=None, exclude=True)
+
+    def _run(self, queries: List[str], max_results: int = 5) -> Dict:
+        """Search the local resource index for each query"""
+        queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+        with span("tool", "resource_index", queries=len(queries)) as tool_span:
+            try:
+                index = get_resource_index()
+                results = {query: index.search(query, max_results) for query in queries}
+            except sqlite3.Error as e:
+                tool_span.status = "error"
+                logger.warning(f"⚠️ Local resource index unavailable: {e}")
+                return {"status": "error", "details": "The local resource index is unavailable, use the web search tools."}
+            hits = [query for query, found in results.items() if found]
+            tool_span.attributes.update(hits=len(hits), misses=len(queries) - len(hits))
+
+        logger.info(f"📇 Local resource index: {len(hits)} of {len(queries)} queries answered.")
+        for query in queries:
+            found = bool(results[query])
+            # Tiers of its own, since "miss" counts paid Tavily API calls
+            SEARCH_RESULTS.inc(tool="resource_index", cache_tier="index_hit" if found else "index_miss", status="success")
+            if found and self.listener:
+                try:
+                    self.listener({"status": "success", "query": query, "response_type": "cached", "cache_tier": "resource_index"})
+                except Exception as e:
+                    logger.debug(f"Search listener failed: {e}")
+        return {
+            "status": "success",
+            "results": results,
+            "queries_without_results": [query for query in queries if not results[query]],
+        }
+
+
+resource_index_search_tool = ResourceIndexSearchTool()
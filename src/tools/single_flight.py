@@ -0,0 +1,137 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+import redis.exceptions
+from loguru import logger
+from src.tools.clients import get_redis_client, redis_breaker
+
+T = TypeVar("T")
+
+# Delete the lease only if it is still ours (it may have expired and been taken over)
+RELEASE_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Coalesce concurrent fetches of the same key into one upstream call.
+
+    In this process, callers arriving while a fetch is running wait on its
+    future. Across processes, a Redis lease (SET NX PX) decides which one
+    fetches; the others poll the cache until the result shows up, and fetch
+    themselves if it does not within `wait_seconds` (or the lease is lost,
+    or Redis is unavailable). `fetch` must write the result to the cache
+    that `read_cached` reads, before it returns.
+    """
+
+    def __init__(self, name: str, lease_seconds: float, wait_seconds: float, poll_interval: float):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_interval = poll_interval
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._scripts: Dict[int, Callable] = {}
+        self._stats_lock = threading.Lock()
+        self.stats = {"fetches": 0, "local_waits": 0, "remote_waits": 0, "remote_hits": 0, "wait_timeouts": 0}
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def do(self, key: str, fetch: Callable[[], T], read_cached: Callable[[], Optional[T]]) -> Tuple[T, bool]:
+        """(result, coalesced) for `key`, fetched once however many callers ask at the same time.
+
+        `coalesced` is False for the caller whose `fetch` ran, True for callers
+        served another caller's result (in this process or through the cache).
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            self._count("local_waits")
+            return future.result()[0], True
+
+        try:
+            result = self._fetch_once_across_processes(key, fetch, read_cached)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _fetch(self, fetch: Callable[[], T]) -> Tuple[T, bool]:
+        self._count("fetches")
+        return fetch(), False
+
+    def _fetch_once_across_processes(
+        self, key: str, fetch: Callable[[], T], read_cached: Callable[[], Optional[T]]
+    ) -> Tuple[T, bool]:
+        lease_key = f"{self.name}:lease:{key}"
+        token = uuid.uuid4().hex
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return self._fetch(fetch)
+
+        deadline = time.monotonic() + self.wait_seconds
+        waited = False
+        while True:
+            try:
+                acquired = redis_client.set(lease_key, token, nx=True, px=int(self.lease_seconds * 1000))
+                redis_breaker.record_success()
+            except redis.exceptions.RedisError as e:
+                redis_breaker.record_failure()
+                logger.info(f"⚠️ Redis lease error for {self.name}: {e}. Fetching without coordination.")
+                return self._fetch(fetch)
+
+            if acquired:
+                try:
+                    # Another process may have stored the result between our cache miss and the lease
+                    cached = read_cached()
+                    if cached is not None:
+                        self._count("remote_hits")
+                        return cached, True
+                    return self._fetch(fetch)
+                finally:
+                    self._release(redis_client, lease_key, token)
+
+            # Another process is fetching: wait for its result to reach the cache
+            if not waited:
+                self._count("remote_waits")
+                waited = True
+            time.sleep(self.poll_interval)
+            cached = read_cached()
+            if cached is not None:
+                self._count("remote_hits")
+                return cached, True
+            if time.monotonic() >= deadline:
+                self._count("wait_timeouts")
+                logger.info(f"⌛ Waited {self.wait_seconds}s for another worker's {self.name} fetch, fetching ourselves.")
+                return self._fetch(fetch)
+
+    def _release(self, redis_client, lease_key: str, token: str) -> None:
+        try:
+            script = self._scripts.get(id(redis_client))
+            if script is None:
+                script = self._scripts[id(redis_client)] = redis_client.register_script(RELEASE_LEASE_SCRIPT)
+            script(keys=[lease_key], args=[token])
+        except redis.exceptions.RedisError as e:
+            # The lease expires on its own after lease_seconds
+            redis_breaker.record_failure()
+            logger.info(f"⚠️ Could not release {lease_key}: {e}")
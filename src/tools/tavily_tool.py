@@ -1,49 +1,309 @@
-from typing import List, Dict, Any
-import redis
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import json
+import zlib
 import redis.exceptions
-from tavily import TavilyClient
 from crewai.tools import BaseTool
+from pydantic import Field
 from dotenv import load_dotenv
 from src.config.settings import settings
+from src.telemetry.metrics import SEARCH_PAYLOAD_BYTES, SEARCH_RESULTS
+from src.telemetry.tracing import propagate, span
+from src.tools.cache import LocalTTLCache, TierStats
+from src.tools.cache_format import decode_entry, encode_entry
+from src.tools.clients import get_redis_bytes_client, get_redis_client, get_tavily_client, redis_breaker
+from src.tools.compaction import SearchResultCompactor, compaction_stats
+from src.tools.query_matching import NearDuplicateIndex, canonicalize_query
+from src.tools.rate_limit import tavily_limiter
+from src.tools.resource_index import ResourceIndexSearchTool, index_search_result
+from src.tools.single_flight import SingleFlight
 from loguru import logger
 
 
 load_dotenv()
 
-TAVILY_API_KEY = settings.TAVILY_API_KEY
-if not TAVILY_API_KEY:
-    raise ValueError("TAVILY_API_KEY environment variable not set.")
-
-# Tavily Client (using the direct library)
-tavily_client = TavilyClient(api_key=TAVILY_API_KEY)
-
-redis_client = None
-try:
-    redis_client = redis.StrictRedis(
-        host=settings.REDIS_HOST,
-        port=settings.REDIS_PORT,
-        db=settings.REDIS_DB,
-        password=settings.REDIS_PASSWORD,
-        decode_responses=True # Decode responses from bytes to strings
-    )
-    redis_client.ping() # Check the connection
-    logger.info(f"✅ Successfully connected to Redis at {settings.REDIS_HOST}:{settings.REDIS_PORT}")
-except redis.exceptions.ConnectionError as e:
-    logger.info(f"⚠️ Warning: Could not connect to Redis at {settings.REDIS_HOST}:{settings.REDIS_PORT}. Caching will be disabled. Error: {e}")
-    redis_client = None
-except Exception as e:
-    logger.info(f"⚠️ Warning: An unexpected error occurred during Redis connection. Caching disabled. Error: {e}")
-    redis_client = None
+# L1: per-process cache in front of Redis (L2)
+l1_cache = LocalTTLCache(max_bytes=settings.L1_CACHE_MAX_BYTES, ttl=settings.TTL_TIME)
+l2_stats = TierStats()
+
+# Paraphrase matching over the canonical queries that have a cached result
+query_index = NearDuplicateIndex()
+near_duplicate_stats = TierStats()
+
+# Hit count per Redis entry (to evict the least used ones, see src/cache_admin.py)
+# and hit/miss/write counters of the Redis tier across all processes
+CACHE_USAGE_KEY = "tavily:usage"
+CACHE_STATS_KEY = "tavily:stats"
+
+# Read entries with their remaining TTL in one round-trip. With ARGV[1] == "1"
+# also count the lookups: KEYS[1] is CACHE_USAGE_KEY, KEYS[2] CACHE_STATS_KEY,
+# the entries follow. Returns value, ttl pairs (value false on a miss).
+CACHE_GET_SCRIPT = """
+local values = {}
+local hits = 0
+for i = 3, #KEYS do
+    local value = redis.call('GET', KEYS[i])
+    values[#values + 1] = value
+    if value then
+        hits = hits + 1
+        values[#values + 1] = redis.call('TTL', KEYS[i])
+        if ARGV[1] == '1' then
+            redis.call('ZINCRBY', KEYS[1], 1, KEYS[i])
+        end
+    else
+        values[#values + 1] = -2
+    end
+end
+if ARGV[1] == '1' then
+    redis.call('HINCRBY', KEYS[2], 'hits', hits)
+    redis.call('HINCRBY', KEYS[2], 'misses', #KEYS - 2 - hits)
+end
+return values
+"""
+_cache_get_scripts: Dict[int, Callable] = {}
+
+# Concurrent misses of the same query, in any process, share one Tavily call
+search_coalescer = SingleFlight(
+    "tavily",
+    lease_seconds=settings.TAVILY_COALESCE_LEASE_SECONDS,
+    wait_seconds=settings.TAVILY_COALESCE_WAIT_SECONDS,
+    poll_interval=settings.TAVILY_COALESCE_POLL_INTERVAL,
+)
+
+
+def _validate_search_depth(search_depth: str) -> str:
+    """Return a search depth accepted by Tavily, defaulting to 'advanced'"""
+    if search_depth not in ["basic", "advanced"]:
+        logger.warning(f"⚠️ Warning: Invalid search_depth '{search_depth}' received. Defaulting to 'advanced'.")
+        return "advanced"
+    return search_depth
+
+
+def _build_cache_key(query: str, search_depth: str, max_results: int) -> str:
+    """Build the Redis key a Tavily search result is cached under"""
+    return f"tavily:{search_depth}:{max_results}:{canonicalize_query(query)}"
+
+
+def _split_cache_key(cache_key: str) -> Tuple[str, str]:
+    """Split a cache key into its (search_depth:max_results) namespace and canonical query"""
+    _, search_depth, max_results, canonical = cache_key.split(":", 3)
+    return f"{search_depth}:{max_results}", canonical
+
+
+def _cache_get_many(cache_keys: List[str], record_stats: bool = True) -> Dict[str, Tuple[str, str]]:
+    """Look keys up in L1, then Redis for the rest. Returns {key: (value, tier)} for hits"""
+    found: Dict[str, Tuple[str, str]] = {}
+    l2_keys = []
+    for cache_key in cache_keys:
+        cached_result_json = l1_cache.get(cache_key, record_stats=record_stats)
+        if cached_result_json is not None:
+            found[cache_key] = (cached_result_json, "l1")
+        else:
+            l2_keys.append(cache_key)
+
+    redis_client = get_redis_bytes_client() if l2_keys else None
+    if redis_client:
+        try:
+            script = _cache_get_scripts.get(id(redis_client))
+            if script is None:
+                script = _cache_get_scripts[id(redis_client)] = redis_client.register_script(CACHE_GET_SCRIPT)
+            with span("redis", "mget", keys=len(l2_keys)):
+                values = script(keys=[CACHE_USAGE_KEY, CACHE_STATS_KEY, *l2_keys], args=["1" if record_stats else "0"])
+            for cache_key, cached_value, ttl in zip(l2_keys, values[::2], values[1::2]):
+                if not cached_value:
+                    continue
+                try:
+                    cached_result_json = decode_entry(cached_value)
+                except (ValueError, zlib.error) as e:
+                    logger.warning(f"⚠️ Unreadable Redis cache entry {cache_key}: {e}. Treating it as a miss.")
+                    continue
+                found[cache_key] = (cached_result_json, "l2")
+                # Never keep an entry in L1 longer than Redis does
+                l1_cache.set(cache_key, cached_result_json, ttl if ttl and ttl > 0 else None)
+            if record_stats:
+                l2_hits = sum(1 for k in l2_keys if k in found)
+                l2_stats.record(hit=True, count=l2_hits)
+                l2_stats.record(hit=False, count=len(l2_keys) - l2_hits)
+            redis_breaker.record_success()
+        except redis.exceptions.RedisError as e:
+            redis_breaker.record_failure()
+            logger.info(f"⚠️ Redis GET Error: {e}. Proceeding without Redis cache.")
+        except Exception as e: # Catch other potential errors
+            logger.info(f"⚠️ Unexpected error during Redis GET: {e}. Proceeding without Redis cache.")
+
+    return found
+
+
+def _cache_set_many(items: Dict[str, str]) -> None:
+    """Store results in L1 and write them to Redis in one pipeline"""
+    for cache_key, result_json in items.items():
+        l1_cache.set(cache_key, result_json)
+        query_index.add(*_split_cache_key(cache_key))
+
+    redis_client = get_redis_bytes_client() if items else None
+    if redis_client:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for cache_key, result_json in items.items():
+                pipe.setex(cache_key, settings.TTL_TIME, encode_entry(result_json, settings.TAVILY_CACHE_COMPRESSION_LEVEL))
+                # Tracked for eviction; a rewritten entry keeps its hit count
+                pipe.zadd(CACHE_USAGE_KEY, {cache_key: 0}, nx=True)
+                # Record the canonical query next to the entry for near-duplicate lookups
+                namespace, canonical = _split_cache_key(cache_key)
+                pipe.sadd(f"tavily:index:{namespace}", canonical)
+                pipe.expire(f"tavily:index:{namespace}", settings.TTL_TIME)
+            pipe.expire(CACHE_USAGE_KEY, settings.TTL_TIME)
+            pipe.hincrby(CACHE_STATS_KEY, "writes", len(items))
+            with span("redis", "setex", keys=len(items)):
+                pipe.execute()
+            redis_breaker.record_success()
+            logger.info(f"💾 {len(items)} result(s) stored in Redis cache (TTL: {settings.TTL_TIME}s).")
+        except redis.exceptions.RedisError as e:
+            redis_breaker.record_failure()
+            logger.warning(f"⚠️ Redis SETEX Error: {e}. Result not cached in Redis.")
+        except Exception as e: # Catch other potential errors
+            logger.warning(f"⚠️ Unexpected error during Redis SETEX: {e}. Result not cached in Redis.")
+
+
+def _near_duplicate_get_many(cache_keys: List[str]) -> Dict[str, Tuple[str, str]]:
+    """For keys that missed, reuse the cached result of a similar enough query"""
+    if not settings.TAVILY_NEAR_DUP_ENABLED or not cache_keys:
+        return {}
+
+    matches: Dict[str, str] = {}
+    for cache_key in cache_keys:
+        namespace, canonical = _split_cache_key(cache_key)
+        redis_client = get_redis_client() if query_index.needs_refresh(namespace) else None
+        if redis_client:
+            try:
+                query_index.load(namespace, redis_client.smembers(f"tavily:index:{namespace}"))
+                redis_breaker.record_success()
+            except redis.exceptions.RedisError as e:
+                redis_breaker.record_failure()
+                logger.info(f"⚠️ Redis SMEMBERS Error: {e}. Using the local query index only.")
+        similar = query_index.find_similar(namespace, canonical, settings.TAVILY_NEAR_DUP_THRESHOLD)
+        if similar:
+            matches[cache_key] = f"tavily:{namespace}:{similar}"
+
+    # Counted as near-duplicate hits below, not as L1/L2 hits
+    cached = _cache_get_many(list(set(matches.values())), record_stats=False) if matches else {}
+    found = {
+        cache_key: (cached[similar_key][0], "near_duplicate")
+        for cache_key, similar_key in matches.items()
+        if similar_key in cached
+    }
+    near_duplicate_stats.record(hit=True, count=len(found))
+    near_duplicate_stats.record(hit=False, count=len(cache_keys) - len(found))
+    return found
+
+
+def get_cache_stats() -> Dict[str, Dict]:
+    """Hit/miss counters for each cache tier"""
+    return {
+        "l1": l1_cache.info(),
+        "l2": {**l2_stats.snapshot(), "circuit": redis_breaker.state},
+        "near_duplicate": {**near_duplicate_stats.snapshot(), "enabled": settings.TAVILY_NEAR_DUP_ENABLED},
+        "compaction": {**compaction_stats.snapshot(), "enabled": settings.TAVILY_COMPACT_RESULTS},
+        "coalescing": search_coalescer.snapshot(),
+    }
+
+
+def _search_tavily(query: str, search_depth: str, max_results: int) -> Dict:
+    """Call the Tavily API and wrap the response in the tool result format"""
+    try:
+        # Use Tavily Serch tool for new response (rate limited, retried on 429/5xx)
+        with span("tavily", "search", search_depth=search_depth, max_results=max_results):
+            response = tavily_limiter.call(
+                get_tavily_client().search,
+                query=query,
+                search_depth=search_depth,
+                max_results=max_results
+            )
+        # Convert to json str for storing in Redis
+        result_json = json.dumps(response)
+    except Exception as e:
+        logger.error(f"❌ Error calling Tavily API: {e}")
+        return {
+            "status": "error",
+            "query": query,
+            "response": None,
+            "details": str(e)
+        }
+
+    return {
+        "status": "success",
+        "query": query,
+        "response": result_json,
+        "response_type": "generated"
+    }
+
+
+def _search_tavily_once(query: str, cache_key: str, search_depth: str, max_results: int) -> Dict:
+    """Search a cache miss on Tavily and cache the result.
+
+    Concurrent misses of the same key wait for one API call (see SingleFlight)
+    and get its result with cache tier "coalesced".
+    """
+    def fetch() -> Dict:
+        result = _search_tavily(query, search_depth, max_results)
+        if result["status"] == "success":
+            _cache_set_many({cache_key: result["response"]})
+        return result
+
+    def read_cached() -> Optional[Dict]:
+        # Polled while another process fetches, so kept out of the hit/miss counters
+        cached = _cache_get_many([cache_key], record_stats=False).get(cache_key)
+        return {"status": "success", "response": cached[0]} if cached else None
+
+    result, coalesced = search_coalescer.do(cache_key, fetch, read_cached)
+    if coalesced and result["status"] == "success":
+        return {
+            "status": "success",
+            "query": query,
+            "response": result["response"],
+            "response_type": "cached",
+            "cache_tier": "coalesced"
+        }
+    return {**result, "query": query}
+
+
+def _notify(listener: Optional[Callable[[Dict], None]], result: Dict) -> None:
+    """Report a search result to a progress listener without ever failing the search"""
+    if listener is None:
+        return
+    try:
+        listener(result)
+    except Exception as e:
+        logger.debug(f"Search listener failed: {e}")
+
+
+def _record_search(tool: str, result: Dict) -> int:
+    """Count a search result in the metrics; returns its payload size in bytes"""
+    payload_bytes = len((result.get("response") or "").encode("utf-8"))
+    cache_tier = result.get("cache_tier") if result.get("response_type") == "cached" else "miss"
+    SEARCH_RESULTS.inc(tool=tool, cache_tier=cache_tier, status=result.get("status"))
+    SEARCH_PAYLOAD_BYTES.inc(payload_bytes, tool=tool)
+    return payload_bytes
+
+
+def _compactor_for_call(compactor: Optional[SearchResultCompactor]) -> Optional[SearchResultCompactor]:
+    """The agent's compactor, or a throwaway one (no cross-call URL dedupe) for shared tool instances"""
+    if not settings.TAVILY_COMPACT_RESULTS:
+        return None
+    return compactor or SearchResultCompactor()
 
 
 class CachedTavilySearchTool(BaseTool):
     name: str = "Tavily Search with Cache"
     description: str = (
         "Performs a Tavily web search for a given query. "
-        "Results are cached in Redis to avoid redundant API calls "
+        "Results are cached in memory and in Redis to avoid redundant API calls "
         "and conserve credits. Provides comprehensive search results."
     )
+    # Called with every search result, e.g. to stream progress to the UI
+    listener: Optional[Callable[[Dict], None]] = Field(default=None, exclude=True)
+    # Trims results before the agent sees them, shared by the tools of one agent
+    compactor: Optional[SearchResultCompactor] = Field(default=None, exclude=True)
 
     def _run(
         self,
@@ -52,73 +312,164 @@ class CachedTavilySearchTool(BaseTool):
         max_results: int = 5
     ) -> Dict:
         """Execute tavily search with Redis caching"""
+        with span("tool", "search", query=query) as tool_span:
+            result = self._search(query, search_depth, max_results)
+            tool_span.status = "ok" if result["status"] == "success" else "error"
+            tool_span.attributes.update(
+                cache_tier=result.get("cache_tier") if result.get("response_type") == "cached" else "miss",
+                payload_bytes=_record_search("search", result),
+            )
+        index_search_result(result)
+        _notify(self.listener, result)
+        compactor = _compactor_for_call(self.compactor)
+        return compactor.compact(result) if compactor else result
+
+    def _search(self, query: str, search_depth: str, max_results: int) -> Dict:
 
         # Validate search depth 
-        valid_search_depth = search_depth
-        if valid_search_depth not in ["basic", "advanced"]:
-            logger.warning(f"⚠️ Warning: Invalid search_depth '{search_depth}' received. Defaulting to 'advanced'.")
-            valid_search_depth = "advanced"
+        valid_search_depth = _validate_search_depth(search_depth)
 
         # Start search execution 
         logger.info(f"\n🔎 Executing Tavily Search (cached): '{query}'")
-        cache_key = f"tavily:{search_depth}:{max_results}:{query}"
+        cache_key = _build_cache_key(query, valid_search_depth, max_results)
 
-        # 1. If cache exists 
-        if redis_client: 
-            try:
-                cached_result_json = redis_client.get(cache_key)
-                if cached_result_json:
-                    logger.success("✅ Cache HIT! returning cached response.")
-                    return {
-                        "status": "success",
-                        "query": query,
-                        "response": cached_result_json,
-                        "response_type": "cached"
-                    }
-            except redis.exceptions.RedisError as e:
-                logger.info(f"⚠️ Redis GET Error: {e}. Proceeding without cache.")
-            except Exception as e: # Catch other potential errors
-                logger.info(f"⚠️ Unexpected error during Redis GET: {e}. Proceeding without cache.")
+        # 1. If cache exists (L1, then Redis, then a paraphrase of the query)
+        cached = _cache_get_many([cache_key]).get(cache_key)
+        if not cached:
+            cached = _near_duplicate_get_many([cache_key]).get(cache_key)
+        if cached:
+            cached_result_json, tier = cached
+            logger.success(f"✅ Cache HIT ({tier.upper()})! returning cached response.")
+            return {
+                "status": "success",
+                "query": query,
+                "response": cached_result_json,
+                "response_type": "cached",
+                "cache_tier": tier
+            }
 
-        # 2. If cache miss
-        logger.info("🔍 Cache MISS or Redis unavailable. Calling Tavily API...")
-        try:
-            # Use Tavily Serch tool for new response
-            response = tavily_client.search(
-                query=query,
-                search_depth=search_depth,
-                max_results=max_results
+        # 2. If cache miss: call Tavily (once for every concurrent caller) and cache the result
+        logger.info("🔍 Cache MISS. Calling Tavily API...")
+        return _search_tavily_once(query, cache_key, valid_search_depth, max_results)
+
+
+class CachedTavilyBatchSearchTool(BaseTool):
+    name: str = "Tavily Batch Search with Cache"
+    description: str = (
+        "Performs Tavily web searches for a list of queries in a single call. "
+        "Cached results are read from Redis in one round-trip and the remaining "
+        "queries are searched concurrently. Use it whenever you have several "
+        "queries to run, e.g. dataset and repository searches for a use case."
+    )
+    # Called with every per-query search result, e.g. to stream progress to the UI
+    listener: Optional[Callable[[Dict], None]] = Field(default=None, exclude=True)
+    # Trims results before the agent sees them, shared by the tools of one agent
+    compactor: Optional[SearchResultCompactor] = Field(default=None, exclude=True)
+
+    def _run(
+        self,
+        queries: List[str],
+        search_depth: str = "advanced",
+        max_results: int = 5
+    ) -> Dict:
+        """Execute several tavily searches with pipelined Redis caching"""
+        with span("tool", "batch_search", queries=len(queries)) as tool_span:
+            batch_result = self._search(queries, search_depth, max_results)
+            tool_span.status = "ok" if batch_result["status"] == "success" else "error"
+            tool_span.attributes.update(
+                cache_hits=batch_result.get("cache_hits", 0),
+                cache_misses=batch_result.get("cache_misses", 0),
+                payload_bytes=sum(_record_search("batch_search", r) for r in batch_result["results"]),
             )
-            # Convert to json str for storing in Redis
-            result_json = json.dumps(response)
-        except Exception as e:
-            logger.error(f"❌ Error calling Tavily API: {e}")
+        for result in batch_result["results"]:
+            index_search_result(result)
+            _notify(self.listener, result)
+        compactor = _compactor_for_call(self.compactor)
+        if compactor:
+            batch_result = {**batch_result, "results": compactor.compact_batch(batch_result["results"])}
+        return batch_result
+
+    def _search(self, queries: List[str], search_depth: str, max_results: int) -> Dict:
+
+        valid_search_depth = _validate_search_depth(search_depth)
+
+        # Drop empty queries and queries that canonicalize to the same cache key,
+        # keeping the order the agent asked for
+        queries_by_key: Dict[str, str] = {}
+        for q in queries:
+            if q and q.strip():
+                queries_by_key.setdefault(_build_cache_key(q.strip(), valid_search_depth, max_results), q.strip())
+        unique_queries = list(queries_by_key.values())
+        cache_keys = list(queries_by_key.keys())
+        if not unique_queries:
             return {
                 "status": "error",
-                "query": query,
-                "response": None,
-                "details": str(e)
+                "queries": queries,
+                "results": [],
+                "details": "No queries provided"
             }
 
-        # 3. Store the json string in Redis
-        if redis_client and result_json:
-            try:
-                redis_client.setex(cache_key, settings.TTL_TIME, result_json)
-                logger.info(f"💾 Result stored in Redis cache (TTL: {settings.TTL_TIME}s).")
-            except redis.exceptions.RedisError as e:
-                logger.warning(f"⚠️ Redis SETEX Error: {e}. Result not cached.")
-            except Exception as e: # Catch other potential errors
-                logger.warning(f"⚠️ Unexpected error during Redis SETEX: {e}. Result not cached.")
+        logger.info(f"\n🔎 Executing Tavily Batch Search (cached): {len(unique_queries)} queries")
+        results: Dict[str, Dict] = {}
+
+        # 1. Resolve every cache hit from L1, then Redis in a single round-trip
+        cached = _cache_get_many(cache_keys)
+        cached.update(_near_duplicate_get_many([k for k in cache_keys if k not in cached]))
+        for query, cache_key in zip(unique_queries, cache_keys):
+            if cache_key in cached:
+                cached_result_json, tier = cached[cache_key]
+                results[query] = {
+                    "status": "success",
+                    "query": query,
+                    "response": cached_result_json,
+                    "response_type": "cached",
+                    "cache_tier": tier
+                }
+
+        misses = [q for q in unique_queries if q not in results]
+        key_by_query = dict(zip(unique_queries, cache_keys))
+        logger.info(f"✅ Cache HITs: {len(unique_queries) - len(misses)}, 🔍 MISSes: {len(misses)}")
+
+        # 2. Send the misses to Tavily concurrently; each result is cached as soon as it
+        # arrives, so other callers waiting on the same query can pick it up
+        if misses:
+            workers = max(1, min(settings.TAVILY_MAX_CONCURRENCY, len(misses)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                fetched = executor.map(
+                    propagate(lambda q: _search_tavily_once(q, key_by_query[q], valid_search_depth, max_results)),
+                    misses
+                )
+                for query, result in zip(misses, fetched):
+                    results[query] = result
 
         return {
-            "status": "success",
-            "query": query,
-            "response": result_json,
-            "response_type": "generated"
+            "status": "success" if any(r["status"] == "success" for r in results.values()) else "error",
+            "results": [results[q] for q in unique_queries],
+            "cache_hits": len(unique_queries) - len(misses),
+            "cache_misses": len(misses)
         }
-    
+
 # Instance of the custom tool 
 cached_tavily_search_tool = CachedTavilySearchTool()
+cached_tavily_batch_search_tool = CachedTavilyBatchSearchTool()
+
+
+def create_search_tools(
+    listener: Optional[Callable[[Dict], None]] = None,
+    compactor: Optional[SearchResultCompactor] = None,
+) -> Dict[str, BaseTool]:
+    """Fresh search tool instances for one agent of a run, reporting to `listener`.
+
+    Both web search tools share `compactor` (a new one by default), so a URL
+    is only shown with its snippet once to the agent. "resource_index"
+    searches the datasets and repositories found by earlier runs.
+    """
+    compactor = compactor or SearchResultCompactor()
+    return {
+        "search": CachedTavilySearchTool(listener=listener, compactor=compactor),
+        "batch_search": CachedTavilyBatchSearchTool(listener=listener, compactor=compactor),
+        "resource_index": ResourceIndexSearchTool(listener=listener),
+    }
 
 
 # Example usage
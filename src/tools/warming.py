@@ -0,0 +1,104 @@
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from loguru import logger
+from src.config.settings import settings
+from src.telemetry.tracing import propagate, span
+from src.tools.tavily_tool import cached_tavily_batch_search_tool
+
+# Searches the researcher makes for research_task in crew/tasks.py ({target}: company, else industry)
+RESEARCH_QUERY_TEMPLATES = (
+    "{target} company profile key products and services",
+    "{target} strategic priorities and focus areas",
+)
+# Searches the use case generator makes for use_case_generation_task: AI trends in the
+# sector and what competitors do with AI
+USE_CASE_QUERY_TEMPLATES = (
+    "AI and machine learning trends in {sector}",
+    "generative AI use cases in {sector}",
+    "{target} competitors AI initiatives",
+)
+# Tool defaults, so the warmed entries have the cache keys of the agents' searches
+SEARCH_DEPTH = "advanced"
+MAX_RESULTS = 5
+
+# "- Industry & Sector: Manufacturing, Steel" line of the research summary
+_SECTOR_LINE = re.compile(r"industry\s*&\s*sector\s*\**\s*:\s*\**\s*([^\n*]+)", re.IGNORECASE)
+
+_prefetch_executor = ThreadPoolExecutor(max_workers=max(1, settings.SEARCH_PREFETCH_WORKERS), thread_name_prefix="prefetch")
+
+
+def research_sector(research_summary: str) -> Optional[str]:
+    """Industry & Sector identified by the research summary, if it has one"""
+    match = _SECTOR_LINE.search(research_summary or "")
+    if not match:
+        return None
+    return match.group(1).strip(" .") or None
+
+
+def research_queries(inputs: Dict[str, str]) -> List[str]:
+    """Company profile searches for a report's inputs"""
+    target = inputs.get("company_name") or inputs.get("industry_name")
+    return [t.format(target=target) for t in RESEARCH_QUERY_TEMPLATES] if target else []
+
+
+def use_case_queries(inputs: Dict[str, str], research_summary: str = "") -> List[str]:
+    """AI trend and competitor searches for a report's inputs.
+
+    The sector is the industry given with the inputs, so the searches of a
+    run match the ones warmed ahead of it; the research summary only fills
+    in for company-only inputs, which get no sector searches without it.
+    """
+    target = inputs.get("company_name") or inputs.get("industry_name")
+    sector = inputs.get("industry_name") or research_sector(research_summary)
+    if not target:
+        return []
+    return [t.format(target=target, sector=sector) for t in USE_CASE_QUERY_TEMPLATES if sector or "{sector}" not in t]
+
+
+def format_suggestions(queries: List[str]) -> str:
+    return "\n".join(f"- {query}" for query in queries)
+
+
+def warm(queries: List[str]) -> Dict[str, float]:
+    """Fill the search cache for `queries` through the concurrent batch search.
+
+    Returns how many were already cached, fetched and failed, and the time taken.
+    """
+    started = time.perf_counter()
+    batch = cached_tavily_batch_search_tool._search(queries, SEARCH_DEPTH, MAX_RESULTS)
+    failed = sum(r["status"] != "success" for r in batch["results"])
+    return {
+        "queries": len(batch["results"]),
+        "cached": batch.get("cache_hits", 0),
+        "fetched": batch.get("cache_misses", 0) - failed,
+        "failed": failed,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _prefetch(queries: List[str]) -> Dict[str, float]:
+    with span("tool", "prefetch", queries=len(queries)) as prefetch_span:
+        try:
+            stats = warm(queries)
+        except Exception as e:
+            # The agent searches the queries itself in that case
+            prefetch_span.status = "error"
+            logger.warning(f"⚠️ Search prefetch failed: {e}")
+            return {}
+        prefetch_span.attributes.update(cached=stats["cached"], fetched=stats["fetched"])
+    logger.info(f"🔮 Prefetched {stats['fetched']} searches ({stats['cached']} already cached) in {stats['seconds']:.1f}s.")
+    return stats
+
+
+def prefetch(queries: List[str]) -> Optional[Future]:
+    """Start searching `queries` in the background and return right away.
+
+    An agent that asks for a query still in flight waits for the same Tavily
+    call (see SingleFlight) instead of making another one.
+    """
+    if not queries:
+        return None
+    return _prefetch_executor.submit(propagate(_prefetch), list(queries))
@@ -0,0 +1,49 @@
+import argparse
+import json
+from typing import Dict, List
+from src.batch_io import load_batch
+from src.tools.warming import research_queries, use_case_queries, warm
+from loguru import logger
+
+
+def warming_queries(entries: List[Dict[str, str]]) -> List[str]:
+    """Research and use case searches of every entry, without repeats"""
+    queries = []
+    for inputs in entries:
+        queries.extend(research_queries(inputs) + use_case_queries(inputs))
+    return list(dict.fromkeys(queries))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Fill the search cache with the standard searches of upcoming reports "
+                    "(company profile, AI trends in the sector, competitor AI activity)."
+    )
+    parser.add_argument("--company", action="append", default=[], help="Company to warm the cache for (repeatable)")
+    parser.add_argument("--industry", action="append", default=[], help="Industry to warm the cache for (repeatable)")
+    parser.add_argument("--input", help="CSV or JSONL file of company_name/industry_name pairs, as for src/main.py --input")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    entries = load_batch(args.input) if args.input else []
+    if len(args.company) == len(args.industry):
+        # --company A --industry X --company B --industry Y: one report input per pair
+        entries += [{"company_name": c, "industry_name": i} for c, i in zip(args.company, args.industry)]
+    else:
+        entries += [{"company_name": c, "industry_name": ""} for c in args.company]
+        entries += [{"company_name": "", "industry_name": i} for i in args.industry]
+    if not entries:
+        raise SystemExit("Nothing to warm: pass --company, --industry or --input.")
+
+    queries = warming_queries(entries)
+    logger.info(f"🔥 Warming the search cache for {len(entries)} companies/industries ({len(queries)} searches)...")
+    stats = warm(queries)
+    summary = {"entries": len(entries), **stats, "seconds": round(stats["seconds"], 1)}
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        logger.info(f"✅ {stats['fetched']} searches fetched, {stats['cached']} already cached, "
+                    f"{stats['failed']} failed in {summary['seconds']}s.")
@@ -0,0 +1,75 @@
+import argparse
+import multiprocessing
+import signal
+import threading
+import time
+from src.config.settings import settings
+from src.jobs.queue import RedisJobQueue
+from src.jobs.worker import release_running_jobs, work
+from src.telemetry.metrics import start_metrics_export
+from loguru import logger
+
+
+def _interrupt(*_):
+    raise KeyboardInterrupt
+
+
+def run_worker_process(threads: int, index: int = 0) -> None:
+    """One worker process: `threads` workers polling the shared Redis queue.
+
+    On SIGTERM / Ctrl-C it stops claiming jobs, lets the running ones finish
+    for up to JOB_SHUTDOWN_TIMEOUT seconds and puts the rest back on the queue.
+    """
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, _interrupt)
+    if settings.METRICS_PORT:
+        # Process i serves its metrics on METRICS_PORT + i
+        settings.METRICS_PORT += index
+    start_metrics_export()
+    queue = RedisJobQueue()
+    workers = [threading.Thread(target=work, args=(queue, stop), daemon=True) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            while worker.is_alive():
+                worker.join(1.0)
+    except KeyboardInterrupt:
+        stop.set()
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    deadline = time.monotonic() + settings.JOB_SHUTDOWN_TIMEOUT
+    for worker in workers:
+        worker.join(max(0.0, deadline - time.monotonic()))
+    requeued = release_running_jobs(queue)
+    if requeued:
+        logger.warning(f"↩️ Put {len(requeued)} unfinished jobs back on the queue: {', '.join(requeued)}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate queued reports (run with JOB_BACKEND=redis).")
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count(), help="Worker processes to start")
+    parser.add_argument("--threads", type=int, default=settings.JOB_WORKERS, help="Concurrent reports per process")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logger.info(f"👷 Starting {args.processes} worker processes x {args.threads} jobs each on the Redis job queue...")
+    processes = [
+        multiprocessing.Process(target=run_worker_process, args=(args.threads, i), name=f"report-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logger.info(f"🛑 Stopping workers (running jobs get {settings.JOB_SHUTDOWN_TIMEOUT:g}s to finish, "
+                    "then go back on the queue)...")
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
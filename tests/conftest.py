@@ -0,0 +1,62 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# The app runs with both the repo root (`src.*` imports) and `src/` (`crew.*` imports)
+# on the path, so mirror that here.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Tests never talk to the real Tavily or Gemini APIs
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+
+class StubTavilyClient:
+    """Stand-in for TavilyClient that counts its calls and answers after `latency` seconds"""
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def search(self, query: str, search_depth: str = "advanced", max_results: int = 5):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return {
+            "query": query,
+            "results": [
+                {"title": f"{query} #{i}", "url": f"https://example.com/{i}", "content": f"About {query}."}
+                for i in range(max_results)
+            ],
+        }
+
+
+@pytest.fixture
+def redis_server():
+    """A fakeredis server the code under test uses as its Redis"""
+    fakeredis = pytest.importorskip("fakeredis")
+    from src.tools.clients import set_redis_client
+
+    server = fakeredis.FakeServer()
+    set_redis_client(fakeredis.FakeStrictRedis(server=server, decode_responses=True))
+    yield server
+    set_redis_client(None)
+
+
+@pytest.fixture
+def tavily():
+    from src.tools import tavily_tool
+    from src.tools.clients import set_tavily_client
+
+    client = StubTavilyClient()
+    set_tavily_client(client)
+    tavily_tool.l1_cache.clear()
+    yield client
+    tavily_tool.l1_cache.clear()
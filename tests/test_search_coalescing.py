@@ -0,0 +1,44 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.tools import tavily_tool
+from src.tools.single_flight import SingleFlight
+
+
+def run_together(fn, count: int):
+    """Call `fn(i)` from `count` threads released at the same moment"""
+    start = threading.Barrier(count)
+
+    def call(i):
+        start.wait()
+        return fn(i)
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return [future.result() for future in [pool.submit(call, i) for i in range(count)]]
+
+
+def test_concurrent_identical_searches_reach_tavily_once(redis_server, tavily):
+    tool = tavily_tool.create_search_tools()["search"]
+
+    results = run_together(lambda _: tool._run("steel defect detection dataset kaggle"), 16)
+
+    assert tavily.calls == 1
+    assert all(result["status"] == "success" for result in results)
+
+
+def test_searches_in_other_processes_wait_for_the_fetching_one(redis_server):
+    # One SingleFlight per simulated process; only the Redis lease is shared between them
+    cache, calls = {}, []
+
+    def fetch():
+        calls.append(1)
+        threading.Event().wait(0.2)
+        cache["key"] = "result"
+        return "result"
+
+    flights = [SingleFlight("test", lease_seconds=5, wait_seconds=5, poll_interval=0.01) for _ in range(4)]
+    results = run_together(lambda i: flights[i % 4].do("key", fetch, lambda: cache.get("key")), 12)
+
+    assert len(calls) == 1
+    assert [result for result, _ in results] == ["result"] * 12
+    assert sorted(coalesced for _, coalesced in results) == [False] + [True] * 11